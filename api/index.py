@@ -1,501 +1,42 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-import json
+"""
+Serverless entrypoint (Vercel). Every cold start imports this module, so it is
+kept cheap to load: the routes are served by Starlette directly (FastAPI's import
+alone takes about half a second, most of it building the OpenAPI models), FastAPI
+is imported only when someone opens /docs, and the web interface is read and
+compressed on the first request for it. benchmarks/cold_start.py in the backend
+measures import time and first-request latency against a budget.
+"""
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from collections import OrderedDict
+from functools import lru_cache
+import gzip
+import hashlib
+import os
 import re
 import time
-from datetime import datetime
-
-app = FastAPI(
-    title="NeuroDesk API",
-    description="AI-Powered Productivity & Mental Wellness API",
-    version="1.0.0",
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# HTML interface
-HTML_INTERFACE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>NeuroDesk - Brain Dump & Task Management</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-
-        .header {
-            background: linear-gradient(135deg, #4A90E2 0%, #7BB3F0 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }
-
-        .header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }
-
-        .header p {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
-
-        .content {
-            padding: 30px;
-        }
-
-        .section {
-            margin-bottom: 40px;
-            padding: 25px;
-            border-radius: 15px;
-            background: #f8f9fa;
-            border-left: 5px solid #4A90E2;
-        }
-
-        .section h2 {
-            color: #4A90E2;
-            margin-bottom: 20px;
-            font-size: 1.5em;
-        }
-
-        .input-group {
-            margin-bottom: 20px;
-        }
-
-        label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #333;
-        }
-
-        textarea {
-            width: 100%;
-            min-height: 120px;
-            padding: 15px;
-            border: 2px solid #e1e5e9;
-            border-radius: 10px;
-            font-size: 16px;
-            font-family: inherit;
-            resize: vertical;
-        }
-
-        textarea:focus {
-            outline: none;
-            border-color: #4A90E2;
-        }
-
-        button {
-            background: linear-gradient(135deg, #4A90E2 0%, #7BB3F0 100%);
-            color: white;
-            border: none;
-            padding: 12px 30px;
-            border-radius: 25px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: transform 0.2s;
-        }
-
-        button:hover {
-            transform: translateY(-2px);
-        }
-
-        button:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none;
-        }
-
-        .results {
-            margin-top: 20px;
-            padding: 20px;
-            background: white;
-            border-radius: 10px;
-            border: 1px solid #e1e5e9;
-        }
-
-        .task-card {
-            background: white;
-            padding: 15px;
-            margin: 10px 0;
-            border-radius: 10px;
-            border-left: 4px solid #4A90E2;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-
-        .task-title {
-            font-weight: 600;
-            margin-bottom: 8px;
-            color: #333;
-        }
-
-        .task-meta {
-            display: flex;
-            gap: 15px;
-            font-size: 14px;
-            color: #666;
-        }
-
-        .energy-high { border-left-color: #E57373; }
-        .energy-medium { border-left-color: #FFB74D; }
-        .energy-low { border-left-color: #81C784; }
-
-        .emotion-result {
-            background: white;
-            padding: 15px;
-            margin: 10px 0;
-            border-radius: 10px;
-            border: 1px solid #e1e5e9;
-        }
-
-        .emotion-primary {
-            font-weight: 600;
-            color: #4A90E2;
-            margin-bottom: 10px;
-        }
-
-        .error {
-            background: #ffebee;
-            color: #c62828;
-            padding: 15px;
-            border-radius: 10px;
-            margin: 10px 0;
-        }
-
-        .example-text {
-            background: #f0f8ff;
-            padding: 15px;
-            border-radius: 8px;
-            margin: 10px 0;
-            font-style: italic;
-            color: #666;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🧠 NeuroDesk</h1>
-            <p>AI-Powered Brain Dump & Task Management</p>
-        </div>
-
-        <div class="content">
-            <!-- Brain Dump Section -->
-            <div class="section">
-                <h2>💭 Brain Dump to Tasks</h2>
-                <p>Type your scattered thoughts and we'll convert them into organized tasks with energy levels.</p>
-                
-                <div class="example-text">
-                    <strong>Example:</strong><br>
-                    "Need to finish project report, feeling stressed about meeting tomorrow, want to start learning guitar, should call mom this week"
-                </div>
-
-                <div class="input-group">
-                    <label for="brainDumpText">Your Thoughts:</label>
-                    <textarea id="brainDumpText" placeholder="Type your thoughts here..."></textarea>
-                </div>
-
-                <button onclick="processBrainDump()" id="brainDumpBtn">Generate Tasks</button>
-
-                <div id="brainDumpResults" class="results" style="display: none;">
-                    <h3>Generated Tasks:</h3>
-                    <div id="tasksList"></div>
-                    
-                    <h3>Emotion Analysis:</h3>
-                    <div id="emotionAnalysis"></div>
-                </div>
-            </div>
-
-            <!-- Emotion Detection Section -->
-            <div class="section">
-                <h2>😊 Emotion Detection</h2>
-                <p>Analyze the emotional content of your text.</p>
-
-                <div class="input-group">
-                    <label for="emotionText">Text to Analyze:</label>
-                    <textarea id="emotionText" placeholder="Enter text to analyze emotions..."></textarea>
-                </div>
-
-                <button onclick="detectEmotion()" id="emotionBtn">Detect Emotions</button>
-
-                <div id="emotionResults" class="results" style="display: none;">
-                    <h3>Emotion Analysis Results:</h3>
-                    <div id="emotionDetails"></div>
-                </div>
-            </div>
-
-            <!-- Daily Summary Section -->
-            <div class="section">
-                <h2>📊 Daily Summary</h2>
-                <p>Generate insights and recommendations for your day.</p>
-
-                <button onclick="generateSummary()" id="summaryBtn">Generate Summary</button>
-
-                <div id="summaryResults" class="results" style="display: none;">
-                    <h3>Daily Summary:</h3>
-                    <div id="summaryDetails"></div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        const API_BASE = ''; // Use relative paths for Vercel deployment
-
-        async function processBrainDump() {
-            const text = document.getElementById('brainDumpText').value.trim();
-            if (!text) {
-                alert('Please enter some text first!');
-                return;
-            }
-
-            const btn = document.getElementById('brainDumpBtn');
-            const results = document.getElementById('brainDumpResults');
-            
-            btn.disabled = true;
-            btn.textContent = 'Processing...';
-            results.style.display = 'none';
-
-            try {
-                const response = await fetch(`/api/v1/brain-dump`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ text })
-                });
-
-                const data = await response.json();
-
-                if (data.error) {
-                    throw new Error(data.error);
-                }
-
-                displayTasks(data.tasks);
-                displayEmotion(data.emotion_reading);
-                
-                results.style.display = 'block';
-                
-            } catch (error) {
-                showError('Brain Dump', error.message);
-            } finally {
-                btn.disabled = false;
-                btn.textContent = 'Generate Tasks';
-            }
-        }
-
-        async function detectEmotion() {
-            const text = document.getElementById('emotionText').value.trim();
-            if (!text) {
-                alert('Please enter some text first!');
-                return;
-            }
-
-            const btn = document.getElementById('emotionBtn');
-            const results = document.getElementById('emotionResults');
-            
-            btn.disabled = true;
-            btn.textContent = 'Analyzing...';
-            results.style.display = 'none';
-
-            try {
-                const response = await fetch(`/api/v1/detect-emotion`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ text })
-                });
-
-                const data = await response.json();
-
-                if (data.error) {
-                    throw new Error(data.error);
-                }
-
-                displayEmotionDetails(data);
-                results.style.display = 'block';
-                
-            } catch (error) {
-                showError('Emotion Detection', error.message);
-            } finally {
-                btn.disabled = false;
-                btn.textContent = 'Detect Emotions';
-            }
-        }
-
-        async function generateSummary() {
-            const btn = document.getElementById('summaryBtn');
-            const results = document.getElementById('summaryResults');
-            
-            btn.disabled = true;
-            btn.textContent = 'Generating...';
-            results.style.display = 'none';
-
-            try {
-                const response = await fetch(`/api/v1/generate-summary`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ user_id: 'user_1' })
-                });
-
-                const data = await response.json();
-
-                if (data.error) {
-                    throw new Error(data.error);
-                }
-
-                displaySummary(data);
-                results.style.display = 'block';
-                
-            } catch (error) {
-                showError('Summary Generation', error.message);
-            } finally {
-                btn.disabled = false;
-                btn.textContent = 'Generate Summary';
-            }
-        }
-
-        function displayTasks(tasks) {
-            const container = document.getElementById('tasksList');
-            container.innerHTML = '';
-
-            tasks.forEach(task => {
-                const taskCard = document.createElement('div');
-                taskCard.className = `task-card energy-${task.energy}`;
-                
-                taskCard.innerHTML = `
-                    <div class="task-title">${task.title}</div>
-                    <div class="task-meta">
-                        <span>Energy: ${task.energy}</span>
-                        <span>Category: ${task.category}</span>
-                        <span>Status: ${task.status}</span>
-                        ${task.is_avoidance ? '<span style="color: #E57373;">⚠️ Avoidance</span>' : ''}
-                    </div>
-                `;
-                
-                container.appendChild(taskCard);
-            });
-        }
-
-        function displayEmotion(emotion) {
-            const container = document.getElementById('emotionAnalysis');
-            container.innerHTML = `
-                <div class="emotion-result">
-                    <div class="emotion-primary">Primary Emotion: ${emotion.primary_emotion}</div>
-                    <div>Confidence: ${(emotion.confidence * 100).toFixed(1)}%</div>
-                    <div>Overwhelm Score: ${(emotion.overwhelm_score * 100).toFixed(1)}%</div>
-                    ${emotion.is_overwhelm_detected ? '<div style="color: #E57373; font-weight: 600;">⚠️ Overwhelm Detected</div>' : ''}
-                </div>
-            `;
-        }
-
-        function displayEmotionDetails(emotion) {
-            const container = document.getElementById('emotionDetails');
-            container.innerHTML = `
-                <div class="emotion-result">
-                    <div class="emotion-primary">Primary Emotion: ${emotion.primary_emotion}</div>
-                    <div>Confidence: ${(emotion.confidence * 100).toFixed(1)}%</div>
-                    <div>Overwhelm Score: ${(emotion.overwhelm_score * 100).toFixed(1)}%</div>
-                    ${emotion.is_overwhelm_detected ? '<div style="color: #E57373; font-weight: 600;">⚠️ Overwhelm Detected</div>' : ''}
-                    <div style="margin-top: 10px;">
-                        <strong>All Emotions:</strong><br>
-                        ${Object.entries(emotion.emotion_scores).map(([emotion, score]) => 
-                            `${emotion}: ${(score * 100).toFixed(1)}%`
-                        ).join(', ')}
-                    </div>
-                </div>
-            `;
-        }
 
-        function displaySummary(summary) {
-            const container = document.getElementById('summaryDetails');
-            container.innerHTML = `
-                <div style="margin-bottom: 20px;">
-                    <strong>Summary:</strong><br>
-                    ${summary.summary_text}
-                </div>
-                
-                <div style="margin-bottom: 20px;">
-                    <strong>Insights:</strong><br>
-                    <ul style="margin-left: 20px; margin-top: 10px;">
-                        ${summary.insights.map(insight => `<li>${insight}</li>`).join('')}
-                    </ul>
-                </div>
-                
-                <div style="margin-bottom: 20px;">
-                    <strong>Recommendations:</strong><br>
-                    <ul style="margin-left: 20px; margin-top: 10px;">
-                        ${summary.recommendations.map(rec => `<li>${rec}</li>`).join('')}
-                    </ul>
-                </div>
-                
-                <div style="display: flex; gap: 20px;">
-                    <div><strong>Mood Score:</strong> ${(summary.mood_score * 100).toFixed(0)}%</div>
-                    <div><strong>Productivity Score:</strong> ${(summary.productivity_score * 100).toFixed(0)}%</div>
-                </div>
-            `;
-        }
-
-        function showError(feature, message) {
-            const errorDiv = document.createElement('div');
-            errorDiv.className = 'error';
-            errorDiv.innerHTML = `<strong>${feature} Error:</strong> ${message}`;
-            
-            // Remove any existing error messages
-            document.querySelectorAll('.error').forEach(el => el.remove());
-            
-            // Add the new error message
-            document.querySelector('.content').insertBefore(errorDiv, document.querySelector('.content').firstChild);
-            
-            // Remove error after 5 seconds
-            setTimeout(() => errorDiv.remove(), 5000);
-        }
-
-        // Add some example text on page load
-        window.onload = function() {
-            document.getElementById('brainDumpText').value = 
-                "Need to finish project report\\nFeeling stressed about meeting tomorrow\\nWant to start learning guitar\\nShould call mom this week";
-            
-            document.getElementById('emotionText').value = 
-                "I'm feeling overwhelmed with work and stressed about the upcoming deadline. I need to take a break and exercise more.";
-        };
-    </script>
-</body>
-</html>
-"""
+TITLE = "NeuroDesk API"
+DESCRIPTION = "AI-Powered Productivity & Mental Wellness API"
+VERSION = "1.0.0"
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+INTERFACE_PATH = os.path.join(API_DIR, "interface.html")
+STATIC_DIR = os.path.join(API_DIR, "static")
+# Files the interface page links to as /static/<name>; served under content-hashed names
+INTERFACE_ASSETS = {
+    "interface.css": "text/css",
+    "interface.js": "text/javascript",
+}
+# Hashed URLs change whenever the content does, so browsers may keep them for a year.
+# The page itself keeps its URL and is revalidated (a 304 when unchanged).
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
 
 # Simple emotion detection keywords
 EMOTION_KEYWORDS = {
@@ -508,27 +49,96 @@ EMOTION_KEYWORDS = {
     'stressed': ['stressed', 'pressure', 'tension', 'strained', 'overworked']
 }
 
-def extract_tasks(text):
-    """Extract tasks from brain dump text"""
+HIGH_ENERGY_WORDS = ['urgent', 'important', 'deadline', 'meeting', 'presentation', 'project', 'report']
+LOW_ENERGY_WORDS = ['maybe', 'sometime', 'eventually', 'later', 'when i have time', 'if possible', 'optional']
+
+CATEGORY_KEYWORDS = {
+    'work': ['work', 'job', 'office', 'meeting', 'project', 'report', 'email'],
+    'personal': ['personal', 'family', 'home', 'house', 'clean'],
+    'health': ['exercise', 'workout', 'gym', 'health', 'doctor', 'medical'],
+    'learning': ['learn', 'study', 'course', 'book', 'read', 'practice'],
+    'social': ['friend', 'family', 'call', 'visit', 'party', 'social']
+}
+
+AVOIDANCE_PATTERNS = ['avoid', 'procrastinate', 'put off', 'delay', 'postpone', 'maybe later', 'not sure']
+
+OVERWHELM_PATTERNS = ['too much', 'can\'t handle', 'overwhelming', 'exhausted']
+
+# Words are runs of letters/digits, optionally joined by apostrophes ("can't")
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return [match.group().lower().replace('’', "'") for match in TOKEN_PATTERN.finditer(text)]
+
+def tokenize_lines(text):
+    """Split text into stripped lines with their offset in the text and word tokens"""
+    lines = []
+    start = 0
+    for line in text.split('\n'):
+        stripped = line.strip()
+        lines.append((start + len(line) - len(line.lstrip()), stripped, tokenize(stripped)))
+        start += len(line) + 1
+    return lines
+
+def build_keyword_index():
+    """Index every keyword phrase by its token tuple, mapped to the (group, label) pairs it counts for"""
+    groups = [('emotion', emotion, keywords) for emotion, keywords in EMOTION_KEYWORDS.items()]
+    groups += [('energy', 'high', HIGH_ENERGY_WORDS), ('energy', 'low', LOW_ENERGY_WORDS)]
+    groups += [('category', category, keywords) for category, keywords in CATEGORY_KEYWORDS.items()]
+    groups += [('avoidance', True, AVOIDANCE_PATTERNS), ('overwhelm', True, OVERWHELM_PATTERNS)]
+    
+    index = {}
+    for group, label, keywords in groups:
+        for keyword in keywords:
+            labels = index.setdefault(tuple(tokenize(keyword)), [])
+            if (group, label) not in labels:
+                labels.append((group, label))
+    
+    return index, max(len(phrase) for phrase in index)
+
+KEYWORD_INDEX, MAX_PHRASE_LENGTH = build_keyword_index()
+
+def match_keywords(tokens):
+    """Find keyword phrases among the token n-grams using the hashed keyword index"""
+    matches = set()
+    for n in range(1, MAX_PHRASE_LENGTH + 1):
+        for i in range(len(tokens) - n + 1):
+            phrase = tuple(tokens[i:i + n])
+            if phrase in KEYWORD_INDEX:
+                matches.add(phrase)
+    return matches
+
+def count_matches(matches, group, label):
+    """Count distinct matched phrases for one classifier label"""
+    return sum(1 for phrase in matches if (group, label) in KEYWORD_INDEX[phrase])
+
+def extract_tasks(text, lines=None, dump_id=None):
+    """Extract tasks from brain dump text; with a dump_id, tasks reference the dump instead of copying it"""
     tasks = []
-    lines = text.split('\n')
+    if lines is None:
+        lines = tokenize_lines(text)
     
-    for i, line in enumerate(lines):
-        line = line.strip()
+    for line_number, (start, line, tokens) in enumerate(lines):
         if not line or len(line) < 3:
             continue
             
         # Remove common prefixes
-        line = re.sub(r'^[-•*]\s*', '', line)
+        title = re.sub(r'^[-•*]\s*', '', line)
+        title_start = start + len(line) - len(title)
+        line = title
+        
+        # Match keywords once for all classifiers
+        matches = match_keywords(tokens)
         
         # Determine energy level
-        energy = determine_energy_level(line)
+        energy = determine_energy_level(line, matches)
         
         # Determine category
-        category = determine_category(line)
+        category = determine_category(line, matches)
         
         # Check for avoidance
-        is_avoidance = detect_avoidance(line)
+        is_avoidance = detect_avoidance(line, matches)
         
         task = {
             'id': f'task_{len(tasks) + 1}',
@@ -543,23 +153,27 @@ def extract_tasks(text):
             'focus_minutes': 0,
             'tags': [],
             'is_avoidance': is_avoidance,
-            'emotion_score': 0.0,
-            'original_brain_dump': text
+            'emotion_score': 0.0
         }
         
+        if dump_id is None:
+            task['original_brain_dump'] = text
+        else:
+            task['brain_dump_id'] = dump_id
+            task['line'] = line_number
+            task['span'] = [title_start, title_start + len(title)]
+        
         tasks.append(task)
     
     return tasks
 
-def determine_energy_level(text):
+def determine_energy_level(text, matches=None):
     """Determine energy level based on keywords"""
-    text_lower = text.lower()
+    if matches is None:
+        matches = match_keywords(tokenize(text))
     
-    high_energy_words = ['urgent', 'important', 'deadline', 'meeting', 'presentation', 'project', 'report']
-    low_energy_words = ['maybe', 'sometime', 'eventually', 'later', 'when i have time', 'if possible', 'optional']
-    
-    high_count = sum(1 for word in high_energy_words if word in text_lower)
-    low_count = sum(1 for word in low_energy_words if word in text_lower)
+    high_count = count_matches(matches, 'energy', 'high')
+    low_count = count_matches(matches, 'energy', 'low')
     
     if high_count > low_count:
         return "high"
@@ -568,41 +182,42 @@ def determine_energy_level(text):
     else:
         return "medium"
 
-def determine_category(text):
+def determine_category(text, matches=None):
     """Determine task category based on keywords"""
-    text_lower = text.lower()
-    
-    categories = {
-        'work': ['work', 'job', 'office', 'meeting', 'project', 'report', 'email'],
-        'personal': ['personal', 'family', 'home', 'house', 'clean'],
-        'health': ['exercise', 'workout', 'gym', 'health', 'doctor', 'medical'],
-        'learning': ['learn', 'study', 'course', 'book', 'read', 'practice'],
-        'social': ['friend', 'family', 'call', 'visit', 'party', 'social']
-    }
+    if matches is None:
+        matches = match_keywords(tokenize(text))
     
-    for category, keywords in categories.items():
-        if any(keyword in text_lower for keyword in keywords):
+    for category in CATEGORY_KEYWORDS:
+        if count_matches(matches, 'category', category):
             return category
     
     return "other"
 
-def detect_avoidance(text):
+def detect_avoidance(text, matches=None):
     """Detect avoidance patterns"""
-    text_lower = text.lower()
-    avoidance_patterns = ['avoid', 'procrastinate', 'put off', 'delay', 'postpone', 'maybe later', 'not sure']
-    return any(pattern in text_lower for pattern in avoidance_patterns)
+    if matches is None:
+        matches = match_keywords(tokenize(text))
+    return count_matches(matches, 'avoidance', True) > 0
 
-def detect_emotion(text):
+def detect_emotion(text, lines=None):
     """Detect emotions in text"""
     if not text or len(text.strip()) < 3:
         return None
     
-    text_lower = text.lower()
+    if lines is None:
+        lines = tokenize_lines(text)
+    
+    # Phrases are matched within a line, never across line breaks
+    matches = set()
+    total_words = 0
+    for _, _, tokens in lines:
+        matches |= match_keywords(tokens)
+        total_words += len(tokens)
+    
     emotion_scores = {}
-    total_words = len(text_lower.split())
     
-    for emotion, keywords in EMOTION_KEYWORDS.items():
-        count = sum(1 for keyword in keywords if keyword in text_lower)
+    for emotion in EMOTION_KEYWORDS:
+        count = count_matches(matches, 'emotion', emotion)
         if count > 0:
             emotion_scores[emotion] = count / total_words
     
@@ -624,7 +239,7 @@ def detect_emotion(text):
     confidence = emotion_scores[primary_emotion]
     
     # Calculate overwhelm score
-    overwhelm_score = calculate_overwhelm_score(text_lower, emotion_scores)
+    overwhelm_score = calculate_overwhelm_score(matches, emotion_scores)
     is_overwhelm_detected = overwhelm_score > 0.7
     
     return {
@@ -639,15 +254,14 @@ def detect_emotion(text):
         'overwhelm_score': overwhelm_score
     }
 
-def calculate_overwhelm_score(text, emotion_scores):
-    """Calculate overwhelm score"""
+def calculate_overwhelm_score(matches, emotion_scores):
+    """Calculate overwhelm score from the matched phrases and emotion scores"""
     overwhelm_emotion_score = emotion_scores.get('overwhelmed', 0.0)
     stress_score = emotion_scores.get('stressed', 0.0)
     anxiety_score = emotion_scores.get('anxious', 0.0)
     
-    overwhelm_patterns = [r'\btoo much\b', r'\bcan\'t handle\b', r'\boverwhelming\b', r'\bexhausted\b']
-    pattern_score = sum(1 for pattern in overwhelm_patterns if re.search(pattern, text))
-    pattern_score = min(pattern_score / len(overwhelm_patterns), 1.0)
+    pattern_score = count_matches(matches, 'overwhelm', True)
+    pattern_score = min(pattern_score / len(OVERWHELM_PATTERNS), 1.0)
     
     total_score = (
         overwhelm_emotion_score * 0.4 +
@@ -658,96 +272,356 @@ def calculate_overwhelm_score(text, emotion_scores):
     
     return min(total_score, 1.0)
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
+# Per-user, per-day (UTC) counters updated on every write so summaries never rescan
+# history. Kept in memory, so each serverless instance only sees its own requests.
+# Least recently written (user, day) entries are dropped beyond the cap, so a
+# long-lived warm instance does not grow without bound.
+DAILY_AGGREGATES = OrderedDict()
+DAILY_AGGREGATES_MAX_ENTRIES = int(os.getenv("DAILY_AGGREGATES_MAX_ENTRIES", "10000"))
+
+EMOTION_VALENCE = {
+    'joy': 1.0, 'surprise': 0.3, 'neutral': 0.0, 'stressed': -0.5, 'anxious': -0.6,
+    'disgust': -0.6, 'sadness': -0.7, 'fear': -0.7, 'anger': -0.8, 'overwhelmed': -0.9
+}
+
+def day_of(timestamp):
+    """UTC day of a timestamp as YYYY-MM-DD"""
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+def record_daily(user_id, timestamp, tasks=(), emotion_reading=None):
+    """Add tasks and an emotion reading to the user's counters for the day in O(1) per item"""
+    key = (user_id, day_of(timestamp))
+    aggregate = DAILY_AGGREGATES.get(key)
+    if aggregate is None:
+        aggregate = DAILY_AGGREGATES[key] = {
+            'tasks_created': 0, 'tasks_created_low': 0, 'tasks_created_medium': 0, 'tasks_created_high': 0,
+            'avoidance_tasks': 0, 'emotion_readings': 0, 'mood_sum': 0.0, 'overwhelm_count': 0
+        }
+        while len(DAILY_AGGREGATES) > DAILY_AGGREGATES_MAX_ENTRIES:
+            DAILY_AGGREGATES.popitem(last=False)
+    else:
+        DAILY_AGGREGATES.move_to_end(key)
+    for task in tasks:
+        aggregate['tasks_created'] += 1
+        aggregate[f"tasks_created_{task['energy']}"] += 1
+        aggregate['avoidance_tasks'] += int(task['is_avoidance'])
+    if emotion_reading:
+        aggregate['emotion_readings'] += 1
+        aggregate['mood_sum'] += EMOTION_VALENCE.get(emotion_reading['primary_emotion'], 0.0)
+        aggregate['overwhelm_count'] += int(emotion_reading['is_overwhelm_detected'])
+
+def summarize_day(aggregate):
+    """Scores and text for one day's counters"""
+    aggregate = aggregate or {}
+    created = aggregate.get('tasks_created', 0)
+    readings = aggregate.get('emotion_readings', 0)
+    mood_score = (aggregate['mood_sum'] / readings + 1) / 2 if readings else 0.5
+    # Tasks are not completed on this deployment, so productivity reflects planning
+    # balance: the share of captured tasks that are not flagged as avoidance
+    productivity_score = 1 - aggregate['avoidance_tasks'] / created if created else 0.0
+    
+    insights = []
+    recommendations = []
+    if created:
+        busiest = max(('low', 'medium', 'high'), key=lambda level: aggregate[f'tasks_created_{level}'])
+        insights.append(f"Most of today's tasks are {busiest}-energy tasks")
+    if aggregate.get('avoidance_tasks'):
+        insights.append(f"{aggregate['avoidance_tasks']} of today's tasks show signs of avoidance")
+        recommendations.append("Pick one avoided task and spend just 5 minutes on it")
+    if aggregate.get('overwhelm_count'):
+        insights.append(f"Overwhelm was detected {aggregate['overwhelm_count']} times")
+        recommendations.append("Take short breaks between high-energy tasks")
+    if created > 5:
+        recommendations.append("Consider breaking down larger projects into smaller tasks")
+    
+    mood = 'generally positive' if mood_score >= 0.6 else 'mixed' if mood_score >= 0.4 else 'under strain'
+    summary_text = f"You captured {created} tasks today. " + (
+        f"Your mood was {mood} across {readings} check-ins." if readings else "No mood check-ins were recorded today."
+    )
+    
+    return {
+        'summary_text': summary_text,
+        'insights': insights,
+        'recommendations': recommendations,
+        'mood_score': round(mood_score, 4),
+        'productivity_score': round(productivity_score, 4)
+    }
+
+def compress(body):
+    """A body and its gzip and (with the optional brotli package) brotli encodings, keeping only the smaller ones"""
+    encodings = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        encodings['br'] = brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+    except ImportError:
+        pass
+    variants = {coding: data for coding, data in encodings.items() if len(data) < len(body)}
+    variants['identity'] = body
+    return variants
+
+def static_asset(body, media_type, cache_control):
+    """A response body, precompressed once, with a validator derived from its content"""
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    return {
+        'digest': digest,
+        # Weak: the gzip and brotli bytes differ but carry the same content
+        'etag': f'W/"{digest}"',
+        'media_type': media_type,
+        'cache_control': cache_control,
+        'variants': compress(body),
+    }
+
+@lru_cache(maxsize=None)
+def interface_assets():
+    """The interface page and its static files under content-hashed names, built once per instance"""
+    with open(INTERFACE_PATH, encoding='utf-8') as f:
+        page = f.read()
+    assets = {}
+    for name, media_type in INTERFACE_ASSETS.items():
+        with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+            asset = static_asset(f.read(), media_type, IMMUTABLE)
+        stem, extension = os.path.splitext(name)
+        hashed = f"{stem}.{asset['digest']}{extension}"
+        assets[hashed] = asset
+        page = page.replace(f'/static/{name}"', f'/static/{hashed}"')
+    return static_asset(page.encode('utf-8'), 'text/html', REVALIDATE), assets
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (q > 0)"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+def etag_matches(header, asset):
+    """If-None-Match comparison (weak, as for GET)"""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == f'"{asset["digest"]}"' for tag in header.split(','))
+
+def serve_asset(request, asset):
+    """The best precompressed variant the client accepts, or 304 when its copy is current"""
+    headers = {'ETag': asset['etag'], 'Cache-Control': asset['cache_control'], 'Vary': 'Accept-Encoding'}
+    if etag_matches(request.headers.get('if-none-match'), asset):
+        return Response(status_code=304, headers=headers)
+    accepted = accepted_encodings(request.headers.get('accept-encoding'))
+    variants = asset['variants']
+    for coding in ('br', 'gzip'):
+        if coding in variants and (coding in accepted or '*' in accepted):
+            headers['Content-Encoding'] = coding
+            return Response(variants[coding], media_type=asset['media_type'], headers=headers)
+    return Response(variants['identity'], media_type=asset['media_type'], headers=headers)
+
+async def json_body(request):
+    """The request's JSON object body, or None when it is missing or not an object"""
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+def invalid_body():
+    """The validation error FastAPI returned for a body that is not a JSON object"""
+    return JSONResponse({"detail": [{"type": "dict_type", "loc": ["body"], "msg": "Input should be a valid dictionary"}]}, status_code=422)
+
+async def http_error(request, exc):
+    """JSON error bodies (404, 405) like FastAPI's"""
+    return JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+def query_flag(request, name):
+    """A boolean query parameter, accepting the spellings FastAPI does (true/1/yes/on)"""
+    return request.query_params.get(name, '').lower() in ('1', 'true', 't', 'yes', 'y', 'on')
+
+async def root(request: Request):
     """Serve the HTML interface"""
-    return HTMLResponse(content=HTML_INTERFACE)
+    page, _ = interface_assets()
+    return serve_asset(request, page)
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+async def static_file(request: Request):
+    """Serve one of the interface's content-hashed static files"""
+    _, assets = interface_assets()
+    asset = assets.get(request.path_params['name'])
+    if asset is None:
+        raise HTTPException(status_code=404)
+    return serve_asset(request, asset)
 
-@app.post("/api/v1/brain-dump")
-async def brain_dump(request: dict):
+async def health_check(request: Request):
+    return JSONResponse({"status": "healthy"})
+
+# Clients opt into the compact layout with ?compact=true or this Accept type
+COMPACT_MEDIA_TYPE = "application/vnd.neurodesk.compact+json"
+
+async def brain_dump(request: Request):
     """Process brain dump and generate tasks"""
+    body = await json_body(request)
+    if body is None:
+        return invalid_body()
     try:
-        text = request.get('text', '')
+        text = body.get('text', '')
         if not text:
-            return {"error": "No text provided"}
+            return JSONResponse({"error": "No text provided"})
         
         start_time = time.time()
         
+        # Compact responses send the dump once and tasks reference it by ID and span
+        accept = request.headers.get('accept')
+        compact = query_flag(request, 'compact') or (accept is not None and COMPACT_MEDIA_TYPE in accept)
+        dump_id = 'dump_' + hashlib.sha256(text.encode('utf-8')).hexdigest()[:16] if compact else None
+        
+        # Tokenize once for task extraction and emotion detection
+        lines = tokenize_lines(text)
+        
         # Extract tasks
-        tasks = extract_tasks(text)
+        tasks = extract_tasks(text, lines, dump_id)
         
         # Detect emotions
-        emotion_reading = detect_emotion(text)
+        emotion_reading = detect_emotion(text, lines)
         
         processing_time = time.time() - start_time
         
-        return {
+        if body.get('user_id'):
+            record_daily(body['user_id'], start_time, tasks, emotion_reading)
+        
+        if compact:
+            if emotion_reading:
+                emotion_reading['text_content'] = None
+            return JSONResponse({
+                "brain_dump": {"id": dump_id, "text": text},
+                "tasks": tasks,
+                "emotion_reading": emotion_reading,
+                "processing_time": processing_time,
+                "total_tasks": len(tasks)
+            })
+        
+        return JSONResponse({
             "tasks": tasks,
             "emotion_reading": emotion_reading,
             "processing_time": processing_time,
             "total_tasks": len(tasks)
-        }
+        })
         
     except Exception as e:
-        return {"error": str(e)}
+        return JSONResponse({"error": str(e)})
 
-@app.post("/api/v1/detect-emotion")
-async def detect_emotion_endpoint(request: dict):
+async def detect_emotion_endpoint(request: Request):
     """Detect emotions in text"""
+    body = await json_body(request)
+    if body is None:
+        return invalid_body()
     try:
-        text = request.get('text', '')
+        text = body.get('text', '')
         if not text:
-            return {"error": "No text provided"}
+            return JSONResponse({"error": "No text provided"})
         
         emotion_result = detect_emotion(text)
         
         if emotion_result:
-            return emotion_result
+            if body.get('user_id'):
+                record_daily(body['user_id'], emotion_result['timestamp'], emotion_reading=emotion_result)
+            return JSONResponse(emotion_result)
         else:
-            return {"error": "Could not detect emotions"}
+            return JSONResponse({"error": "Could not detect emotions"})
             
     except Exception as e:
-        return {"error": str(e)}
+        return JSONResponse({"error": str(e)})
 
-@app.post("/api/v1/generate-summary")
-async def generate_summary(request: dict):
-    """Generate daily summary and insights"""
+async def generate_summary(request: Request):
+    """Generate daily summary and insights from the user's daily counters"""
+    body = await json_body(request)
+    if body is None:
+        return invalid_body()
     try:
-        user_id = request.get('user_id', 'default_user')
+        user_id = body.get('user_id', 'default_user')
+        day = (body.get('date') or '')[:10] or day_of(time.time())
         
-        # Mock summary generation
-        summary_text = f"Today's summary for {user_id}: You've been productive with a mix of high and medium energy tasks. Your mood appears balanced with some stress indicators."
+        # Read the precomputed counters instead of recomputing from history
+        summary = summarize_day(DAILY_AGGREGATES.get((user_id, day)))
         
-        insights = [
-            "You tend to work on high-energy tasks in the morning",
-            "Consider breaking down larger projects into smaller tasks",
-            "Your stress levels are manageable but monitor them"
-        ]
-        
-        recommendations = [
-            "Take short breaks between high-energy tasks",
-            "Schedule low-energy tasks for afternoon",
-            "Practice mindfulness techniques for stress management"
-        ]
-        
-        return {
+        return JSONResponse({
             "user_id": user_id,
-            "summary_text": summary_text,
-            "insights": insights,
-            "recommendations": recommendations,
-            "mood_score": 0.7,
-            "productivity_score": 0.8,
+            "date": day,
+            **summary,
             "generated_at": time.time()
-        }
+        })
         
     except Exception as e:
-        return {"error": str(e)}
+        return JSONResponse({"error": str(e)})
+
+def json_operation(summary, with_query=False):
+    """OpenAPI description of an endpoint taking a JSON object body"""
+    operation = {
+        "summary": summary,
+        "requestBody": {"required": True, "content": {"application/json": {"schema": {"type": "object"}}}},
+        "responses": {"200": {"description": "Successful Response"}, "422": {"description": "Invalid body"}},
+    }
+    if with_query:
+        operation["parameters"] = [{"name": "compact", "in": "query", "required": False, "schema": {"type": "boolean", "default": False}}]
+    return operation
+
+# Hand-written so serving it does not need FastAPI
+OPENAPI_SCHEMA = {
+    "openapi": "3.1.0",
+    "info": {"title": TITLE, "description": DESCRIPTION, "version": VERSION},
+    "paths": {
+        "/": {"get": {"summary": "Serve the HTML interface", "responses": {"200": {"description": "HTML page"}}}},
+        "/health": {"get": {"summary": "Health check", "responses": {"200": {"description": "Successful Response"}}}},
+        "/api/v1/brain-dump": {"post": json_operation("Process brain dump and generate tasks", with_query=True)},
+        "/api/v1/detect-emotion": {"post": json_operation("Detect emotions in text")},
+        "/api/v1/generate-summary": {"post": json_operation("Generate daily summary and insights")},
+    },
+}
+
+async def openapi(request: Request):
+    return JSONResponse(OPENAPI_SCHEMA)
+
+async def docs(request: Request):
+    """Swagger UI; with /redoc, the only routes that load FastAPI"""
+    from fastapi.openapi.docs import get_swagger_ui_html
+    return get_swagger_ui_html(openapi_url="/openapi.json", title=f"{TITLE} - Swagger UI")
+
+async def redoc(request: Request):
+    """ReDoc, as FastAPI served it before the move to Starlette"""
+    from fastapi.openapi.docs import get_redoc_html
+    return get_redoc_html(openapi_url="/openapi.json", title=f"{TITLE} - ReDoc")
+
+app = Starlette(
+    routes=[
+        Route("/", root),
+        Route("/static/{name}", static_file),
+        Route("/health", health_check),
+        Route("/api/v1/brain-dump", brain_dump, methods=["POST"]),
+        Route("/api/v1/detect-emotion", detect_emotion_endpoint, methods=["POST"]),
+        Route("/api/v1/generate-summary", generate_summary, methods=["POST"]),
+        Route("/openapi.json", openapi, include_in_schema=False),
+        Route("/docs", docs, include_in_schema=False),
+        Route("/redoc", redoc, include_in_schema=False),
+    ],
+    exception_handlers={HTTPException: http_error},
+    middleware=[
+        # CORS middleware
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    ],
+)
 
 # For Vercel deployment
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,222 @@
+const API_BASE = ''; // Use relative paths for Vercel deployment
+
+async function processBrainDump() {
+    const text = document.getElementById('brainDumpText').value.trim();
+    if (!text) {
+        alert('Please enter some text first!');
+        return;
+    }
+
+    const btn = document.getElementById('brainDumpBtn');
+    const results = document.getElementById('brainDumpResults');
+
+    btn.disabled = true;
+    btn.textContent = 'Processing...';
+    results.style.display = 'none';
+
+    try {
+        const response = await fetch(`/api/v1/brain-dump`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ text })
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            throw new Error(data.error);
+        }
+
+        displayTasks(data.tasks);
+        displayEmotion(data.emotion_reading);
+
+        results.style.display = 'block';
+
+    } catch (error) {
+        showError('Brain Dump', error.message);
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Generate Tasks';
+    }
+}
+
+async function detectEmotion() {
+    const text = document.getElementById('emotionText').value.trim();
+    if (!text) {
+        alert('Please enter some text first!');
+        return;
+    }
+
+    const btn = document.getElementById('emotionBtn');
+    const results = document.getElementById('emotionResults');
+
+    btn.disabled = true;
+    btn.textContent = 'Analyzing...';
+    results.style.display = 'none';
+
+    try {
+        const response = await fetch(`/api/v1/detect-emotion`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ text })
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            throw new Error(data.error);
+        }
+
+        displayEmotionDetails(data);
+        results.style.display = 'block';
+
+    } catch (error) {
+        showError('Emotion Detection', error.message);
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Detect Emotions';
+    }
+}
+
+async function generateSummary() {
+    const btn = document.getElementById('summaryBtn');
+    const results = document.getElementById('summaryResults');
+
+    btn.disabled = true;
+    btn.textContent = 'Generating...';
+    results.style.display = 'none';
+
+    try {
+        const response = await fetch(`/api/v1/generate-summary`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ user_id: 'user_1' })
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            throw new Error(data.error);
+        }
+
+        displaySummary(data);
+        results.style.display = 'block';
+
+    } catch (error) {
+        showError('Summary Generation', error.message);
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Generate Summary';
+    }
+}
+
+function displayTasks(tasks) {
+    const container = document.getElementById('tasksList');
+    container.innerHTML = '';
+
+    tasks.forEach(task => {
+        const taskCard = document.createElement('div');
+        taskCard.className = `task-card energy-${task.energy}`;
+
+        taskCard.innerHTML = `
+            <div class="task-title">${task.title}</div>
+            <div class="task-meta">
+                <span>Energy: ${task.energy}</span>
+                <span>Category: ${task.category}</span>
+                <span>Status: ${task.status}</span>
+                ${task.is_avoidance ? '<span style="color: #E57373;">⚠️ Avoidance</span>' : ''}
+            </div>
+        `;
+
+        container.appendChild(taskCard);
+    });
+}
+
+function displayEmotion(emotion) {
+    const container = document.getElementById('emotionAnalysis');
+    container.innerHTML = `
+        <div class="emotion-result">
+            <div class="emotion-primary">Primary Emotion: ${emotion.primary_emotion}</div>
+            <div>Confidence: ${(emotion.confidence * 100).toFixed(1)}%</div>
+            <div>Overwhelm Score: ${(emotion.overwhelm_score * 100).toFixed(1)}%</div>
+            ${emotion.is_overwhelm_detected ? '<div style="color: #E57373; font-weight: 600;">⚠️ Overwhelm Detected</div>' : ''}
+        </div>
+    `;
+}
+
+function displayEmotionDetails(emotion) {
+    const container = document.getElementById('emotionDetails');
+    container.innerHTML = `
+        <div class="emotion-result">
+            <div class="emotion-primary">Primary Emotion: ${emotion.primary_emotion}</div>
+            <div>Confidence: ${(emotion.confidence * 100).toFixed(1)}%</div>
+            <div>Overwhelm Score: ${(emotion.overwhelm_score * 100).toFixed(1)}%</div>
+            ${emotion.is_overwhelm_detected ? '<div style="color: #E57373; font-weight: 600;">⚠️ Overwhelm Detected</div>' : ''}
+            <div style="margin-top: 10px;">
+                <strong>All Emotions:</strong><br>
+                ${Object.entries(emotion.emotion_scores).map(([emotion, score]) => 
+                    `${emotion}: ${(score * 100).toFixed(1)}%`
+                ).join(', ')}
+            </div>
+        </div>
+    `;
+}
+
+function displaySummary(summary) {
+    const container = document.getElementById('summaryDetails');
+    container.innerHTML = `
+        <div style="margin-bottom: 20px;">
+            <strong>Summary:</strong><br>
+            ${summary.summary_text}
+        </div>
+
+        <div style="margin-bottom: 20px;">
+            <strong>Insights:</strong><br>
+            <ul style="margin-left: 20px; margin-top: 10px;">
+                ${summary.insights.map(insight => `<li>${insight}</li>`).join('')}
+            </ul>
+        </div>
+
+        <div style="margin-bottom: 20px;">
+            <strong>Recommendations:</strong><br>
+            <ul style="margin-left: 20px; margin-top: 10px;">
+                ${summary.recommendations.map(rec => `<li>${rec}</li>`).join('')}
+            </ul>
+        </div>
+
+        <div style="display: flex; gap: 20px;">
+            <div><strong>Mood Score:</strong> ${(summary.mood_score * 100).toFixed(0)}%</div>
+            <div><strong>Productivity Score:</strong> ${(summary.productivity_score * 100).toFixed(0)}%</div>
+        </div>
+    `;
+}
+
+function showError(feature, message) {
+    const errorDiv = document.createElement('div');
+    errorDiv.className = 'error';
+    errorDiv.innerHTML = `<strong>${feature} Error:</strong> ${message}`;
+
+    // Remove any existing error messages
+    document.querySelectorAll('.error').forEach(el => el.remove());
+
+    // Add the new error message
+    document.querySelector('.content').insertBefore(errorDiv, document.querySelector('.content').firstChild);
+
+    // Remove error after 5 seconds
+    setTimeout(() => errorDiv.remove(), 5000);
+}
+
+// Add some example text on page load
+window.onload = function() {
+    document.getElementById('brainDumpText').value = 
+        "Need to finish project report\nFeeling stressed about meeting tomorrow\nWant to start learning guitar\nShould call mom this week";
+
+    document.getElementById('emotionText').value = 
+        "I'm feeling overwhelmed with work and stressed about the upcoming deadline. I need to take a break and exercise more.";
+};
@@ -1,12 +1,24 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from app.services.ai_service import AIService
-from app.models.task import TaskCreate, TaskResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Iterator, List, Optional, Union
+import time
+from app.database import get_async_db
+from app.services.ai_service import AIService, TaskSource, brain_dump_id, get_ai_service
+from app.services.dedup import DEDUP_MODE, fingerprint_titles
+from app.services.serialization import dumps, emotion_dict, encode_brain_dump, task_dict
+from app.services.storage import InvalidCursor, SavedBrainDump, brain_dump_history, decode_cursor, save_brain_dump
+from app.services.tracing import span
+from app.services.write_queue import write_queue
+from app.models.task import CompactTaskResponse, TaskResponse
 from app.models.emotion import EmotionResponse
 
 router = APIRouter()
 
+# Clients opt into the compact layout with ?compact=true or this Accept type
+COMPACT_MEDIA_TYPE = "application/vnd.neurodesk.compact+json"
+
 class BrainDumpRequest(BaseModel):
     text: str
     user_id: Optional[str] = None
@@ -16,22 +28,85 @@ class BrainDumpResponse(BaseModel):
     emotion_reading: Optional[EmotionResponse] = None
     processing_time: float
 
-@router.post("/brain-dump", response_model=BrainDumpResponse)
-async def process_brain_dump(request: BrainDumpRequest):
+class BrainDumpSource(BaseModel):
+    id: str
+    text: str
+
+class CompactBrainDumpResponse(BaseModel):
+    # The dump is sent once; tasks point into it instead of each carrying a copy
+    brain_dump: BrainDumpSource
+    tasks: List[CompactTaskResponse]
+    emotion_reading: Optional[EmotionResponse] = None
+    processing_time: float
+
+def _saved_tasks(tasks: List[TaskResponse], saved: SavedBrainDump) -> List[TaskResponse]:
+    """
+    The analysed tasks under their saved IDs and versions (a merged task under the
+    task it was merged into), so they can be edited right away, with repeats marked.
+    Copies, since the analysed tasks may be shared through the result cache.
+    """
+    copies = []
+    for task, duplicate, (task_id, version) in zip(tasks, saved.duplicates, saved.tasks):
+        update = {"id": str(task_id), "version": version}
+        if duplicate is not None:
+            update.update(duplicate_of=str(duplicate.task_id), merged=duplicate.merged)
+        copies.append(task.model_copy(update=update))
+    return copies
+
+def _wants_compact(compact: bool, accept: Optional[str]) -> bool:
+    return compact or (accept is not None and COMPACT_MEDIA_TYPE in accept)
+
+def _compact_task(task: TaskResponse, source: TaskSource, dump_id: str) -> Dict[str, Any]:
+    # Same layout as CompactTaskResponse, built without re-validating the task
+    fields = task_dict(task, exclude=("original_brain_dump",))
+    fields.update(brain_dump_id=dump_id, line=source.line, span=[source.start, source.end])
+    return fields
+
+@router.post("/brain-dump", response_model=Union[BrainDumpResponse, CompactBrainDumpResponse])
+async def process_brain_dump(
+    request: BrainDumpRequest,
+    compact: bool = False,
+    accept: Optional[str] = Header(None),
+    ai_service: AIService = Depends(get_ai_service)
+):
     """
     Process brain dump text and convert to structured tasks with emotion analysis.
+    With ?compact=true (or Accept: application/vnd.neurodesk.compact+json) the dump is
+    returned once with an ID and tasks reference it by line and character span.
+    Dumps sent with a user_id are saved to the user's history and the tasks come
+    back with their saved IDs and versions; tasks repeating one of the user's open
+    tasks come back with duplicate_of set (and, when merged, the target's ID).
     """
     try:
-        ai_service = AIService()
-        
         # Process the brain dump
         result = await ai_service.process_brain_dump(request.text)
+        tasks = result.tasks
         
-        return BrainDumpResponse(
-            tasks=result.tasks,
-            emotion_reading=result.emotion_reading,
-            processing_time=result.processing_time
-        )
+        if request.user_id:
+            with span("brain_dump.save", task_count=len(tasks)) as current:
+                # Fingerprint the titles before queueing, so the writer only matches them
+                fingerprints = await fingerprint_titles([task.title for task in tasks]) if DEDUP_MODE != "off" else None
+                saved = await write_queue.submit(save_brain_dump, request.user_id, request.text, result, fingerprints)
+                tasks = _saved_tasks(tasks, saved)
+                current.set("duplicates", sum(duplicate is not None for duplicate in saved.duplicates))
+        
+        # The tasks were built by the service, so encode them directly instead of
+        # validating them again through response_model (which documents the schema)
+        wants_compact = _wants_compact(compact, accept)
+        with span("brain_dump.serialize", compact=wants_compact, task_count=len(tasks)) as current:
+            if wants_compact:
+                dump_id = brain_dump_id(request.text)
+                body = dumps({
+                    "brain_dump": {"id": dump_id, "text": request.text},
+                    "tasks": [_compact_task(task, source, dump_id) for task, source in zip(tasks, result.task_sources)],
+                    "emotion_reading": emotion_dict(result.emotion_reading, include_text=False),
+                    "processing_time": result.processing_time
+                })
+            else:
+                body = encode_brain_dump(tasks, result.emotion_reading, result.processing_time)
+            current.set("response_bytes", len(body))
+        
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -39,17 +114,75 @@ async def process_brain_dump(request: BrainDumpRequest):
             detail=f"Error processing brain dump: {str(e)}"
         )
 
+def _stream_frames(ai_service: AIService, text: str, sse: bool, compact: bool) -> Iterator[bytes]:
+    """
+    Encode the incremental analysis as NDJSON lines or Server-Sent Events.
+    In compact mode a leading brain_dump frame carries the text once.
+    """
+    start_time = time.time()
+    frames = ai_service.stream_brain_dump(text)
+    
+    def encode(kind: str, data: Any) -> bytes:
+        if sse:
+            return b"event: " + kind.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+        return dumps({"type": kind, "data": data}) + b"\n"
+    
+    dump_id = brain_dump_id(text) if compact else None
+    if compact:
+        yield encode("brain_dump", {"id": dump_id, "text": text})
+    
+    for kind, item, source in frames:
+        if kind == "task":
+            data = _compact_task(item, source, dump_id) if compact else task_dict(item)
+        else:
+            data = {
+                "emotion_reading": emotion_dict(item, include_text=not compact),
+                "processing_time": time.time() - start_time
+            }
+        
+        yield encode(kind, data)
+
+@router.post("/brain-dump/stream")
+async def stream_brain_dump(
+    request: BrainDumpRequest,
+    format: Optional[str] = None,
+    compact: bool = False,
+    accept: Optional[str] = Header(None),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Process a brain dump incrementally, emitting each task as soon as its line is
+    classified and the emotion reading as the final frame.
+    Responds with NDJSON by default, or Server-Sent Events with ?format=sse or
+    Accept: text/event-stream. ?compact=true streams the compact task layout.
+    Streamed dumps are not saved: tasks go out before they could get their IDs,
+    so a request with a user_id is refused; send it to /brain-dump instead.
+    """
+    if request.user_id:
+        raise HTTPException(status_code=400, detail="Streamed brain dumps are not saved; send dumps with a user_id to /brain-dump")
+    
+    sse = format == "sse" or (format is None and accept is not None and "text/event-stream" in accept)
+    
+    # The synchronous generator is iterated in Starlette's threadpool, off the event loop
+    return StreamingResponse(
+        _stream_frames(ai_service, request.text, sse, _wants_compact(compact, accept)),
+        media_type="text/event-stream" if sse else "application/x-ndjson"
+    )
+
 @router.get("/brain-dump/history")
-async def get_brain_dump_history(user_id: str, limit: int = 10):
+async def get_brain_dump_history(user_id: str, limit: int = 10, before: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
-    Get brain dump history for a user.
+    Get brain dump history for a user, newest first.
+    Pass the returned next_cursor as ?before= to fetch the next page.
     """
     try:
-        # TODO: Implement brain dump history retrieval
-        return {
-            "brain_dumps": [],
-            "total_count": 0
-        }
+        if before is not None:
+            decode_cursor(before)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return await brain_dump_history(db, user_id, limit, before)
     except Exception as e:
         raise HTTPException(
             status_code=500,
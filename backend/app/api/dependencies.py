@@ -0,0 +1,10 @@
+from fastapi import Header, HTTPException
+from typing import Optional
+from app.services.admin import is_admin
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Route dependency refusing (403) requests without the configured X-Admin-Token.
+    """
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="This operation requires a valid X-Admin-Token")
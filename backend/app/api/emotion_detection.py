@@ -1,22 +1,38 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
-from app.services.emotion_detector import EmotionDetector
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import time
+from app.database import get_async_db
+from app.services.emotion_series import trend
+from app.services.emotion_detector import EmotionDetector, get_emotion_detector
+from app.services.storage import save_emotion_reading, save_emotion_readings
+from app.services.write_queue import write_queue
 from app.models.emotion import EmotionResponse
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 10000
+
 class EmotionDetectionRequest(BaseModel):
     text: str
     user_id: Optional[str] = None
 
+class BatchEmotionDetectionRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+    user_id: Optional[str] = None
+
+class BatchEmotionDetectionResponse(BaseModel):
+    readings: List[Optional[EmotionResponse]]
+    processing_time: float
+
 @router.post("/detect-emotion", response_model=EmotionResponse)
-async def detect_emotion(request: EmotionDetectionRequest):
+async def detect_emotion(request: EmotionDetectionRequest, emotion_detector: EmotionDetector = Depends(get_emotion_detector)):
     """
     Detect emotions in text and determine if overwhelm is present.
+    Readings for requests with a user_id are saved to the user's history.
     """
     try:
-        emotion_detector = EmotionDetector()
         emotion_reading = await emotion_detector.detect_emotion(request.text)
         
         if emotion_reading is None:
@@ -25,10 +41,65 @@ async def detect_emotion(request: EmotionDetectionRequest):
                 detail="Could not detect emotions in the provided text"
             )
         
+        if request.user_id:
+            await write_queue.submit(save_emotion_reading, request.user_id, emotion_reading)
+        
         return emotion_reading
         
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error detecting emotions: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/detect-emotion/batch", response_model=BatchEmotionDetectionResponse)
+async def detect_emotion_batch(request: BatchEmotionDetectionRequest, emotion_detector: EmotionDetector = Depends(get_emotion_detector)):
+    """
+    Detect emotions for many texts in one call. Readings are returned in request order;
+    texts too short to analyse get a null reading instead of failing the batch.
+    With a user_id, the readings are saved to the user's history in one write.
+    """
+    try:
+        start_time = time.time()
+        
+        readings = await emotion_detector.detect_emotion_batch(request.texts)
+        
+        if request.user_id:
+            await write_queue.submit(save_emotion_readings, request.user_id, [reading for reading in readings if reading is not None])
+        
+        return BatchEmotionDetectionResponse(
+            readings=readings,
+            processing_time=time.time() - start_time
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error detecting emotions: {str(e)}"
+        )
+
+@router.get("/emotions/trend")
+async def get_emotion_trend(
+    user_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    max_points: int = Query(500, ge=1, le=10000),
+    step: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Emotion trend for a user between start and end (epoch seconds; default the last 7 days),
+    downsampled to at most max_points windows, or to step-second windows if given.
+    """
+    end = end if end is not None else time.time()
+    start = start if start is not None else end - 7 * 86400
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    try:
+        return await trend(db, user_id, start, end, max_points, step)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving emotion trend: {str(e)}"
+        )
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.api.dependencies import require_admin
+from app.services.scheduler import scheduler
+
+router = APIRouter()
+
+@router.get("/jobs")
+async def get_jobs():
+    """
+    Background jobs with their run counts, failures, timings (seconds) and next run time.
+    """
+    return {"running": scheduler.running, "jobs": scheduler.stats()}
+
+@router.post("/jobs/{name}/run", dependencies=[Depends(require_admin)])
+async def run_job(name: str):
+    """
+    Run a background job now and return its updated stats. Admin only (X-Admin-Token).
+    """
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {name}")
+    await scheduler.run_job(name)
+    return scheduler.stats()[name]
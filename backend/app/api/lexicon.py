@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+from app.api.dependencies import require_admin
+from app.services.lexicon import lexicon_registry
+
+router = APIRouter()
+
+class LexiconInfo(BaseModel):
+    version: str
+    keyword_count: int
+    path: Optional[str] = None
+
+def _lexicon_info() -> LexiconInfo:
+    lexicon = lexicon_registry.current
+    return LexiconInfo(
+        version=lexicon.version,
+        keyword_count=len(lexicon.keywords),
+        path=lexicon_registry.path
+    )
+
+@router.get("/lexicon", response_model=LexiconInfo)
+async def get_lexicon():
+    """
+    Get the version of the active classifier lexicon.
+    """
+    return _lexicon_info()
+
+@router.post("/lexicon/reload", response_model=LexiconInfo, dependencies=[Depends(require_admin)])
+async def reload_lexicon():
+    """
+    Reload the classifier lexicon from the lexicon file without restarting.
+    Admin only (X-Admin-Token).
+    """
+    try:
+        lexicon_registry.reload()
+        return _lexicon_info()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reloading lexicon: {str(e)}"
+        )
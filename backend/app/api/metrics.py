@@ -0,0 +1,63 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from typing import List
+from app.services.executor import analysis_executor
+from app.services.metrics import CONTENT_TYPE, Counter, Gauge, Metric, registry
+from app.services.result_cache import result_cache
+from app.services.scheduler import scheduler
+from app.services.write_queue import write_queue
+
+router = APIRouter()
+
+def _component_metrics() -> List[Metric]:
+    """
+    Counters the cache, write queue, executor and scheduler already keep, as metric families.
+    """
+    cache_stats = result_cache.stats()
+    cache_requests = Counter("neurodesk_result_cache_requests_total", "Result cache lookups by outcome", ("result",))
+    cache_requests.inc("hit", amount=cache_stats.get("hits", 0))
+    cache_requests.inc("miss", amount=cache_stats.get("misses", 0))
+    cache_evictions = Counter("neurodesk_result_cache_evictions_total", "Result cache entries evicted")
+    cache_evictions.inc(amount=cache_stats.get("evictions", 0))
+    cache_entries = Gauge("neurodesk_result_cache_entries", "Entries in the result cache")
+    cache_entries.set(cache_stats.get("entries", 0))
+    cache_bytes = Gauge("neurodesk_result_cache_bytes", "Approximate size of the result cache")
+    cache_bytes.set(cache_stats.get("bytes", 0))
+
+    write_batches = Counter("neurodesk_write_queue_batches_total", "Transactions committed by the write queue")
+    write_batches.inc(amount=write_queue.batches)
+    writes = Counter("neurodesk_write_queue_writes_total", "Write operations committed by the write queue")
+    writes.inc(amount=write_queue.writes)
+    write_pending = Gauge("neurodesk_write_queue_pending", "Writes waiting for the write queue")
+    write_pending.set(write_queue.pending)
+
+    executor_workers = Gauge("neurodesk_analysis_executor_workers", "Analysis pool size by executor mode", ("mode",))
+    executor_workers.set(analysis_executor.max_workers if analysis_executor.mode != "inline" else 0, analysis_executor.mode)
+
+    job_runs = Counter("neurodesk_job_runs_total", "Background job runs", ("job",))
+    job_failures = Counter("neurodesk_job_failures_total", "Background job runs that failed", ("job",))
+    job_skipped = Counter("neurodesk_job_skipped_total", "Background job runs skipped because the previous one was still running", ("job",))
+    job_duration = Gauge("neurodesk_job_last_duration_seconds", "Duration of each background job's last run", ("job",))
+    job_running = Gauge("neurodesk_job_running", "Whether a background job is running", ("job",))
+    for name, stats in scheduler.stats().items():
+        job_runs.inc(name, amount=stats["runs"])
+        job_failures.inc(name, amount=stats["failures"])
+        job_skipped.inc(name, amount=stats["skipped"])
+        job_running.set(int(stats["running"]), name)
+        if stats["last_duration"] is not None:
+            job_duration.set(stats["last_duration"], name)
+
+    return [
+        cache_requests, cache_evictions, cache_entries, cache_bytes,
+        write_batches, writes, write_pending, executor_workers,
+        job_runs, job_failures, job_skipped, job_duration, job_running,
+    ]
+
+registry.add_collector(_component_metrics)
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition of request, analysis stage and component metrics.
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
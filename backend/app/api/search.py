@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from app.database import get_async_db
+from app.models.task import TaskCategory, TaskEnergy
+from app.services.search import MAX_RESULTS, SearchUnavailable, search
+
+router = APIRouter()
+
+@router.get("/search")
+async def search_history(
+    user_id: str,
+    q: str = Query(..., min_length=1),
+    category: Optional[TaskCategory] = None,
+    energy: Optional[TaskEnergy] = None,
+    kind: Optional[Literal["task", "brain_dump"]] = None,
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search a user's tasks and brain dumps. Results are ranked by relevance, with
+    the matched words wrapped in <mark> in the HTML-escaped title and body snippet.
+    Category and energy filters only match tasks.
+    """
+    try:
+        results = await search(
+            db,
+            user_id,
+            q,
+            category=category.value if category else None,
+            energy=energy.value if energy else None,
+            kind=kind,
+            limit=limit
+        )
+        return {"results": results}
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching: {str(e)}"
+        )
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
+import time
+from app.database import get_async_db
+from app.services.aggregates import day_of, get_day, summarize_day
+from app.services.storage import InvalidCursor, decode_cursor, latest_summary, save_summary, summary_history
+from app.services.write_queue import write_queue
 
 router = APIRouter()
 
@@ -22,32 +27,38 @@ class SummaryResponse(BaseModel):
     productivity_score: float
 
 @router.post("/generate-summary", response_model=SummaryResponse)
-async def generate_summary(request: SummaryRequest):
+async def generate_summary(request: SummaryRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Generate a daily summary with insights and recommendations.
+    Scores come from the user's precomputed daily aggregate row (UTC day). A summary
+    of the same parts (tasks, emotions) stored since the day's last change (e.g. a
+    full one by the nightly precomputation job) is returned as is.
     """
     try:
-        # TODO: Implement actual summary generation
-        # For now, return a mock summary
+        day = request.date[:10] if request.date else day_of(time.time())
+        aggregate = await get_day(db, request.user_id, day)
+        
+        stored = await latest_summary(db, request.user_id, day, request.include_tasks, request.include_emotions)
+        if stored is not None and (aggregate is None or stored.created_at >= aggregate.updated_at):
+            return SummaryResponse(
+                id=str(stored.id),
+                date=stored.date,
+                summary_text=stored.summary_text,
+                insights=stored.insights,
+                recommendations=stored.recommendations,
+                mood_score=stored.mood_score,
+                productivity_score=stored.productivity_score
+            )
         
         summary = SummaryResponse(
             id="summary_1",
-            date=request.date or datetime.now().isoformat()[:10],
-            summary_text="You had a productive day with 5 tasks completed and 3 hours of focused work. Your mood was generally positive with some moments of stress.",
-            insights=[
-                "You're most productive in the morning hours",
-                "Tasks with clear deadlines get completed faster",
-                "Taking breaks helps maintain focus throughout the day"
-            ],
-            recommendations=[
-                "Schedule important tasks for your peak energy hours",
-                "Consider breaking down larger tasks into smaller chunks",
-                "Take a 5-minute break every 25 minutes of focused work"
-            ],
-            mood_score=0.75,
-            productivity_score=0.8
+            date=day,
+            **summarize_day(aggregate, include_tasks=request.include_tasks, include_emotions=request.include_emotions)
         )
         
+        record = await write_queue.submit(save_summary, request.user_id, summary, request.include_tasks, request.include_emotions)
+        summary.id = str(record.id)
+        
         return summary
         
     except Exception as e:
@@ -57,16 +68,19 @@ async def generate_summary(request: SummaryRequest):
         )
 
 @router.get("/summary/history")
-async def get_summary_history(user_id: str, limit: int = 7):
+async def get_summary_history(user_id: str, limit: int = 7, before: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
-    Get summary history for a user.
+    Get summary history for a user, newest first.
+    Pass the returned next_cursor as ?before= to fetch the next page.
     """
     try:
-        # TODO: Implement summary history retrieval
-        return {
-            "summaries": [],
-            "total_count": 0
-        }
+        if before is not None:
+            decode_cursor(before)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return await summary_history(db, user_id, limit, before)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from app.models.task import BulkTaskRequest, TaskUpdate
+from app.services.storage import MAX_BULK_TASKS, BulkConflict, TaskNotFound, VersionConflict, bulk_tasks, update_task
+from app.services.write_queue import write_queue
+
+router = APIRouter()
+
+def _changes(fields: BaseModel) -> Dict[str, Any]:
+    changes = fields.model_dump(exclude_unset=True, exclude={"id", "version"}, mode="json")
+    if "due_date" in changes:
+        changes["due_date"] = fields.due_date.timestamp() if fields.due_date else None
+    return changes
+
+@router.patch("/tasks/{task_id}")
+async def patch_task(task_id: int, user_id: str, update: TaskUpdate, version: Optional[int] = None):
+    """
+    Update a saved task, e.g. mark it completed or log focus minutes.
+    The user's daily aggregates are adjusted in the same transaction.
+    With `version`, the update fails with 409 if the task changed since.
+    """
+    try:
+        return await write_queue.submit(update_task, user_id, task_id, _changes(update), version)
+    except TaskNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error updating task: {str(e)}"
+        )
+
+@router.post("/tasks/bulk")
+async def bulk_update_tasks(user_id: str, request: BulkTaskRequest):
+    """
+    Create, update and delete many tasks in one request and one transaction,
+    e.g. the cards moved during one drag session on the task deck.
+    Every item gets a result (ok, not_found, or conflict with the current
+    version); with `atomic`, any failed item fails the request with 409 and
+    the other items come back "rolled_back" with their unchanged version.
+    """
+    total = len(request.create) + len(request.update) + len(request.delete)
+    if total > MAX_BULK_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TASKS} tasks per request")
+
+    try:
+        return await write_queue.submit(
+            bulk_tasks,
+            user_id,
+            [_changes(fields) for fields in request.create],
+            [(patch.id, patch.version, _changes(patch)) for patch in request.update],
+            [(item.id, item.version) for item in request.delete],
+            request.atomic
+        )
+    except BulkConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "results": e.results})
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error updating tasks: {str(e)}"
+        )
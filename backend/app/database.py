@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +11,45 @@ load_dotenv()
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./neurodesk.db")
 
+# Async drivers for the request path; override with ASYNC_DATABASE_URL for other backends
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def _async_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+IS_SQLITE = ASYNC_DATABASE_URL.startswith("sqlite")
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# SQLite tuning applied to every new connection. WAL lets readers run while the
+# writer commits; synchronous=NORMAL only fsyncs at WAL checkpoints, which is safe
+# against corruption (a power cut can lose the last commits, not the database).
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
@@ -18,6 +59,52 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API; its pool is shared by all requests. The pool
+# class is explicit because aiosqlite would otherwise open a connection per checkout.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# SQLite allows one writer at a time, so writes get a dedicated single connection
+# and queue for it instead of failing with "database is locked" under load
+if IS_SQLITE:
+    async_write_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+else:
+    async_write_engine = async_engine
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+if IS_SQLITE:
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_write_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+    # The write queue wraps each operation in a SAVEPOINT. The sqlite3 driver only
+    # opens a transaction before DML, so a SAVEPOINT would start (and its RELEASE
+    # commit) one of its own: hand transaction control to SQLAlchemy instead
+    @event.listens_for(async_write_engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(async_write_engine.sync_engine, "begin")
+    def _begin_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
@@ -27,4 +114,22 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Async dependencies: readers share the pool, writers use the write engine
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_write_db():
+    async with AsyncWriteSessionLocal() as db:
+        yield db
+
+async def init_db():
+    async with async_write_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+async def dispose_engines():
+    await async_engine.dispose()
+    if async_write_engine is not async_engine:
+        await async_write_engine.dispose()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -30,6 +30,9 @@ class TaskCreate(BaseModel):
     due_date: Optional[datetime] = None
     tags: List[str] = []
 
+# Fields an update may clear with an explicit null; the others are required columns
+CLEARABLE_TASK_FIELDS = {"description", "due_date"}
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -42,7 +45,33 @@ class TaskUpdate(BaseModel):
     is_avoidance: Optional[bool] = None
     emotion_score: Optional[float] = None
 
-class TaskResponse(BaseModel):
+    @model_validator(mode="after")
+    def no_null_required_fields(self) -> "TaskUpdate":
+        nulls = sorted(
+            name for name in self.model_fields_set - CLEARABLE_TASK_FIELDS
+            if name in TaskUpdate.model_fields and getattr(self, name) is None
+        )
+        if nulls:
+            raise ValueError(f"{', '.join(nulls)} cannot be null")
+        return self
+
+class TaskPatch(TaskUpdate):
+    id: int
+    # The version the client last saw; the patch is refused if the task changed since
+    version: Optional[int] = None
+
+class TaskDelete(BaseModel):
+    id: int
+    version: Optional[int] = None
+
+class BulkTaskRequest(BaseModel):
+    create: List[TaskCreate] = []
+    update: List[TaskPatch] = []
+    delete: List[TaskDelete] = []
+    # All or nothing: any failed item leaves every task untouched
+    atomic: bool = False
+
+class TaskFields(BaseModel):
     id: str
     title: str
     description: Optional[str] = None
@@ -56,7 +85,20 @@ class TaskResponse(BaseModel):
     tags: List[str] = []
     is_avoidance: bool = False
     emotion_score: float = 0.0
-    original_brain_dump: Optional[str] = None
+    # Set when the task repeats one of the user's open tasks: its ID, and whether
+    # the task was merged into it instead of being saved separately
+    duplicate_of: Optional[str] = None
+    merged: bool = False
+    version: int = 1
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class TaskResponse(TaskFields):
+    original_brain_dump: Optional[str] = None
+
+class CompactTaskResponse(TaskFields):
+    # Reference into the brain dump sent once alongside the tasks
+    brain_dump_id: str
+    line: int
+    span: List[int]  # [start, end) character offsets of the title in the dump text
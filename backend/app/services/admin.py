@@ -0,0 +1,14 @@
+import hmac
+import os
+from typing import Optional
+
+# Shared secret for admin-only operations, sent as the X-Admin-Token header:
+# on-demand profiling, manual job runs and lexicon reloads. Unset disables them.
+# (PROFILE_ADMIN_TOKEN is still read, from when it only guarded profiling.)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or os.getenv("PROFILE_ADMIN_TOKEN", "")
+
+def is_admin(token: Optional[str], admin_token: str = ADMIN_TOKEN) -> bool:
+    """
+    Whether a request's X-Admin-Token matches the configured token (compared in constant time).
+    """
+    return bool(admin_token) and token is not None and hmac.compare_digest(token.encode(), admin_token.encode())
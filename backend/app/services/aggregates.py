@@ -0,0 +1,159 @@
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.emotion import EmotionResponse, EmotionType
+from app.tables import DailyAggregateRecord
+
+# How pleasant each primary emotion is, from -1 to 1; a reading adds its primary emotion's
+# valence to mood_sum (confidence is keyword density, too small to weight by)
+EMOTION_VALENCE = {
+    EmotionType.joy: 1.0,
+    EmotionType.surprise: 0.3,
+    EmotionType.neutral: 0.0,
+    EmotionType.stressed: -0.5,
+    EmotionType.anxious: -0.6,
+    EmotionType.disgust: -0.6,
+    EmotionType.sadness: -0.7,
+    EmotionType.fear: -0.7,
+    EmotionType.anger: -0.8,
+    EmotionType.overwhelmed: -0.9,
+}
+
+ENERGY_LEVELS = ("low", "medium", "high")
+
+# A day with this many completed focus minutes counts as fully focused
+FOCUS_TARGET_MINUTES = 240
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+Deltas = Dict[str, Dict[str, float]]  # day -> column -> increment
+
+class TaskState(NamedTuple):
+    # The task fields the daily aggregates depend on
+    created_at: float
+    energy: str
+    status: str
+    completed_at: Optional[float]
+    focus_minutes: int
+    is_avoidance: bool
+
+def day_of(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+def _add(deltas: Deltas, day: str, **columns: float) -> None:
+    row = deltas.setdefault(day, {})
+    for column, value in columns.items():
+        row[column] = row.get(column, 0) + value
+
+def _task_contribution(deltas: Deltas, task: TaskState, sign: int) -> None:
+    created = {"tasks_created": sign, "avoidance_tasks": sign * int(task.is_avoidance)}
+    if task.energy in ENERGY_LEVELS:
+        created[f"tasks_created_{task.energy}"] = sign
+    _add(deltas, day_of(task.created_at), **created)
+
+    if task.status == "completed" and task.completed_at is not None:
+        completed = {"tasks_completed": sign, "focus_minutes": sign * task.focus_minutes}
+        if task.energy in ENERGY_LEVELS:
+            completed[f"tasks_completed_{task.energy}"] = sign
+        _add(deltas, day_of(task.completed_at), **completed)
+
+def task_deltas(before: Optional[TaskState], after: Optional[TaskState], deltas: Optional[Deltas] = None) -> Deltas:
+    """
+    Counter changes for a task write: its contribution after the write minus its
+    contribution before (None for a created or deleted task). Touches at most the
+    creation and completion days, whatever the size of the history.
+    """
+    deltas = {} if deltas is None else deltas
+    if before is not None:
+        _task_contribution(deltas, before, -1)
+    if after is not None:
+        _task_contribution(deltas, after, 1)
+    return deltas
+
+def emotion_deltas(emotion_reading: EmotionResponse, timestamp: float, deltas: Optional[Deltas] = None) -> Deltas:
+    deltas = {} if deltas is None else deltas
+    _add(
+        deltas,
+        day_of(timestamp),
+        emotion_readings=1,
+        mood_sum=EMOTION_VALENCE.get(emotion_reading.primary_emotion, 0.0),
+        overwhelm_count=int(emotion_reading.is_overwhelm_detected)
+    )
+    return deltas
+
+async def apply_deltas(db: AsyncSession, user_id: str, deltas: Deltas) -> None:
+    """
+    Add the deltas to the user's daily rows with one upsert per touched day
+    (INSERT ... ON CONFLICT DO UPDATE SET column = column + increment).
+    """
+    dialect_insert = _UPSERT_DIALECTS[db.bind.dialect.name]
+    table = DailyAggregateRecord.__table__
+    now = time.time()
+
+    for day, columns in deltas.items():
+        columns = {column: value for column, value in columns.items() if value}
+        if not columns:
+            continue
+        statement = dialect_insert(table).values(user_id=user_id, day=day, updated_at=now, **columns)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={
+                **{column: table.c[column] + statement.excluded[column] for column in columns},
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        await db.execute(statement)
+
+async def get_day(db: AsyncSession, user_id: str, day: str) -> Optional[DailyAggregateRecord]:
+    return await db.get(DailyAggregateRecord, (user_id, day))
+
+def summarize_day(aggregate: Optional[DailyAggregateRecord], include_tasks: bool = True, include_emotions: bool = True) -> Dict[str, Any]:
+    """
+    Scores, summary text, insights and recommendations from one day's counters.
+    """
+    created = aggregate.tasks_created if aggregate else 0
+    completed = aggregate.tasks_completed if aggregate else 0
+    focus_minutes = aggregate.focus_minutes if aggregate else 0
+    readings = aggregate.emotion_readings if aggregate else 0
+
+    # Mood: average valence mapped from [-1, 1] to [0, 1]; neutral without readings
+    mood_score = (aggregate.mood_sum / readings + 1) / 2 if readings else 0.5
+    completion_rate = completed / max(created, completed) if completed else 0.0
+    productivity_score = 0.7 * completion_rate + 0.3 * min(1.0, focus_minutes / FOCUS_TARGET_MINUTES)
+
+    parts: List[str] = []
+    insights: List[str] = []
+    recommendations: List[str] = []
+
+    if include_tasks:
+        parts.append(f"You captured {created} tasks and completed {completed}, with {focus_minutes} minutes of focused work.")
+        if aggregate and completed:
+            by_energy = {level: getattr(aggregate, f"tasks_completed_{level}") for level in ENERGY_LEVELS}
+            busiest = max(by_energy, key=by_energy.get)
+            insights.append(f"Most of the tasks you completed were {busiest}-energy tasks")
+        if created > completed and created:
+            recommendations.append("Consider breaking down larger tasks into smaller chunks")
+        if aggregate and aggregate.avoidance_tasks:
+            insights.append(f"{aggregate.avoidance_tasks} of today's tasks show signs of avoidance")
+            recommendations.append("Pick one avoided task and spend just 5 minutes on it")
+        if focus_minutes < FOCUS_TARGET_MINUTES / 2:
+            recommendations.append("Schedule important tasks for your peak energy hours")
+
+    if include_emotions:
+        if readings:
+            mood = "generally positive" if mood_score >= 0.6 else "mixed" if mood_score >= 0.4 else "under strain"
+            parts.append(f"Your mood was {mood} across {readings} check-ins.")
+        else:
+            parts.append("No mood check-ins were recorded today.")
+        if aggregate and aggregate.overwhelm_count:
+            insights.append(f"Overwhelm was detected {aggregate.overwhelm_count} times")
+            recommendations.append("Take a 5-minute break every 25 minutes of focused work")
+
+    return {
+        "summary_text": " ".join(parts),
+        "insights": insights,
+        "recommendations": recommendations,
+        "mood_score": round(mood_score, 4),
+        "productivity_score": round(productivity_score, 4),
+    }
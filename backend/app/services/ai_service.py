@@ -1,71 +1,232 @@
+import hashlib
 import time
 import re
-from typing import List, Optional
-from app.models.task import TaskCreate, TaskResponse
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from app.models.task import TaskResponse
 from app.models.emotion import EmotionResponse, EmotionType
 from app.services.emotion_detector import EmotionDetector
+from app.services.executor import analysis_executor
+from app.services.lexicon import Lexicon, LexiconHits, lexicon_registry
+from app.services.metrics import observe_input, observe_lines, stage
+from app.services.result_cache import ResultCache, result_cache
+from app.services.tokenizer import iter_lines, tokenize
+from app.services.tracing import span, timed
+
+class ScannedLine(NamedTuple):
+    number: int
+    start: int  # offset of the stripped line in the dump
+    text: str
+    hits: LexiconHits
+
+class TaskSource(NamedTuple):
+    # Where a task's title came from in the dump: line number and [start, end) offsets
+    line: int
+    start: int
+    end: int
 
 class BrainDumpResult:
-    def __init__(self, tasks: List[TaskResponse], emotion_reading: Optional[EmotionResponse], processing_time: float):
+    def __init__(self, tasks: List[TaskResponse], emotion_reading: Optional[EmotionResponse], processing_time: float, task_sources: Optional[List[TaskSource]] = None):
         self.tasks = tasks
         self.emotion_reading = emotion_reading
         self.processing_time = processing_time
+        self.task_sources = task_sources or []
+
+def brain_dump_id(text: str) -> str:
+    """
+    Stable content-derived ID for a brain dump text.
+    """
+    return "dump_" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def restamped(tasks: List[TaskResponse]) -> List[TaskResponse]:
+    """
+    Copies of cached tasks created now, so a cache hit carries the same
+    timestamps as a fresh analysis (the cached tasks themselves are shared).
+    """
+    now = time.time()
+    return [task.model_copy(update={"created_at": now}) for task in tasks]
+
+def _clean_title(line: str) -> str:
+    return re.sub(r'^[-•*]\s*', '', line)
 
 class AIService:
-    def __init__(self):
-        self.emotion_detector = EmotionDetector()
+    def __init__(self, lexicon: Optional[Lexicon] = None, cache: Optional[ResultCache] = None):
+        self.lexicon = lexicon or lexicon_registry.current
+        self.cache = cache if cache is not None else result_cache
+        self.emotion_detector = EmotionDetector(self.lexicon, self.cache)
+    
+    def __reduce__(self):
+        # Process pool workers rebuild their own shared service for the same lexicon version
+        return (_restore_ai_service, (self.lexicon.version,))
     
     async def process_brain_dump(self, text: str) -> BrainDumpResult:
         """
         Process brain dump text and extract tasks and emotions.
+        Identical resubmissions are served from the result cache; large dumps are
+        analysed on the analysis executor so they do not stall the event loop.
         """
         start_time = time.time()
+        observe_input("brain_dump", text)
+        
+        with span("brain_dump.process", text_length=len(text)) as current:
+            cache_key = self.cache.key("brain_dump", text, self.lexicon.version)
+            cached = self.cache.get(cache_key)
+            current.set("cache_hit", cached is not None)
+            if cached is not None:
+                current.set("task_count", len(cached.tasks))
+                return BrainDumpResult(restamped(cached.tasks), cached.emotion_reading, time.time() - start_time, cached.task_sources)
+            
+            current.set("offloaded", analysis_executor.should_offload(len(text)))
+            tasks, emotion_reading, task_sources = await analysis_executor.run(len(text), self.analyze_brain_dump, text)
+            current.set("task_count", len(tasks))
+            
+            processing_time = time.time() - start_time
+            
+            result = BrainDumpResult(tasks, emotion_reading, processing_time, task_sources)
+            self._cache_result(cache_key, text, result)
+            
+            return result
+    
+    def _cache_result(self, cache_key: str, text: str, result: BrainDumpResult) -> None:
+        # Titles and the echoed dump dominate the footprint of a result
+        self.cache.set(cache_key, result, size=2 * len(text) + 512 * (len(result.tasks) + 1))
+    
+    def analyze_brain_dump(self, text: str) -> Tuple[List[TaskResponse], Optional[EmotionResponse], List[TaskSource]]:
+        """
+        Synchronous, uncached analysis of a brain dump.
+        """
+        # Scan every line once; the same hits classify the tasks and, merged, the emotions
+        with stage("scan"), span("brain_dump.split", text_length=len(text)) as current:
+            lines = self._scan_lines(text)
+            current.set("line_count", len(lines))
+        observe_lines(len(lines))
         
         # Extract tasks from text
-        tasks = self._extract_tasks(text)
+        tasks = []
+        task_sources = []
+        with stage("task_extraction"), span("brain_dump.classify", line_count=len(lines)) as current:
+            # Per-line steps are timed in total, as span attributes, only when traced
+            timings: Optional[Dict[str, float]] = {} if current.recording else None
+            for task, source in self._iter_tasks(text, lines, timings):
+                tasks.append(task)
+                task_sources.append(source)
+            current.set("task_count", len(tasks))
+            if timings is not None:
+                current.update({f"{step}_ms": round(seconds * 1000, 3) for step, seconds in timings.items()})
+        
+        # Detect emotions (timed as a stage by the detector)
+        dump_hits = self.lexicon.merge(line.hits for line in lines)
+        emotion_reading = self.emotion_detector.analyze(text, hits=dump_hits)
+        
+        return tasks, emotion_reading, task_sources
+    
+    def stream_brain_dump(self, text: str) -> Iterator[Tuple[str, Any, Optional[TaskSource]]]:
+        """
+        Lazily analyse a brain dump line by line. Yields ("task", TaskResponse, TaskSource)
+        as soon as each line is classified, then a final ("emotion_reading", EmotionResponse, None)
+        computed from the keyword hits accumulated along the way.
+        Shares the result cache with process_brain_dump: a cached result is replayed,
+        and a stream read to the end caches its result.
+        """
+        start_time = time.time()
+        observe_input("brain_dump", text)
+        cache_key = self.cache.key("brain_dump", text, self.lexicon.version)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            for task, source in zip(restamped(cached.tasks), cached.task_sources):
+                yield "task", task, source
+            yield "emotion_reading", cached.emotion_reading, None
+            return
+        
+        keyword_ids: Set[int] = set()
+        word_count = 0
+        line_count = 0
         
-        # Detect emotions
-        emotion_reading = await self.emotion_detector.detect_emotion(text)
+        def accumulate(lines: Iterable[ScannedLine]) -> Iterator[ScannedLine]:
+            nonlocal word_count, line_count
+            for line in lines:
+                keyword_ids.update(line.hits.keyword_ids)
+                word_count += line.hits.word_count
+                line_count += 1
+                yield line
         
-        processing_time = time.time() - start_time
+        tasks: List[TaskResponse] = []
+        task_sources: List[TaskSource] = []
+        for task, source in self._iter_tasks(text, accumulate(self._iter_lines(text))):
+            tasks.append(task)
+            task_sources.append(source)
+            yield "task", task, source
+        observe_lines(line_count)
         
-        return BrainDumpResult(tasks, emotion_reading, processing_time)
+        emotion_reading = self.emotion_detector.analyze(text, hits=self.lexicon.tally(keyword_ids, word_count))
+        self._cache_result(cache_key, text, BrainDumpResult(tasks, emotion_reading, time.time() - start_time, task_sources))
+        yield "emotion_reading", emotion_reading, None
+    
+    def _iter_lines(self, text: str) -> Iterator[ScannedLine]:
+        """
+        Lazily split text into stripped lines, tokenize each line once and scan its
+        tokens with the lexicon matcher.
+        """
+        for number, (start, _, line) in enumerate(iter_lines(text)):
+            stripped = line.lstrip()
+            start += len(line) - len(stripped)
+            stripped = stripped.rstrip()
+            yield ScannedLine(number, start, stripped, self.lexicon.scan(tokenize(stripped)))
+    
+    def _scan_lines(self, text: str) -> List[ScannedLine]:
+        return list(self._iter_lines(text))
     
-    def _extract_tasks(self, text: str) -> List[TaskResponse]:
+    def _extract_tasks(self, text: str, lines: Optional[List[ScannedLine]] = None) -> List[TaskResponse]:
         """
         Extract tasks from brain dump text using simple NLP rules.
         In a real implementation, this would use more sophisticated NLP.
         """
-        tasks = []
-        
         # Split text into lines
-        lines = text.split('\n')
+        if lines is None:
+            lines = self._scan_lines(text)
+        
+        return [task for task, _ in self._iter_tasks(text, lines)]
+    
+    def _iter_tasks(self, text: str, lines: Iterable[ScannedLine], timings: Optional[Dict[str, float]] = None) -> Iterator[Tuple[TaskResponse, TaskSource]]:
+        """
+        Classify scanned lines into tasks one at a time. With `timings`, the time
+        spent in each classification step is added up there (seconds by step).
+        """
+        task_count = 0
+        clean_title = _clean_title
+        determine_energy_level = self._determine_energy_level
+        determine_category = self._determine_category
+        detect_avoidance = self._detect_avoidance
+        if timings is not None:
+            clean_title = timed(clean_title, timings, "cleanup")
+            determine_energy_level = timed(determine_energy_level, timings, "energy")
+            determine_category = timed(determine_category, timings, "category")
+            detect_avoidance = timed(detect_avoidance, timings, "avoidance")
         
-        for line in lines:
-            line = line.strip()
+        for number, start, line, hits in lines:
             if not line:
                 continue
             
             # Remove common prefixes
-            line = re.sub(r'^[-•*]\s*', '', line)
+            title = clean_title(line)
             
             # Skip if line is too short
-            if len(line) < 3:
+            if len(title) < 3:
                 continue
             
             # Determine energy level based on keywords
-            energy = self._determine_energy_level(line)
+            energy = determine_energy_level(hits)
             
             # Determine category based on keywords
-            category = self._determine_category(line)
+            category = determine_category(hits)
             
             # Check for avoidance patterns
-            is_avoidance = self._detect_avoidance(line)
+            is_avoidance = detect_avoidance(hits)
             
-            # Create task
-            task = TaskResponse(
-                id=f"task_{len(tasks) + 1}",
-                title=line,
+            # Create task; every field is built here, so skip per-task validation
+            task_count += 1
+            task = TaskResponse.model_construct(
+                id=f"task_{task_count}",
+                title=title,
                 description=None,
                 energy=energy,
                 status="todo",
@@ -77,34 +238,21 @@ class AIService:
                 tags=[],
                 is_avoidance=is_avoidance,
                 emotion_score=0.0,
+                duplicate_of=None,
+                merged=False,
                 original_brain_dump=text
             )
             
-            tasks.append(task)
-        
-        return tasks
+            # The title is the tail of the stripped line once the prefix is removed
+            yield task, TaskSource(number, start + len(line) - len(title), start + len(line))
     
-    def _determine_energy_level(self, text: str) -> str:
+    def _determine_energy_level(self, hits: LexiconHits) -> str:
         """
         Determine energy level based on keywords in the text.
         """
-        text_lower = text.lower()
-        
-        # High energy keywords
-        high_energy_words = [
-            'urgent', 'important', 'deadline', 'meeting', 'presentation',
-            'project', 'report', 'analysis', 'research', 'study'
-        ]
-        
-        # Low energy keywords
-        low_energy_words = [
-            'maybe', 'sometime', 'eventually', 'later', 'when i have time',
-            'if possible', 'optional', 'nice to have', 'relax', 'rest'
-        ]
-        
         # Count matches
-        high_count = sum(1 for word in high_energy_words if word in text_lower)
-        low_count = sum(1 for word in low_energy_words if word in text_lower)
+        high_count = hits.count('energy', 'high')
+        low_count = hits.count('energy', 'low')
         
         if high_count > low_count:
             return "high"
@@ -113,35 +261,34 @@ class AIService:
         else:
             return "medium"
     
-    def _determine_category(self, text: str) -> str:
+    def _determine_category(self, hits: LexiconHits) -> str:
         """
         Determine task category based on keywords.
         """
-        text_lower = text.lower()
-        
-        categories = {
-            'work': ['work', 'job', 'office', 'meeting', 'project', 'report', 'email'],
-            'personal': ['personal', 'family', 'home', 'house', 'clean'],
-            'health': ['exercise', 'workout', 'gym', 'health', 'doctor', 'medical'],
-            'learning': ['learn', 'study', 'course', 'book', 'read', 'practice'],
-            'social': ['friend', 'family', 'call', 'visit', 'party', 'social']
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for category in self.lexicon.category_keywords:
+            if hits.count('category', category):
                 return category
         
         return "other"
     
-    def _detect_avoidance(self, text: str) -> bool:
+    def _detect_avoidance(self, hits: LexiconHits) -> bool:
         """
         Detect avoidance patterns in the text.
         """
-        text_lower = text.lower()
-        
-        avoidance_patterns = [
-            'avoid', 'procrastinate', 'put off', 'delay', 'postpone',
-            'maybe later', 'not sure', 'uncertain', 'hesitate'
-        ]
-        
-        return any(pattern in text_lower for pattern in avoidance_patterns) 
\ No newline at end of file
+        return hits.count('avoidance', True) > 0
+
+_shared_ai_service: Optional[AIService] = None
+
+def _restore_ai_service(lexicon_version: str) -> AIService:
+    lexicon_registry.ensure(lexicon_version)
+    return get_ai_service()
+
+def get_ai_service() -> AIService:
+    """
+    Shared AIService bound to the active lexicon; rebuilt only after a lexicon reload.
+    """
+    global _shared_ai_service
+    service = _shared_ai_service
+    if service is None or service.lexicon is not lexicon_registry.current:
+        service = _shared_ai_service = AIService(lexicon_registry.current)
+    return service
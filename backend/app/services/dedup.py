@@ -0,0 +1,298 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.tokenizer import TOKEN_PATTERN, normalize_token
+from app.tables import TaskRecord
+
+# What happens to a new task whose title nearly repeats one of the user's open
+# tasks: "merge" folds it into the open task (one more mention), "flag" stores it
+# with duplicate_of pointing at the open task, "off" disables detection
+DEDUP_MODES = ("merge", "flag", "off")
+DEDUP_MODE = os.getenv("TASK_DEDUP_MODE", "merge")
+if DEDUP_MODE not in DEDUP_MODES:
+    raise ValueError(f"Unknown TASK_DEDUP_MODE: {DEDUP_MODE}")
+
+# Minimum (estimated) Jaccard similarity of the titles' character shingles
+DEDUP_THRESHOLD = float(os.getenv("TASK_DEDUP_THRESHOLD", "0.6"))
+
+# Users whose index stays in memory; others are rebuilt from the database on their next dump
+DEDUP_INDEX_USERS = int(os.getenv("TASK_DEDUP_INDEX_USERS", "1000"))
+
+OPEN_STATUSES = ("todo", "in_progress")
+
+# Words that change nothing about what a task is ("call mom" = "call my mom")
+STOPWORDS = frozenset("a an and at for in my of on our the to with".split())
+
+SHINGLE_SIZE = 3
+
+# MinHash signature of BANDS * ROWS values, split into BANDS bands for LSH. Two
+# titles share a band (and become candidates) with probability 1 - (1 - J^ROWS)^BANDS:
+# 94% at J = 0.6, over 99.5% from J = 0.7, 15% at J = 0.3. Four rows per band keep
+# titles that only share a common word ("call ...", "email ...") out of each
+# other's buckets. Candidates are then checked by comparing full signatures, whose
+# share of equal values estimates the Jaccard similarity (standard error ~0.05).
+BANDS = 20
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+
+# Titles fingerprinted per numpy pass
+_BATCH = 2048
+
+# Dumps with at least this many titles are fingerprinted and matched on a thread
+OFFLOAD_TITLES = 256
+
+# Per-permutation hashes of the 32-bit shingle hashes: (a * x + b) mod 2^32 with
+# odd a (a bijection, so a random permutation of shingle hashes), then an xorshift
+# so the minimum does not follow the low bits of x. Plain 32-bit numpy arithmetic,
+# several times faster than hashing modulo a prime. The same seeded multipliers
+# fold each band's ROWS values into one bucket key. Shingles use Python's string
+# hash: indexes live in one process and are rebuilt from the titles, so signatures
+# never need to match across processes.
+_permutations = np.random.RandomState(20240101)
+_A = _permutations.randint(0, 1 << 31, NUM_PERM).astype(np.uint32) * np.uint32(2) + np.uint32(1)
+_B = _permutations.randint(0, 1 << 31, NUM_PERM).astype(np.uint32)
+_BAND_MULTIPLIERS = (_permutations.randint(1, 1 << 62, (BANDS, ROWS), dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+_MASK = (1 << 32) - 1
+
+class Fingerprint(NamedTuple):
+    signature: bytes  # NUM_PERM little-endian uint32 minimums
+    bands: Tuple[int, ...]  # one bucket key per band
+
+class Duplicate(NamedTuple):
+    task_id: int  # the open task the new one repeats
+    merged: bool  # folded into it rather than stored separately
+
+def normalize_title(title: str) -> str:
+    words = (normalize_token(word) for word in TOKEN_PATTERN.findall(title))
+    return " ".join(word for word in words if word not in STOPWORDS)
+
+def shingles(title: str) -> Set[int]:
+    text = normalize_title(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {hash(text) & _MASK} if text else set()
+    return {hash(text[i:i + SHINGLE_SIZE]) & _MASK for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+def fingerprint_many(titles: List[str]) -> List[Optional[Fingerprint]]:
+    """
+    MinHash fingerprints of task titles (None for titles without words), computed
+    for a batch of titles at a time in a few numpy passes.
+    """
+    result: List[Optional[Fingerprint]] = []
+    for offset in range(0, len(titles), _BATCH):
+        sets = [shingles(title) for title in titles[offset:offset + _BATCH]]
+        present = [shingle_set for shingle_set in sets if shingle_set]
+        if present:
+            hashes = np.fromiter((value for shingle_set in present for value in shingle_set), dtype=np.uint32)
+            permuted = np.multiply.outer(hashes, _A)
+            permuted += _B
+            permuted ^= permuted >> np.uint32(15)
+            starts = np.cumsum([0] + [len(shingle_set) for shingle_set in present[:-1]])
+            signatures = np.minimum.reduceat(permuted, starts, axis=0)
+            keys = (signatures.reshape(-1, BANDS, ROWS).astype(np.uint64) * _BAND_MULTIPLIERS).sum(axis=2).tolist()
+            fingerprints = iter(zip(signatures.astype("<u4"), keys))
+        for shingle_set in sets:
+            if shingle_set:
+                signature, bands = next(fingerprints)
+                result.append(Fingerprint(signature.tobytes(), tuple(bands)))
+            else:
+                result.append(None)
+    return result
+
+def fingerprint(title: str) -> Optional[Fingerprint]:
+    return fingerprint_many([title])[0]
+
+async def fingerprint_titles(titles: List[str]) -> List[Optional[Fingerprint]]:
+    """
+    fingerprint_many, on a thread for large dumps. Not on the analysis executor:
+    in process mode the shingle hashes would come from another interpreter's
+    string hash and never match the index.
+    """
+    if len(titles) >= OFFLOAD_TITLES:
+        return await asyncio.to_thread(fingerprint_many, titles)
+    return fingerprint_many(titles)
+
+def similarities(fp: Fingerprint, others: List[Fingerprint]) -> np.ndarray:
+    """
+    Estimated Jaccard similarity of fp's title with each of the others.
+    """
+    if not others:
+        return np.zeros(0)
+    mine = np.frombuffer(fp.signature, dtype="<u4")
+    theirs = np.frombuffer(b"".join(other.signature for other in others), dtype="<u4").reshape(len(others), NUM_PERM)
+    return (theirs == mine).mean(axis=1)
+
+class LSHIndex:
+    """
+    Fingerprints of one user's open tasks, bucketed by band. A lookup reads BANDS
+    buckets and compares the few candidates' signatures, so its cost does not
+    grow with the number of tasks. A bucket holds a bare task ID until a second
+    task lands in it, which keeps the common single-entry bucket small.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, Union[int, List[int]]] = {}
+        self.fingerprints: Dict[int, Fingerprint] = {}
+        self.watermark = 0.0  # created_at of the newest task seen
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def add(self, task_id: int, fp: Fingerprint) -> None:
+        self.remove(task_id)
+        self.fingerprints[task_id] = fp
+        buckets = self.buckets
+        for key in fp.bands:
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = task_id
+            elif isinstance(bucket, list):
+                bucket.append(task_id)
+            else:
+                buckets[key] = [bucket, task_id]
+
+    def remove(self, task_id: int) -> None:
+        fp = self.fingerprints.pop(task_id, None)
+        if fp is None:
+            return
+        for key in fp.bands:
+            bucket = self.buckets.get(key)
+            if isinstance(bucket, list):
+                if task_id in bucket:
+                    bucket.remove(task_id)
+                if len(bucket) == 1:
+                    self.buckets[key] = bucket[0]
+            elif bucket == task_id:
+                del self.buckets[key]
+
+    def match(self, fp: Fingerprint, threshold: float = DEDUP_THRESHOLD) -> Optional[int]:
+        """
+        The most similar indexed task with estimated similarity >= threshold, if any.
+        """
+        candidates: Set[int] = set()
+        for key in fp.bands:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            else:
+                candidates.add(bucket)
+        if not candidates:
+            return None
+
+        # Highest similarity wins; ties go to the oldest task
+        ordered = sorted(candidates)
+        scores = similarities(fp, [self.fingerprints[task_id] for task_id in ordered])
+        best = int(np.argmax(scores))
+        return ordered[best] if scores[best] >= threshold else None
+
+    def load(self, rows) -> None:
+        rows = list(rows)
+        fingerprints = fingerprint_many([title if status in OPEN_STATUSES else "" for _, title, status, _ in rows])
+        for (task_id, _, _, created_at), fp in zip(rows, fingerprints):
+            if fp is None:
+                self.remove(task_id)
+            else:
+                self.add(task_id, fp)
+            self.watermark = max(self.watermark, created_at)
+
+class TitleMatch(NamedTuple):
+    indexed: bool  # True: `target` is an indexed task id; False: the position of an earlier title
+    target: int
+
+def match_titles(index: LSHIndex, fingerprints: List[Optional[Fingerprint]]) -> List[Optional[TitleMatch]]:
+    """
+    Match a dump's title fingerprints against the user's open tasks, then against
+    the earlier titles of the same dump. Earlier titles go into a temporary LSH
+    index of their own, so each title costs a few bucket lookups rather than a
+    comparison with every title before it.
+    """
+    dump_index = LSHIndex()
+    matches: List[Optional[TitleMatch]] = []
+    for position, fp in enumerate(fingerprints):
+        match = None
+        if fp is not None:
+            task_id = index.match(fp)
+            if task_id is not None:
+                match = TitleMatch(True, task_id)
+            else:
+                earlier = dump_index.match(fp)
+                if earlier is not None:
+                    match = TitleMatch(False, earlier)
+                else:
+                    # Only titles that are not repeats themselves can be matched later
+                    dump_index.add(position, fp)
+        matches.append(match)
+    return matches
+
+class DuplicateIndex:
+    """
+    Per-user LSH indexes kept in memory for the most recently active users.
+
+    An index is built from the user's open tasks on first use. Each later use
+    first reads the tasks created since the newest one it has seen (an index
+    range scan), so tasks written by another worker are picked up too.
+    """
+
+    def __init__(self, max_users: int = 1000):
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, LSHIndex]" = OrderedDict()
+
+    async def for_user(self, db: AsyncSession, user_id: str) -> LSHIndex:
+        columns = (TaskRecord.id, TaskRecord.title, TaskRecord.status, TaskRecord.created_at)
+        index = self._indexes.get(user_id)
+        if index is None:
+            index = LSHIndex()
+            rows = (await db.execute(
+                select(*columns).where(TaskRecord.user_id == user_id, TaskRecord.status.in_(OPEN_STATUSES))
+            )).all()
+            # Fingerprinting tens of thousands of titles takes seconds: keep it off the event loop
+            await asyncio.to_thread(index.load, rows)
+            newest = await db.scalar(select(func.max(TaskRecord.created_at)).where(TaskRecord.user_id == user_id))
+            index.watermark = max(index.watermark, newest or 0.0)
+            self._indexes[user_id] = index
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        else:
+            # Tasks sharing the watermark timestamp are re-read and simply re-added
+            index.load(await db.execute(
+                select(*columns).where(TaskRecord.user_id == user_id, TaskRecord.created_at >= index.watermark)
+            ))
+            self._indexes.move_to_end(user_id)
+        return index
+
+    def tasks_added(self, user_id: str, tasks: List[Tuple[int, Optional[Fingerprint]]], created_at: float) -> None:
+        """
+        Index tasks just inserted for the user (a no-op when the user's index is not loaded).
+        """
+        index = self._indexes.get(user_id)
+        if index is None:
+            return
+        for task_id, fp in tasks:
+            if fp is not None:
+                index.add(task_id, fp)
+        index.watermark = max(index.watermark, created_at)
+
+    def task_changed(self, user_id: str, task_id: int, title: str, status: str) -> None:
+        """
+        Keep a loaded index in step with an edited task (retitled, completed, reopened).
+        """
+        index = self._indexes.get(user_id)
+        if index is None:
+            return
+        fp = fingerprint(title) if status in OPEN_STATUSES else None
+        if fp is None:
+            index.remove(task_id)
+        else:
+            index.add(task_id, fp)
+
+    def task_removed(self, user_id: str, task_id: int) -> None:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.remove(task_id)
+
+duplicate_index = DuplicateIndex(max_users=DEDUP_INDEX_USERS)
@@ -1,62 +1,90 @@
-import re
-from typing import Dict, Optional
+import numpy as np
+from typing import Dict, List, Optional
 from app.models.emotion import EmotionResponse, EmotionType
+from app.services.executor import analysis_executor
+from app.services.lexicon import Lexicon, LexiconHits, lexicon_registry
+from app.services.metrics import observe_input, stage
+from app.services.result_cache import ResultCache, result_cache
+from app.services.tracing import span
+
+# Weights of the overwhelm score components
+OVERWHELM_EMOTION_WEIGHTS = [
+    (EmotionType.overwhelmed, 0.4),
+    (EmotionType.stressed, 0.3),
+    (EmotionType.anxious, 0.2),
+]
+OVERWHELM_PATTERN_WEIGHT = 0.1
+OVERWHELM_THRESHOLD = 0.7
 
 class EmotionDetector:
-    def __init__(self):
-        # Emotion keywords for rule-based detection
-        self.emotion_keywords = {
-            EmotionType.joy: [
-                'happy', 'excited', 'great', 'wonderful', 'amazing', 'fantastic',
-                'love', 'enjoy', 'pleased', 'satisfied', 'grateful', 'blessed'
-            ],
-            EmotionType.sadness: [
-                'sad', 'depressed', 'down', 'blue', 'melancholy', 'grief',
-                'lonely', 'hopeless', 'disappointed', 'heartbroken'
-            ],
-            EmotionType.anger: [
-                'angry', 'furious', 'mad', 'irritated', 'frustrated', 'annoyed',
-                'rage', 'hate', 'disgusted', 'outraged'
-            ],
-            EmotionType.fear: [
-                'afraid', 'scared', 'terrified', 'anxious', 'worried', 'nervous',
-                'panic', 'dread', 'fearful', 'intimidated'
-            ],
-            EmotionType.surprise: [
-                'surprised', 'shocked', 'amazed', 'astonished', 'stunned',
-                'unexpected', 'sudden', 'unbelievable'
-            ],
-            EmotionType.overwhelmed: [
-                'overwhelmed', 'stressed', 'burdened', 'swamped', 'drowning',
-                'too much', 'can\'t handle', 'exhausted', 'burned out'
-            ],
-            EmotionType.anxious: [
-                'anxious', 'worried', 'concerned', 'uneasy', 'restless',
-                'tense', 'jittery', 'on edge', 'apprehensive'
-            ],
-            EmotionType.stressed: [
-                'stressed', 'pressure', 'tension', 'strained', 'overworked',
-                'under pressure', 'tight deadline', 'crunch time'
-            ]
-        }
+    def __init__(self, lexicon: Optional[Lexicon] = None, cache: Optional[ResultCache] = None):
+        # Emotion keywords for rule-based detection, compiled into the shared lexicon matcher
+        self.lexicon = lexicon or lexicon_registry.current
+        self.cache = cache if cache is not None else result_cache
+        self.emotion_keywords = self.lexicon.emotion_keywords
+        
+        # Lexicon keyword x emotion incidence matrix (and overwhelm phrase indicator) for batch scoring
+        self._emotions = list(self.emotion_keywords)
+        self._emotion_incidence = np.zeros((len(self.lexicon.keywords), len(self._emotions)))
+        self._overwhelm_incidence = np.zeros(len(self.lexicon.keywords))
+        for keyword_id, labels in enumerate(self.lexicon.keyword_labels):
+            for group, label in labels:
+                if group == 'emotion':
+                    self._emotion_incidence[keyword_id, self._emotions.index(label)] = 1.0
+                elif group == 'overwhelm':
+                    self._overwhelm_incidence[keyword_id] = 1.0
+    
+    def __reduce__(self):
+        # Process pool workers rebuild their own shared detector for the same lexicon
+        # version instead of receiving the compiled matcher with every call
+        return (_restore_emotion_detector, (self.lexicon.version,))
     
     async def detect_emotion(self, text: str) -> Optional[EmotionResponse]:
         """
         Detect emotions in text using rule-based approach.
         In production, this would use a pre-trained model like cardiffnlp/twitter-roberta-base-emotion
+        Identical texts are served from the result cache; long texts are analysed off the event loop.
         """
         if not text or len(text.strip()) < 3:
             return None
+        observe_input("emotion", text)
         
-        # Convert to lowercase for matching
-        text_lower = text.lower()
+        cache_key = self.cache.key("emotion", text, self.lexicon.version)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        reading = await analysis_executor.run(len(text), self.analyze, text)
+        self.cache.set(cache_key, reading, size=len(text) + 512)
+        return reading
+    
+    def analyze(self, text: str, hits: Optional[LexiconHits] = None) -> Optional[EmotionResponse]:
+        """
+        Synchronous, uncached emotion analysis. Callers that already scanned the text
+        with the lexicon can pass the hits to skip the rescan.
+        """
+        if not text or len(text.strip()) < 3:
+            return None
+        
+        with stage("emotion_detection"), span("emotion.detect", text_length=len(text), rescan=hits is None) as current:
+            reading = self._analyze(text, hits)
+            current.update({
+                "primary_emotion": reading.primary_emotion.value,
+                "overwhelm_score": reading.overwhelm_score,
+            })
+            return reading
+    
+    def _analyze(self, text: str, hits: Optional[LexiconHits]) -> EmotionResponse:
+        # Tokenize and match keywords on whole words
+        if hits is None:
+            hits = self.lexicon.scan_text(text)
         
         # Count emotion keywords
         emotion_scores = {}
-        total_words = len(text_lower.split())
+        total_words = hits.word_count
         
-        for emotion, keywords in self.emotion_keywords.items():
-            count = sum(1 for keyword in keywords if keyword in text_lower)
+        for emotion in self.emotion_keywords:
+            count = hits.count('emotion', emotion)
             if count > 0:
                 emotion_scores[emotion] = count / total_words
         
@@ -79,8 +107,9 @@ class EmotionDetector:
         confidence = emotion_scores[primary_emotion]
         
         # Calculate overwhelm score
-        overwhelm_score = self._calculate_overwhelm_score(text_lower, emotion_scores)
-        is_overwhelm_detected = overwhelm_score > 0.7
+        with stage("overwhelm_scoring"), span("emotion.overwhelm_score"):
+            overwhelm_score = self._calculate_overwhelm_score(hits, emotion_scores)
+        is_overwhelm_detected = overwhelm_score > OVERWHELM_THRESHOLD
         
         return EmotionResponse(
             id="emotion_1",
@@ -94,30 +123,117 @@ class EmotionDetector:
             overwhelm_score=overwhelm_score
         )
     
-    def _calculate_overwhelm_score(self, text: str, emotion_scores: Dict[EmotionType, float]) -> float:
+    async def detect_emotion_batch(self, texts: List[str]) -> List[Optional[EmotionResponse]]:
+        """
+        Detect emotions for many texts at once, off the event loop for large batches.
+        Returns one reading per text (None where detect_emotion would return None).
+        """
+        return await analysis_executor.run(sum(len(text) for text in texts if text), self.analyze_batch, texts)
+    
+    def analyze_batch(self, texts: List[str]) -> List[Optional[EmotionResponse]]:
+        """
+        Each text is scanned once into a sparse document x keyword matrix; emotion scores,
+        primary emotions and overwhelm scores are then computed for the whole batch as
+        array operations.
+        """
+        readings: List[Optional[EmotionResponse]] = [None] * len(texts)
+        rows = [index for index, text in enumerate(texts) if text and len(text.strip()) >= 3]
+        if not rows:
+            return readings
+        
+        # Sparse document x keyword counts in coordinate form
+        doc_ids: List[int] = []
+        keyword_ids: List[int] = []
+        total_words = np.empty(len(rows))
+        
+        for doc_id, index in enumerate(rows):
+            hits = self.lexicon.scan_text(texts[index])
+            doc_ids.extend([doc_id] * len(hits.keyword_ids))
+            keyword_ids.extend(hits.keyword_ids)
+            total_words[doc_id] = max(hits.word_count, 1)
+        
+        coo_docs = np.asarray(doc_ids, dtype=np.intp)
+        coo_keywords = np.asarray(keyword_ids, dtype=np.intp)
+        
+        # Document x emotion counts = sparse counts @ keyword x emotion incidence
+        counts = np.zeros((len(rows), len(self._emotions)))
+        np.add.at(counts, coo_docs, self._emotion_incidence[coo_keywords])
+        scores = counts / total_words[:, None]
+        pattern_counts = np.bincount(coo_docs, weights=self._overwhelm_incidence[coo_keywords], minlength=len(rows))
+        
+        primary = scores.argmax(axis=1)
+        confidence = scores[np.arange(len(rows)), primary]
+        
+        # Same term order as _calculate_overwhelm_score so batch and single results match exactly
+        overwhelm_scores = np.zeros(len(rows))
+        for emotion, weight in OVERWHELM_EMOTION_WEIGHTS:
+            if emotion in self._emotions:
+                overwhelm_scores = overwhelm_scores + scores[:, self._emotions.index(emotion)] * weight
+        pattern_scores = np.minimum(pattern_counts / max(len(self.lexicon.overwhelm_phrases), 1), 1.0)
+        overwhelm_scores = np.minimum(overwhelm_scores + pattern_scores * OVERWHELM_PATTERN_WEIGHT, 1.0)
+        
+        for doc_id, index in enumerate(rows):
+            detected = np.flatnonzero(counts[doc_id])
+            
+            if not len(detected):
+                readings[index] = EmotionResponse(
+                    id="emotion_1",
+                    timestamp=0,
+                    primary_emotion=EmotionType.neutral,
+                    confidence=0.5,
+                    source="rule_based",
+                    text_content=texts[index],
+                    emotion_scores={EmotionType.neutral: 1.0},
+                    is_overwhelm_detected=False,
+                    overwhelm_score=0.0
+                )
+                continue
+            
+            overwhelm_score = float(overwhelm_scores[doc_id])
+            readings[index] = EmotionResponse(
+                id="emotion_1",
+                timestamp=0,
+                primary_emotion=self._emotions[primary[doc_id]],
+                confidence=float(confidence[doc_id]),
+                source="rule_based",
+                text_content=texts[index],
+                emotion_scores={self._emotions[column]: float(scores[doc_id, column]) for column in detected},
+                is_overwhelm_detected=overwhelm_score > OVERWHELM_THRESHOLD,
+                overwhelm_score=overwhelm_score
+            )
+        
+        return readings
+    
+    def _calculate_overwhelm_score(self, hits: LexiconHits, emotion_scores: Dict[EmotionType, float]) -> float:
         """
         Calculate overwhelm score based on emotion scores and text patterns.
         """
         # Base score from emotion scores
-        overwhelm_emotion_score = emotion_scores.get(EmotionType.overwhelmed, 0.0)
-        stress_score = emotion_scores.get(EmotionType.stressed, 0.0)
-        anxiety_score = emotion_scores.get(EmotionType.anxious, 0.0)
+        total_score = 0.0
+        for emotion, weight in OVERWHELM_EMOTION_WEIGHTS:
+            total_score = total_score + emotion_scores.get(emotion, 0.0) * weight
         
         # Text pattern indicators
-        overwhelm_patterns = [
-            r'\btoo much\b', r'\bcan\'t handle\b', r'\boverwhelming\b',
-            r'\btoo many\b', r'\bexhausted\b', r'\btired\b', r'\bfatigued\b'
-        ]
-        
-        pattern_score = sum(1 for pattern in overwhelm_patterns if re.search(pattern, text))
-        pattern_score = min(pattern_score / len(overwhelm_patterns), 1.0)
+        pattern_score = hits.count('overwhelm', True)
+        pattern_score = min(pattern_score / max(len(self.lexicon.overwhelm_phrases), 1), 1.0)
         
         # Combine scores
-        total_score = (
-            overwhelm_emotion_score * 0.4 +
-            stress_score * 0.3 +
-            anxiety_score * 0.2 +
-            pattern_score * 0.1
-        )
+        total_score = total_score + pattern_score * OVERWHELM_PATTERN_WEIGHT
         
-        return min(total_score, 1.0) 
\ No newline at end of file
+        return min(total_score, 1.0)
+
+_shared_emotion_detector: Optional[EmotionDetector] = None
+
+def _restore_emotion_detector(lexicon_version: str) -> EmotionDetector:
+    lexicon_registry.ensure(lexicon_version)
+    return get_emotion_detector()
+
+def get_emotion_detector() -> EmotionDetector:
+    """
+    Shared EmotionDetector bound to the active lexicon; rebuilt only after a lexicon reload.
+    """
+    global _shared_emotion_detector
+    detector = _shared_emotion_detector
+    if detector is None or detector.lexicon is not lexicon_registry.current:
+        detector = _shared_emotion_detector = EmotionDetector(lexicon_registry.current)
+    return detector
@@ -0,0 +1,332 @@
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import and_, delete, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.emotion import EmotionResponse, EmotionType
+from app.tables import EmotionSeriesBlock
+
+# Column order of the score arrays. New emotion types must be appended to the
+# end of EmotionType, otherwise stored blocks would be read with shifted columns.
+EMOTIONS = tuple(EmotionType)
+_EMOTION_INDEX = {emotion: index for index, emotion in enumerate(EMOTIONS)}
+
+# One raw reading: 28 bytes (offset into the block, primary emotion, overwhelm
+# flag, overwhelm score and one half-precision score per emotion)
+RAW_DTYPE = np.dtype([
+    ("offset", "<f4"),
+    ("primary", "u1"),
+    ("overwhelm_detected", "u1"),
+    ("overwhelm", "<f2"),
+    ("scores", "<f2", (len(EMOTIONS),)),
+])
+
+# One rollup bucket: 60 bytes of counts and sums, so buckets merge by addition
+ROLLUP_DTYPE = np.dtype([
+    ("bucket", "<u4"),  # bucket index since the epoch (timestamp // resolution)
+    ("count", "<u4"),
+    ("overwhelm_detected", "<u4"),
+    ("overwhelm_sum", "<f4"),
+    ("overwhelm_max", "<f4"),
+    ("score_sums", "<f4", (len(EMOTIONS),)),
+])
+
+# Bucket width of each rollup in seconds, finest first
+ROLLUPS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Time span covered by one stored block per resolution; raw and minute blocks
+# hold a day, hour blocks a month, day blocks about a year and a half
+BLOCK_SPANS = {"raw": 86400, "minute": 86400, "hour": 30 * 86400, "day": 512 * 86400}
+
+# How long fine-grained blocks are kept before compaction drops them (None = forever)
+RETENTION = {
+    "raw": int(os.getenv("EMOTION_SERIES_RAW_RETENTION_DAYS", "7")) * 86400,
+    "minute": int(os.getenv("EMOTION_SERIES_MINUTE_RETENTION_DAYS", "90")) * 86400,
+    "hour": None,
+    "day": None,
+}
+
+RESOLUTION_SECONDS = {"raw": 0, **ROLLUPS}
+
+# New readings are buffered in a small "pending" block per raw block and folded
+# into the raw block and every rollup in one rewrite once this many are waiting
+# or the raw block's day is over, instead of rewriting all four blocks per reading.
+# Readers merge pending readings in, so they are visible right away.
+PENDING = "pending"
+FLUSH_READINGS = int(os.getenv("EMOTION_SERIES_FLUSH_READINGS", "64"))
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def _block_start(resolution: str, timestamp: float) -> int:
+    span = BLOCK_SPANS[resolution]
+    return int(timestamp // span) * span
+
+def _raw_record(reading: EmotionResponse, timestamp: float) -> np.ndarray:
+    record = np.zeros(1, dtype=RAW_DTYPE)
+    record["offset"] = timestamp - _block_start("raw", timestamp)
+    record["primary"] = _EMOTION_INDEX[EmotionType(reading.primary_emotion)]
+    record["overwhelm_detected"] = reading.is_overwhelm_detected
+    record["overwhelm"] = reading.overwhelm_score
+    for emotion, score in reading.emotion_scores.items():
+        record["scores"][0, _EMOTION_INDEX[EmotionType(emotion)]] = score
+    return record
+
+def _rollup(records: np.ndarray, block_start: int, resolution: int) -> np.ndarray:
+    """
+    Aggregate raw records of one raw block into buckets of `resolution` seconds.
+    """
+    buckets = ((block_start + records["offset"].astype(np.float64)) // resolution).astype(np.uint32)
+    unique, inverse = np.unique(buckets, return_inverse=True)
+    rollup = np.zeros(len(unique), dtype=ROLLUP_DTYPE)
+    rollup["bucket"] = unique
+    np.add.at(rollup["count"], inverse, 1)
+    np.add.at(rollup["overwhelm_detected"], inverse, records["overwhelm_detected"])
+    np.add.at(rollup["overwhelm_sum"], inverse, records["overwhelm"].astype(np.float32))
+    np.maximum.at(rollup["overwhelm_max"], inverse, records["overwhelm"].astype(np.float32))
+    np.add.at(rollup["score_sums"], inverse, records["scores"].astype(np.float32))
+    return rollup
+
+def _merge_rollups(existing: np.ndarray, added: np.ndarray) -> np.ndarray:
+    """
+    Merge two bucket arrays sorted by bucket; buckets present in both are summed.
+    """
+    combined = np.concatenate([existing, added])
+    unique, inverse = np.unique(combined["bucket"], return_inverse=True)
+    if len(unique) == len(combined):
+        return combined[np.argsort(combined["bucket"], kind="stable")]
+    merged = np.zeros(len(unique), dtype=ROLLUP_DTYPE)
+    merged["bucket"] = unique
+    for field in ("count", "overwhelm_detected", "overwhelm_sum", "score_sums"):
+        np.add.at(merged[field], inverse, combined[field])
+    np.maximum.at(merged["overwhelm_max"], inverse, combined["overwhelm_max"])
+    return merged
+
+async def _load_blocks(db: AsyncSession, user_id: str, keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], bytes]:
+    table = EmotionSeriesBlock.__table__
+    rows = await db.execute(
+        select(table.c.resolution, table.c.block_start, table.c.data)
+        .where(table.c.user_id == user_id, tuple_(table.c.resolution, table.c.block_start).in_(keys))
+    )
+    return {(resolution, block_start): data for resolution, block_start, data in rows}
+
+async def _store_blocks(db: AsyncSession, user_id: str, blocks: Dict[Tuple[str, int], np.ndarray]) -> None:
+    table = EmotionSeriesBlock.__table__
+    statement = _UPSERT_DIALECTS[db.bind.dialect.name](table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.resolution, table.c.block_start],
+        set_={"count": statement.excluded["count"], "data": statement.excluded.data}
+    )
+    await db.execute(statement, [
+        {"user_id": user_id, "resolution": resolution, "block_start": block_start, "count": len(array), "data": array.tobytes()}
+        for (resolution, block_start), array in blocks.items()
+    ])
+
+async def _fold(db: AsyncSession, user_id: str, by_raw_block: Dict[int, np.ndarray]) -> None:
+    """
+    Append raw records (by raw block start) to the user's raw blocks and fold
+    them into every rollup. Every touched block is read in one query and written
+    back in one upsert, however many records land in it.
+    """
+    rollup_updates: Dict[Tuple[str, int], List[np.ndarray]] = {}
+    for raw_start, added in by_raw_block.items():
+        for resolution, seconds in ROLLUPS.items():
+            buckets = _rollup(added, raw_start, seconds)
+            rollup_updates.setdefault((resolution, _block_start(resolution, raw_start)), []).append(buckets)
+
+    raw_keys = [("raw", raw_start) for raw_start in by_raw_block]
+    stored = await _load_blocks(db, user_id, raw_keys + list(rollup_updates))
+    blocks: Dict[Tuple[str, int], np.ndarray] = {}
+    for key in raw_keys:
+        existing = np.frombuffer(stored[key], dtype=RAW_DTYPE) if key in stored else np.zeros(0, dtype=RAW_DTYPE)
+        blocks[key] = np.concatenate([existing, by_raw_block[key[1]]])
+    for key, updates in rollup_updates.items():
+        array = np.frombuffer(stored[key], dtype=ROLLUP_DTYPE) if key in stored else np.zeros(0, dtype=ROLLUP_DTYPE)
+        for buckets in updates:
+            array = _merge_rollups(array, buckets)
+        blocks[key] = array
+    await _store_blocks(db, user_id, blocks)
+
+async def _delete_pending(db: AsyncSession, user_id: str, raw_starts: Iterable[int]) -> None:
+    await db.execute(delete(EmotionSeriesBlock).where(
+        EmotionSeriesBlock.user_id == user_id,
+        EmotionSeriesBlock.resolution == PENDING,
+        EmotionSeriesBlock.block_start.in_(list(raw_starts)),
+    ))
+
+async def append_readings(db: AsyncSession, user_id: str, readings: Iterable[Tuple[float, EmotionResponse]], now: Optional[float] = None) -> None:
+    """
+    Append (timestamp, reading) pairs to the user's series. They join the pending
+    block of their raw block; a pending block is folded into the stored blocks
+    once it holds FLUSH_READINGS readings or its day has ended, so a single
+    reading costs a write of the small pending block only.
+    """
+    by_raw_block: Dict[int, List[np.ndarray]] = {}
+    for timestamp, reading in readings:
+        by_raw_block.setdefault(_block_start("raw", timestamp), []).append(_raw_record(reading, timestamp))
+    if not by_raw_block:
+        return
+
+    now = time.time() if now is None else now
+    pending = await _load_blocks(db, user_id, [(PENDING, raw_start) for raw_start in by_raw_block])
+    flush: Dict[int, np.ndarray] = {}
+    buffered: Dict[Tuple[str, int], np.ndarray] = {}
+    for raw_start, records in by_raw_block.items():
+        key = (PENDING, raw_start)
+        existing = np.frombuffer(pending[key], dtype=RAW_DTYPE) if key in pending else np.zeros(0, dtype=RAW_DTYPE)
+        combined = np.concatenate([existing] + records)
+        if len(combined) >= FLUSH_READINGS or raw_start + BLOCK_SPANS["raw"] <= now:
+            flush[raw_start] = combined
+        else:
+            buffered[key] = combined
+
+    if buffered:
+        await _store_blocks(db, user_id, buffered)
+    if flush:
+        await _fold(db, user_id, flush)
+        await _delete_pending(db, user_id, [raw_start for raw_start in flush if (PENDING, raw_start) in pending])
+
+async def flush_pending(db: AsyncSession, now: Optional[float] = None) -> int:
+    """
+    Fold every pending block whose day has ended into the stored blocks (for users
+    who stopped sending readings). Returns the number of pending blocks folded.
+    """
+    now = time.time() if now is None else now
+    rows = (await db.execute(
+        select(EmotionSeriesBlock.user_id, EmotionSeriesBlock.block_start, EmotionSeriesBlock.data)
+        .where(EmotionSeriesBlock.resolution == PENDING, EmotionSeriesBlock.block_start + BLOCK_SPANS["raw"] <= now)
+    )).all()
+    by_user: Dict[str, Dict[int, np.ndarray]] = {}
+    for user_id, raw_start, data in rows:
+        by_user.setdefault(user_id, {})[raw_start] = np.frombuffer(data, dtype=RAW_DTYPE)
+    for user_id, blocks in by_user.items():
+        await _fold(db, user_id, blocks)
+        await _delete_pending(db, user_id, blocks)
+    return len(rows)
+
+async def append_reading(db: AsyncSession, user_id: str, reading: EmotionResponse, timestamp: float) -> None:
+    await append_readings(db, user_id, [(timestamp, reading)])
+
+def choose_resolution(start: float, end: float, step: float, now: Optional[float] = None) -> str:
+    """
+    The coarsest stored resolution whose buckets are no wider than `step` and
+    whose retention still covers `start`; falls back to coarser ones otherwise.
+    """
+    now = time.time() if now is None else now
+    resolutions = list(RESOLUTION_SECONDS)  # finest first
+    fitting = [resolution for resolution in resolutions if RESOLUTION_SECONDS[resolution] <= step] or ["raw"]
+    index = resolutions.index(fitting[-1])
+    for resolution in resolutions[index:]:
+        retention = RETENTION[resolution]
+        if retention is None or start >= now - retention:
+            return resolution
+    return resolutions[-1]
+
+async def _read_range(db: AsyncSession, user_id: str, resolution: str, start: float, end: float) -> List[Tuple[int, np.ndarray]]:
+    """
+    Blocks of `resolution` overlapping [start, end), with the pending readings of
+    the range folded in (as raw blocks, or rolled up to the resolution).
+    """
+    span = BLOCK_SPANS[resolution]
+    raw_span = BLOCK_SPANS["raw"]
+    blocks = await db.scalars(
+        select(EmotionSeriesBlock)
+        .where(
+            EmotionSeriesBlock.user_id == user_id,
+            or_(
+                and_(EmotionSeriesBlock.resolution == resolution, EmotionSeriesBlock.block_start > start - span),
+                and_(EmotionSeriesBlock.resolution == PENDING, EmotionSeriesBlock.block_start > start - raw_span),
+            ),
+            EmotionSeriesBlock.block_start < end,
+        )
+        .order_by(EmotionSeriesBlock.block_start)
+    )
+    dtype = RAW_DTYPE if resolution == "raw" else ROLLUP_DTYPE
+    stored = []
+    for block in blocks:
+        if block.resolution != PENDING:
+            stored.append((block.block_start, np.frombuffer(block.data, dtype=dtype)))
+        elif resolution == "raw":
+            stored.append((block.block_start, np.frombuffer(block.data, dtype=RAW_DTYPE)))
+        else:
+            stored.append((block.block_start, _rollup(np.frombuffer(block.data, dtype=RAW_DTYPE), block.block_start, ROLLUPS[resolution])))
+    return stored
+
+def _as_rollup(resolution: str, blocks: List[Tuple[int, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bucket start times (seconds) and rollup rows for the loaded blocks.
+    """
+    if resolution != "raw":
+        rows = np.concatenate([array for _, array in blocks]) if blocks else np.zeros(0, dtype=ROLLUP_DTYPE)
+        return rows["bucket"].astype(np.float64) * ROLLUPS[resolution], rows
+
+    times = []
+    rows = []
+    for block_start, records in blocks:
+        rollup = np.zeros(len(records), dtype=ROLLUP_DTYPE)
+        rollup["count"] = 1
+        rollup["overwhelm_detected"] = records["overwhelm_detected"]
+        rollup["overwhelm_sum"] = records["overwhelm"]
+        rollup["overwhelm_max"] = records["overwhelm"]
+        rollup["score_sums"] = records["scores"]
+        times.append(block_start + records["offset"].astype(np.float64))
+        rows.append(rollup)
+    if not rows:
+        return np.zeros(0), np.zeros(0, dtype=ROLLUP_DTYPE)
+    return np.concatenate(times), np.concatenate(rows)
+
+async def trend(db: AsyncSession, user_id: str, start: float, end: float, max_points: int = 500, step: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Emotion trend between start and end in at most max_points points, each the
+    mean scores of the readings in one step-wide window. Served from the coarsest
+    rollup that fits the step, so a year of history reads a few small blocks.
+    """
+    step = max(step or 0.0, (end - start) / max(max_points, 1), 1.0)
+    resolution = choose_resolution(start, end, step)
+
+    times, rows = _as_rollup(resolution, await _read_range(db, user_id, resolution, start, end))
+    mask = (times >= start) & (times < end)
+    times, rows = times[mask], rows[mask]
+
+    points = []
+    if len(rows):
+        windows = ((times - start) // step).astype(np.int64)
+        unique, inverse = np.unique(windows, return_inverse=True)
+        counts = np.bincount(inverse, weights=rows["count"]).astype(np.int64)
+        detected = np.bincount(inverse, weights=rows["overwhelm_detected"]).astype(np.int64)
+        overwhelm_sums = np.bincount(inverse, weights=rows["overwhelm_sum"])
+        overwhelm_max = np.zeros(len(unique), dtype=np.float32)
+        np.maximum.at(overwhelm_max, inverse, rows["overwhelm_max"])
+        score_sums = np.zeros((len(unique), len(EMOTIONS)))
+        np.add.at(score_sums, inverse, rows["score_sums"])
+        means = score_sums / counts[:, None]
+
+        for i, window in enumerate(unique):
+            points.append({
+                "timestamp": start + float(window) * step,
+                "count": int(counts[i]),
+                "dominant_emotion": EMOTIONS[int(np.argmax(means[i]))].value,
+                "emotion_scores": {emotion.value: round(float(means[i, j]), 4) for j, emotion in enumerate(EMOTIONS) if means[i, j] > 0},
+                "overwhelm_score": round(float(overwhelm_sums[i] / counts[i]), 4),
+                "overwhelm_max": round(float(overwhelm_max[i]), 4),
+                "overwhelm_detected": int(detected[i]),
+            })
+
+    return {"user_id": user_id, "start": start, "end": end, "step": step, "resolution": resolution, "points": points}
+
+async def prune_expired_blocks(db: AsyncSession, now: Optional[float] = None) -> int:
+    """
+    Fold pending blocks of past days, then drop raw and minute blocks that have
+    aged past their retention; their data lives on in the coarser rollups.
+    Returns the number of blocks removed.
+    """
+    now = time.time() if now is None else now
+    await flush_pending(db, now)
+    conditions = [
+        and_(EmotionSeriesBlock.resolution == resolution, EmotionSeriesBlock.block_start + BLOCK_SPANS[resolution] <= now - retention)
+        for resolution, retention in RETENTION.items()
+        if retention is not None
+    ]
+    result = await db.execute(delete(EmotionSeriesBlock).where(or_(*conditions)))
+    return result.rowcount
@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.services.metrics import call_recording, replay
+from app.services.profiler import profiling_request
+from app.services.tracing import adopt, call_traced, remote_parent
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+def _warm_worker() -> None:
+    """
+    Process pool initializer: compile the lexicon and build the shared services once
+    per worker so the first offloaded request does not pay for it.
+    """
+    from app.services.ai_service import get_ai_service
+    from app.services.emotion_detector import get_emotion_detector
+    from app.services.lexicon import lexicon_registry
+
+    lexicon_registry.load()
+    get_ai_service()
+    get_emotion_detector()
+
+class AnalysisExecutor:
+    """
+    Runs CPU-bound analysis off the event loop. Inputs smaller than
+    `offload_threshold` characters run inline (a pool round trip would cost more
+    than the analysis); larger ones are awaited on a thread or process pool.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: Optional[int] = None, offload_threshold: int = 16384):
+        self._pool: Optional[Executor] = None
+        self.configure(mode, max_workers, offload_threshold)
+
+    def configure(self, mode: str, max_workers: Optional[int] = None, offload_threshold: int = 16384) -> None:
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown analysis executor mode: {mode}")
+        self.shutdown()
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.offload_threshold = offload_threshold
+
+    def start(self) -> None:
+        if self._pool is not None or self.mode == "inline":
+            return
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+        else:
+            # spawn, not fork: the parent runs an event loop and other threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+            # Start every worker now instead of on the first large request
+            for future in [self._pool.submit(os.getpid) for _ in range(self.max_workers)]:
+                future.result()
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def should_offload(self, size: int) -> bool:
+        return self._pool is not None and size >= self.offload_threshold
+
+    async def run(self, size: int, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call func(*args) inline for small inputs, otherwise on the pool.
+        In process mode func and args are pickled, so use picklable callables.
+        A request being profiled on demand runs inline, where the profiler sees it.
+        """
+        if not self.should_offload(size) or profiling_request():
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            # Stage timings and trace spans recorded in the worker are sent back with the result
+            (result, observations), spans = await loop.run_in_executor(
+                self._pool, call_traced, remote_parent(), call_recording, func, *args
+            )
+            replay(observations)
+            adopt(spans)
+            return result
+        # Run in a copy of the caller's context so spans opened on the thread join its trace
+        return await loop.run_in_executor(self._pool, contextvars.copy_context().run, func, *args)
+
+analysis_executor = AnalysisExecutor(
+    mode=os.getenv("ANALYSIS_EXECUTOR", "thread"),
+    max_workers=int(os.getenv("ANALYSIS_WORKERS", "0")) or None,
+    offload_threshold=int(os.getenv("ANALYSIS_OFFLOAD_THRESHOLD", "16384"))
+)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import Optional
+from sqlalchemy import func, select
+from app.database import AsyncSessionLocal
+from app.services.aggregates import day_of, summarize_day
+from app.services.emotion_series import prune_expired_blocks, trend
+from app.services.scheduler import Scheduler
+from app.services.storage import brain_dump_history, save_summary
+from app.services.write_queue import write_queue
+from app.tables import DailyAggregateRecord, SummaryRecord
+
+# Maintenance jobs run by the in-process scheduler (see app/services/scheduler.py).
+# Cron expressions are in UTC, like the daily aggregates.
+SUMMARY_PRECOMPUTE_CRON = os.getenv("SUMMARY_PRECOMPUTE_CRON", "10 0 * * *")
+SERIES_COMPACTION_CRON = os.getenv("SERIES_COMPACTION_CRON", "30 3 * * *")
+CACHE_WARM_INTERVAL = float(os.getenv("CACHE_WARM_INTERVAL", "3600"))
+CACHE_WARM_USERS = int(os.getenv("CACHE_WARM_USERS", "200"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "60"))
+
+# Users summarized per read query; their summaries are then written concurrently
+# so the write queue group-commits them
+_PRECOMPUTE_BATCH = 500
+
+async def precompute_summaries(day: Optional[str] = None) -> int:
+    """
+    Write the summary of `day` (default: yesterday, UTC) for every user active
+    that day whose latest stored summary is older than their aggregate row, so
+    generate-summary finds it ready instead of building it on demand.
+    Returns the number of summaries written.
+    """
+    day = day or day_of(time.time() - 86400)
+    written = 0
+    after = ""
+    while True:
+        async with AsyncSessionLocal() as db:
+            aggregates = list(await db.scalars(
+                select(DailyAggregateRecord)
+                .where(DailyAggregateRecord.day == day, DailyAggregateRecord.user_id > after)
+                .order_by(DailyAggregateRecord.user_id)
+                .limit(_PRECOMPUTE_BATCH)
+            ))
+            if not aggregates:
+                return written
+            user_ids = [aggregate.user_id for aggregate in aggregates]
+            latest = dict((await db.execute(
+                select(SummaryRecord.user_id, func.max(SummaryRecord.created_at))
+                .where(SummaryRecord.user_id.in_(user_ids), SummaryRecord.date == day)
+                .group_by(SummaryRecord.user_id)
+            )).all())
+
+        stale = [aggregate for aggregate in aggregates if latest.get(aggregate.user_id, -1.0) < aggregate.updated_at]
+        await asyncio.gather(*(
+            write_queue.submit(save_summary, aggregate.user_id, SimpleNamespace(date=day, **summarize_day(aggregate)))
+            for aggregate in stale
+        ))
+        written += len(stale)
+        after = user_ids[-1]
+
+async def compact_emotion_series() -> int:
+    """
+    Drop raw and minute emotion blocks past their retention (the hour and day
+    rollups keep their data). Returns the number of blocks removed.
+    """
+    return await write_queue.submit(prune_expired_blocks)
+
+async def warm_page_cache() -> int:
+    """
+    Read what the most recently active users' first requests will read (today's
+    aggregate, the first history page and the last day's emotion trend) so after
+    a restart those pages are already in SQLite's page cache instead of costing
+    the users a cold read. Analysis results (the result cache) are not touched.
+    Returns the number of users warmed.
+    """
+    now = time.time()
+    async with AsyncSessionLocal() as db:
+        user_ids = list(await db.scalars(
+            select(DailyAggregateRecord.user_id)
+            .where(DailyAggregateRecord.day == day_of(now))
+            .order_by(DailyAggregateRecord.updated_at.desc())
+            .limit(CACHE_WARM_USERS)
+        ))
+        for user_id in user_ids:
+            await brain_dump_history(db, user_id)
+            await trend(db, user_id, now - 86400, now, max_points=96)
+    return len(user_ids)
+
+def register_jobs(scheduler: Scheduler) -> None:
+    if "precompute_summaries" in scheduler.jobs:
+        return
+    scheduler.add_job("precompute_summaries", precompute_summaries, cron=SUMMARY_PRECOMPUTE_CRON, jitter=SCHEDULER_JITTER)
+    scheduler.add_job("compact_emotion_series", compact_emotion_series, cron=SERIES_COMPACTION_CRON, jitter=SCHEDULER_JITTER)
+    scheduler.add_job("warm_page_cache", warm_page_cache, every=CACHE_WARM_INTERVAL, run_at_start=True, jitter=SCHEDULER_JITTER)
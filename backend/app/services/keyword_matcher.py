@@ -0,0 +1,71 @@
+from collections import deque
+from typing import Dict, Hashable, List, Sequence, Set, Tuple
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton that finds every keyword of a fixed set in a single
+    pass over the input. Keywords are sequences of hashable symbols, so the same
+    automaton works on characters (plain strings) or on tokens (tuples of words).
+    """
+
+    def __init__(self, keywords: Sequence[Sequence[Hashable]]):
+        self.keywords = list(keywords)
+        self._goto: List[Dict[Hashable, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            self._insert(keyword_id, keyword)
+
+        self._build_failure_links()
+
+    def _insert(self, keyword_id: int, keyword: Sequence[Hashable]) -> None:
+        state = 0
+        for symbol in keyword:
+            next_state = self._goto[state].get(symbol)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][symbol] = next_state
+            state = next_state
+
+        if keyword_id not in self._output[state]:
+            self._output[state] = self._output[state] + (keyword_id,)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and symbol not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(symbol, 0)
+
+                # Inherit matches that end at the failure state (suffix keywords)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, sequence: Sequence[Hashable]) -> Set[int]:
+        """
+        Return the ids of all keywords that occur anywhere in the sequence.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found: Set[int] = set()
+        state = 0
+
+        for symbol in sequence:
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return found
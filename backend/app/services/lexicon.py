@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from app.models.emotion import EmotionType
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.tokenizer import TokenizedText, iter_lines, tokenize
+
+# Emotion keywords for rule-based detection
+EMOTION_KEYWORDS = {
+    EmotionType.joy: [
+        'happy', 'excited', 'great', 'wonderful', 'amazing', 'fantastic',
+        'love', 'enjoy', 'pleased', 'satisfied', 'grateful', 'blessed'
+    ],
+    EmotionType.sadness: [
+        'sad', 'depressed', 'down', 'blue', 'melancholy', 'grief',
+        'lonely', 'hopeless', 'disappointed', 'heartbroken'
+    ],
+    EmotionType.anger: [
+        'angry', 'furious', 'mad', 'irritated', 'frustrated', 'annoyed',
+        'rage', 'hate', 'disgusted', 'outraged'
+    ],
+    EmotionType.fear: [
+        'afraid', 'scared', 'terrified', 'anxious', 'worried', 'nervous',
+        'panic', 'dread', 'fearful', 'intimidated'
+    ],
+    EmotionType.surprise: [
+        'surprised', 'shocked', 'amazed', 'astonished', 'stunned',
+        'unexpected', 'sudden', 'unbelievable'
+    ],
+    EmotionType.overwhelmed: [
+        'overwhelmed', 'stressed', 'burdened', 'swamped', 'drowning',
+        'too much', 'can\'t handle', 'exhausted', 'burned out'
+    ],
+    EmotionType.anxious: [
+        'anxious', 'worried', 'concerned', 'uneasy', 'restless',
+        'tense', 'jittery', 'on edge', 'apprehensive'
+    ],
+    EmotionType.stressed: [
+        'stressed', 'pressure', 'tension', 'strained', 'overworked',
+        'under pressure', 'tight deadline', 'crunch time'
+    ]
+}
+
+# Energy keywords for task classification
+HIGH_ENERGY_KEYWORDS = [
+    'urgent', 'important', 'deadline', 'meeting', 'presentation',
+    'project', 'report', 'analysis', 'research', 'study'
+]
+
+LOW_ENERGY_KEYWORDS = [
+    'maybe', 'sometime', 'eventually', 'later', 'when i have time',
+    'if possible', 'optional', 'nice to have', 'relax', 'rest'
+]
+
+# Category keywords, checked in order (first matching category wins)
+CATEGORY_KEYWORDS = {
+    'work': ['work', 'job', 'office', 'meeting', 'project', 'report', 'email'],
+    'personal': ['personal', 'family', 'home', 'house', 'clean'],
+    'health': ['exercise', 'workout', 'gym', 'health', 'doctor', 'medical'],
+    'learning': ['learn', 'study', 'course', 'book', 'read', 'practice'],
+    'social': ['friend', 'family', 'call', 'visit', 'party', 'social']
+}
+
+AVOIDANCE_KEYWORDS = [
+    'avoid', 'procrastinate', 'put off', 'delay', 'postpone',
+    'maybe later', 'not sure', 'uncertain', 'hesitate'
+]
+
+# Phrases indicating overwhelm, scored on top of the emotion keywords
+OVERWHELM_PHRASES = [
+    'too much', 'can\'t handle', 'overwhelming',
+    'too many', 'exhausted', 'tired', 'fatigued'
+]
+
+class LexiconHits:
+    """
+    Distinct keywords found by one scan, tallied per (group, label),
+    together with the number of word tokens scanned.
+    """
+
+    __slots__ = ("keyword_ids", "counts", "word_count")
+
+    def __init__(self, keyword_ids: Set[int], counts: Dict[Tuple[str, Any], int], word_count: int = 0):
+        self.keyword_ids = keyword_ids
+        self.counts = counts
+        self.word_count = word_count
+
+    def count(self, group: str, label: Any) -> int:
+        return self.counts.get((group, label), 0)
+
+class Lexicon:
+    """
+    All classifier keyword lists compiled into a single keyword matcher, so one
+    scan of a line (or a whole dump) yields the emotion, energy, category,
+    avoidance and overwhelm hits together.
+
+    Keywords are matched on whole word tokens, so 'read' does not match
+    'already' and multi-word phrases like 'under pressure' match as n-grams.
+    """
+
+    def __init__(
+        self,
+        emotion_keywords: Mapping[EmotionType, Sequence[str]] = EMOTION_KEYWORDS,
+        high_energy_keywords: Sequence[str] = HIGH_ENERGY_KEYWORDS,
+        low_energy_keywords: Sequence[str] = LOW_ENERGY_KEYWORDS,
+        category_keywords: Mapping[str, Sequence[str]] = CATEGORY_KEYWORDS,
+        avoidance_keywords: Sequence[str] = AVOIDANCE_KEYWORDS,
+        overwhelm_phrases: Sequence[str] = OVERWHELM_PHRASES,
+    ):
+        # Lexicons are shared across requests and threads, so freeze everything
+        self.emotion_keywords = MappingProxyType({EmotionType(emotion): tuple(keywords) for emotion, keywords in emotion_keywords.items()})
+        self.high_energy_keywords = tuple(high_energy_keywords)
+        self.low_energy_keywords = tuple(low_energy_keywords)
+        self.category_keywords = MappingProxyType({category: tuple(keywords) for category, keywords in category_keywords.items()})
+        self.avoidance_keywords = tuple(avoidance_keywords)
+        self.overwhelm_phrases = tuple(overwhelm_phrases)
+
+        groups = [('emotion', emotion, keywords) for emotion, keywords in self.emotion_keywords.items()]
+        groups.append(('energy', 'high', self.high_energy_keywords))
+        groups.append(('energy', 'low', self.low_energy_keywords))
+        groups.extend(('category', category, keywords) for category, keywords in self.category_keywords.items())
+        groups.append(('avoidance', True, self.avoidance_keywords))
+        groups.append(('overwhelm', True, self.overwhelm_phrases))
+
+        # The same keyword may feed several classifiers ('meeting' is both high
+        # energy and work), so each distinct phrase maps to all of its labels.
+        labels_by_phrase: Dict[Tuple[str, ...], List[Tuple[str, Any]]] = {}
+        for group, label, keywords in groups:
+            for keyword in keywords:
+                phrase = tokenize(keyword).words
+                if not phrase:
+                    continue
+                labels = labels_by_phrase.setdefault(phrase, [])
+                if (group, label) not in labels:
+                    labels.append((group, label))
+
+        # The matcher runs over word tokens, so its transitions are token hash lookups
+        self.phrases = tuple(labels_by_phrase)
+        self.keywords = tuple(' '.join(phrase) for phrase in self.phrases)
+        self.keyword_labels = tuple(tuple(labels_by_phrase[phrase]) for phrase in self.phrases)
+        self.matcher = KeywordMatcher(self.phrases)
+
+        # Content hash of the keyword tables; changes whenever a reload changes the rules
+        self.version = hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()[:16]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Lexicon":
+        """
+        Build a lexicon from the lexicon file layout; missing sections keep the defaults.
+        """
+        energy = data.get('energy', {})
+        return cls(
+            emotion_keywords=data.get('emotion', EMOTION_KEYWORDS),
+            high_energy_keywords=energy.get('high', HIGH_ENERGY_KEYWORDS),
+            low_energy_keywords=energy.get('low', LOW_ENERGY_KEYWORDS),
+            category_keywords=data.get('category', CATEGORY_KEYWORDS),
+            avoidance_keywords=data.get('avoidance', AVOIDANCE_KEYWORDS),
+            overwhelm_phrases=data.get('overwhelm', OVERWHELM_PHRASES),
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "Lexicon":
+        with open(path, encoding='utf-8') as lexicon_file:
+            return cls.from_dict(json.load(lexicon_file))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'emotion': {emotion.value: list(keywords) for emotion, keywords in self.emotion_keywords.items()},
+            'energy': {'high': list(self.high_energy_keywords), 'low': list(self.low_energy_keywords)},
+            'category': {category: list(keywords) for category, keywords in self.category_keywords.items()},
+            'avoidance': list(self.avoidance_keywords),
+            'overwhelm': list(self.overwhelm_phrases),
+        }
+
+    def scan(self, tokens: TokenizedText) -> LexiconHits:
+        """
+        Find all lexicon keywords in the tokenized text in a single pass.
+        """
+        return self.tally(self.matcher.scan(tokens.words), len(tokens))
+
+    def scan_text(self, text: str) -> LexiconHits:
+        """
+        Tokenize and scan text line by line; phrases never span a line break.
+        """
+        return self.merge(self.scan(tokenize(line)) for _, _, line in iter_lines(text))
+
+    def tally(self, keyword_ids: Set[int], word_count: int = 0) -> LexiconHits:
+        counts: Dict[Tuple[str, Any], int] = {}
+        for keyword_id in keyword_ids:
+            for label in self.keyword_labels[keyword_id]:
+                counts[label] = counts.get(label, 0) + 1
+        return LexiconHits(keyword_ids, counts, word_count)
+
+    def merge(self, hits: Iterable[LexiconHits]) -> LexiconHits:
+        """
+        Combine the hits of several scans (e.g. every line of a dump).
+        """
+        keyword_ids: Set[int] = set()
+        word_count = 0
+        for line_hits in hits:
+            keyword_ids |= line_hits.keyword_ids
+            word_count += line_hits.word_count
+        return self.tally(keyword_ids, word_count)
+
+DEFAULT_LEXICON = Lexicon()
+
+class LexiconRegistry:
+    """
+    Process-wide holder of the active lexicon. Readers take `current` once per
+    request; a reload builds and compiles the new lexicon completely before
+    swapping the reference, so in-flight requests never see a half-built one.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._current = DEFAULT_LEXICON
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Lexicon:
+        return self._current
+
+    def load(self, path: Optional[str] = None) -> Lexicon:
+        """
+        (Re)load the lexicon from the lexicon file, or the built-in lists when no file is configured.
+        Raises if the file is invalid, leaving the active lexicon untouched.
+        """
+        with self._lock:
+            if path is not None:
+                self.path = path
+            lexicon = Lexicon.from_file(self.path) if self.path else DEFAULT_LEXICON
+            self._current = lexicon
+            return lexicon
+
+    reload = load
+
+    def ensure(self, version: str) -> Lexicon:
+        """
+        Reload if the active lexicon is not `version`, e.g. in a pool worker after
+        the parent process reloaded the lexicon file.
+        """
+        lexicon = self._current
+        if lexicon.version != version:
+            lexicon = self.load()
+        return lexicon
+
+lexicon_registry = LexiconRegistry(os.getenv("LEXICON_PATH"))
@@ -0,0 +1,266 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Prometheus text format 0.0.4 (the response adds the charset)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Request latency from 1 ms to 10 s; analysis stages go down to 10 us
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+SIZE_BUCKETS = tuple(64 * 4 ** exponent for exponent in range(10))  # 64 B .. 16 MB
+LINE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000, 100000)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric:
+    """
+    A metric family in the Prometheus text format. Label values are passed
+    positionally in `labelnames` order; updates take a lock since analysis stages
+    are observed from executor threads.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """
+        (suffix, label names, label values, value) for every sample of the family.
+        """
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield "", self.labelnames, labels, value
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield "", self.labelnames, labels, value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket (non-cumulative) counts with +Inf last, then the sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        names = self.labelnames + ("le",)
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", names, labels + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, labels, total
+            yield "_count", self.labelnames, labels, cumulative
+
+Collector = Callable[[], Iterable[Metric]]
+
+class MetricsRegistry:
+    """
+    Metrics rendered by GET /metrics: families updated as requests run, plus
+    collectors that build families from other components' counters at scrape
+    time (cache, write queue, scheduler), so those keep a single source of truth.
+    """
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests_in_flight = registry.register(Gauge(
+    "neurodesk_http_requests_in_flight", "HTTP requests being served"
+))
+http_request_duration = registry.register(Histogram(
+    "neurodesk_http_request_duration_seconds", "HTTP request latency by route template and status",
+    ("method", "route", "status"), LATENCY_BUCKETS
+))
+http_request_size = registry.register(Histogram(
+    "neurodesk_http_request_size_bytes", "HTTP request body size (Content-Length) by route template",
+    ("method", "route"), SIZE_BUCKETS
+))
+analysis_stage_duration = registry.register(Histogram(
+    "neurodesk_analysis_stage_duration_seconds", "Time spent in each text analysis stage",
+    ("stage",), STAGE_BUCKETS
+))
+analysis_input_lines = registry.register(Histogram(
+    "neurodesk_analysis_input_lines", "Lines per analysed brain dump",
+    (), LINE_BUCKETS
+))
+analysis_input_chars = registry.register(Histogram(
+    "neurodesk_analysis_input_chars", "Characters per analysed text",
+    ("kind",), SIZE_BUCKETS
+))
+
+# Observations made while a process-pool worker runs an analysis; they are shipped
+# back with the result and replayed into the parent's registry
+_recording = threading.local()
+
+def _observe(metric: Histogram, value: float, *labels: str) -> None:
+    buffer = getattr(_recording, "buffer", None)
+    if buffer is not None:
+        buffer.append((metric.name, value, labels))
+    else:
+        metric.observe(value, *labels)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as one analysis stage.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe(analysis_stage_duration, time.perf_counter() - started, name)
+
+def observe_input(kind: str, text: str) -> None:
+    _observe(analysis_input_chars, len(text), kind)
+
+def observe_lines(count: int) -> None:
+    _observe(analysis_input_lines, count)
+
+def call_recording(func: Callable[..., Any], *args: Any) -> Tuple[Any, List[Tuple[str, float, LabelValues]]]:
+    """
+    Run func(*args) keeping its observations instead of recording them (in a
+    worker process, where the registry is not the one /metrics serves).
+    """
+    _recording.buffer = []
+    try:
+        return func(*args), _recording.buffer
+    finally:
+        _recording.buffer = None
+
+def replay(observations: List[Tuple[str, float, LabelValues]]) -> None:
+    histograms = {metric.name: metric for metric in (analysis_stage_duration, analysis_input_lines, analysis_input_chars)}
+    for name, value, labels in observations:
+        histograms[name].observe(value, *labels)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording in-flight requests, latency by route template and
+    status, and request body size. The route template (not the raw path) keeps
+    label cardinality bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - started, method, template, str(status))
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    http_request_size.observe(int(value), method, template)
+                    break
@@ -0,0 +1,345 @@
+import asyncio
+import contextvars
+import cProfile
+import json
+import marshal
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from app.services.admin import ADMIN_TOKEN, is_admin
+
+# Share of /api/ requests profiled in the background, in percent, into PROFILE_DIR
+PROFILE_SAMPLE_PERCENT = float(os.getenv("PROFILE_SAMPLE_PERCENT", "0"))
+PROFILE_SAMPLE_MODE = os.getenv("PROFILE_SAMPLE_MODE", "sample")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+# Stack sampling period; a CPU-bound event loop only lets the sampler in every
+# sys.getswitchinterval() (5 ms), so shorter periods gain little
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "30"))
+
+# cprofile: deterministic, every call counted (slows Python code down ~2x);
+# sample: periodic stack samples of every thread, cheap enough for production
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_OUTPUTS = ("inline", "file")
+PROFILE_SORTS = ("cumulative", "tottime", "calls")
+
+if PROFILE_SAMPLE_MODE not in PROFILE_MODES:
+    raise ValueError(f"Unknown PROFILE_SAMPLE_MODE: {PROFILE_SAMPLE_MODE}")
+
+FunctionKey = Tuple[str, int, str]  # (file, first line, name), as pstats keys functions
+
+_profiling = contextvars.ContextVar("profiling", default=False)
+
+def profiling_request() -> bool:
+    """
+    True while an on-demand profile of the current request runs. The analysis
+    executor then runs inline so the profile sees the analysis rather than an
+    await on a pool.
+    """
+    return _profiling.get()
+
+def _function_label(key: FunctionKey) -> str:
+    filename, line, name = key
+    return f"{filename}:{line}({name})" if filename != "~" else name
+
+# Innermost frames of a thread that is waiting rather than working: the event
+# loop in its selector, a pool worker waiting for its next job, a lock or queue wait
+_IDLE_FRAMES = {("selectors.py", "select"), ("thread.py", "_worker"), ("threading.py", "wait")}
+
+class StackSampler:
+    """
+    Samples the stacks of every thread but its own every `interval` seconds
+    from a helper thread, so work handed to the analysis executor's threads or
+    to asyncio.to_thread shows up next to the event loop. Each stack is rooted
+    at its thread's name. Samples of waiting threads count as idle and are left
+    out of the stacks. Process-pool workers are not sampled.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.idle = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                    self.idle += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.append(("~", 0, f"thread {names.get(thread_id, thread_id)}"))
+                self.stacks[tuple(reversed(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def top(self, limit: int, sort: str) -> List[Dict[str, Any]]:
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for key in set(stack):
+                cumulative[key] += count
+        total = max(self.samples, 1)
+        order = own if sort == "tottime" else cumulative
+        return [
+            {
+                "function": _function_label(key),
+                "self_samples": own[key],
+                "cumulative_samples": cumulative[key],
+                "self_pct": round(100 * own[key] / total, 2),
+                "cumulative_pct": round(100 * cumulative[key] / total, 2),
+            }
+            for key, _ in order.most_common(limit)
+        ]
+
+    def dump(self) -> bytes:
+        """
+        Folded stacks ("root;child;leaf count" per line), as flamegraph.pl and speedscope read them.
+        """
+        lines = (
+            ";".join(_function_label(key) for key in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        )
+        return ("\n".join(lines) + "\n").encode()
+
+class Profile:
+    """
+    One profiled request, with either profiler behind the same interface.
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.duration = 0.0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+        else:
+            self._sampler.stop()
+        self.duration = time.perf_counter() - self._started
+
+    def summary(self, limit: int = PROFILE_TOP, sort: str = "cumulative") -> Dict[str, Any]:
+        summary: Dict[str, Any] = {"mode": self.mode, "duration_ms": round(self.duration * 1000, 3), "sort": sort}
+        if self._profiler is not None:
+            stats = pstats.Stats(self._profiler).stats
+            column = {"calls": 1, "tottime": 2, "cumulative": 3}[sort]
+            ordered = sorted(stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+            summary["total_calls"] = sum(entry[1] for entry in stats.values())
+            summary["functions"] = [
+                {
+                    "function": _function_label(key),
+                    "calls": calls,
+                    "primitive_calls": primitive,
+                    "self_ms": round(own * 1000, 3),
+                    "cumulative_ms": round(cumulative * 1000, 3),
+                }
+                for key, (primitive, calls, own, cumulative, _) in ordered
+            ]
+        else:
+            summary["interval_ms"] = PROFILE_INTERVAL_MS
+            summary["samples"] = self._sampler.samples
+            summary["idle_samples"] = self._sampler.idle
+            summary["functions"] = self._sampler.top(limit, sort)
+        return summary
+
+    @property
+    def extension(self) -> str:
+        return "prof" if self.mode == "cprofile" else "folded"
+
+    def dump(self) -> bytes:
+        """
+        The whole profile: pstats data (pstats.Stats, snakeviz) or folded stacks.
+        """
+        if self._profiler is not None:
+            self._profiler.create_stats()
+            return marshal.dumps(self._profiler.stats)
+        return self._sampler.dump()
+
+def write_sample(directory: str, name: str, data: bytes, keep: int) -> None:
+    """
+    Write a sampled profile and delete the oldest ones beyond `keep` (file names
+    start with a timestamp, so they sort by age).
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(data)
+    files = sorted(entry for entry in os.listdir(directory) if entry.endswith((".prof", ".folded")))
+    for stale in files[:max(len(files) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, stale))
+        except FileNotFoundError:
+            pass
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-") or "root"
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling single requests.
+
+    On demand: a request carrying X-Profile (or ?profile=) and a valid
+    X-Admin-Token runs under the chosen profiler, and the response is replaced by
+    the top functions (inline, the default) or the whole profile as a download
+    (X-Profile-Output / ?profile_output=file). The original status is kept in the
+    body or in an X-Profiled-Status header.
+
+    Sampled: PROFILE_SAMPLE_PERCENT of /api/ requests run under the
+    PROFILE_SAMPLE_MODE profiler with their response untouched, and the profile
+    is written to PROFILE_DIR, which keeps the newest PROFILE_KEEP files.
+
+    One request is profiled at a time per process: both profilers observe the
+    whole event loop thread (the sampler every thread), so overlapping profiles
+    would record each other, and concurrent requests show up in a sample profile.
+    """
+
+    def __init__(self, app: Any, admin_token: str = ADMIN_TOKEN, sample_percent: float = PROFILE_SAMPLE_PERCENT,
+                 sample_mode: str = PROFILE_SAMPLE_MODE, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.app = app
+        self.admin_token = admin_token
+        self.sample_percent = sample_percent
+        self.sample_mode = sample_mode
+        self.directory = directory
+        self.keep = keep
+        self._active = False
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        query = {name: values[-1] for name, values in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+        requested = headers.get("x-profile") or query.get("profile")
+        if requested:
+            await self._on_demand(scope, receive, send, requested, headers, query)
+        elif (
+            self.sample_percent > 0 and not self._active and scope["path"].startswith("/api/")
+            and random.random() * 100 < self.sample_percent
+        ):
+            await self._sampled(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _on_demand(self, scope, receive, send, requested: str, headers: Dict[str, str], query: Dict[str, str]) -> None:
+        if not is_admin(headers.get("x-admin-token"), self.admin_token):
+            await _send_json(send, 403, {"detail": "Profiling requires a valid X-Admin-Token"})
+            return
+        mode = "cprofile" if requested.lower() in ("1", "true", "yes") else requested.lower()
+        output = (headers.get("x-profile-output") or query.get("profile_output") or "inline").lower()
+        sort = (headers.get("x-profile-sort") or query.get("profile_sort") or "cumulative").lower()
+        limit = headers.get("x-profile-top") or query.get("profile_top") or str(PROFILE_TOP)
+        if mode not in PROFILE_MODES or output not in PROFILE_OUTPUTS or sort not in PROFILE_SORTS or not limit.isdigit():
+            await _send_json(send, 400, {
+                "detail": f"Profile mode must be one of {', '.join(PROFILE_MODES)}, output one of "
+                          f"{', '.join(PROFILE_OUTPUTS)}, sort one of {', '.join(PROFILE_SORTS)}, top a number"
+            })
+            return
+        if self._active:
+            await _send_json(send, 409, {"detail": "Another request is being profiled, retry shortly"})
+            return
+
+        start_message: Dict[str, Any] = {}
+        body = bytearray()
+        async def capture(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+
+        profile = await self._run(scope, receive, capture, mode, on_demand=True)
+        status = start_message.get("status", 500)
+        if output == "file":
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            filename = f"profile-{time.strftime('%Y%m%dT%H%M%S')}-{_slug(route)}.{profile.extension}"
+            await _send(send, 200, profile.dump(), "application/octet-stream", [
+                (b"content-disposition", f'attachment; filename="{filename}"'.encode()),
+                (b"x-profiled-status", str(status).encode()),
+            ])
+            return
+
+        content_type = next((value.decode("latin-1") for name, value in start_message.get("headers", []) if name == b"content-type"), "")
+        try:
+            response = json.loads(body) if content_type.startswith("application/json") else body.decode()
+        except ValueError:
+            response = body.decode(errors="replace")
+        await _send_json(send, 200, {"status": status, "profile": profile.summary(int(limit), sort), "response": response})
+
+    async def _sampled(self, scope, receive, send) -> None:
+        status = 500
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile = await self._run(scope, receive, send_wrapper, self.sample_mode, on_demand=False)
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        name = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 1_000_000_000:09d}-{scope['method']}-"
+            f"{_slug(route)}-{status}-{profile.duration * 1000:.0f}ms.{profile.extension}"
+        )
+        await asyncio.to_thread(write_sample, self.directory, name, profile.dump(), self.keep)
+
+    async def _run(self, scope, receive, send, mode: str, on_demand: bool) -> Profile:
+        profile = Profile(mode)
+        self._active = True
+        marker = _profiling.set(on_demand)
+        profile.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.stop()
+            _profiling.reset(marker)
+            self._active = False
+        return profile
+
+async def _send(send: Callable, status: int, body: bytes, content_type: str, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def _send_json(send: Callable, status: int, content: Any) -> None:
+    await _send(send, status, json.dumps(content).encode(), "application/json")
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+class CacheBackend:
+    """
+    Storage for cached analysis results. Backends own eviction; `get` returns None on a miss.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU cache bounded by entry count and approximate size in bytes, with per-entry TTL.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 10000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._size = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self._size -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (time.time() + ttl, size, value)
+            self._size += size
+
+            # Evict least recently used entries until both bounds hold
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._size, "evictions": self._evictions}
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache in a local SQLite file so several uvicorn workers on one box share results.
+    Values are pickled; the file must only be writable by the service itself.
+    The total size is kept in a one-row table, updated in the same transaction
+    as each write, so a set does not sum the whole store and all workers agree.
+    """
+
+    def __init__(self, path: str = "./neurodesk_cache.db", max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_result_cache_accessed ON result_cache (accessed_at)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_result_cache_expires ON result_cache (expires_at)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+        )
+        # Summed once, for a store created before the size table existed
+        self._connection.execute(
+            "INSERT OR IGNORE INTO result_cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM result_cache"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run the block in a write transaction (BEGIN IMMEDIATE, so workers queue up
+        instead of failing to upgrade a read lock); the caller holds self._lock.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _add_size(self, delta: int) -> int:
+        self._connection.execute("UPDATE result_cache_size SET total = total + ? WHERE id = 0", (delta,))
+        return self._connection.execute("SELECT total FROM result_cache_size WHERE id = 0").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at, size FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                with self._transaction():
+                    if self._connection.execute("DELETE FROM result_cache WHERE key = ? AND expires_at < ?", (key, now)).rowcount:
+                        self._add_size(-row[2])
+                return None
+            self._connection.execute("UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._transaction():
+            previous = self._connection.execute("SELECT size FROM result_cache WHERE key = ?", (key,)).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now + ttl, now)
+            )
+            total = self._add_size(len(payload) - (previous[0] if previous else 0))
+            if total > self.max_bytes:
+                self._evict(now, total)
+
+    def _evict(self, now: float, total: int) -> None:
+        expired = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM result_cache WHERE expires_at < ?", (now,)
+        ).fetchone()[0]
+        self._connection.execute("DELETE FROM result_cache WHERE expires_at < ?", (now,))
+        total = self._add_size(-expired)
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently accessed rows until the store fits again
+        stale = []
+        freed = 0
+        for key, size in self._connection.execute("SELECT key, size FROM result_cache ORDER BY accessed_at"):
+            if total - freed <= self.max_bytes:
+                break
+            stale.append((key,))
+            freed += size
+        self._connection.executemany("DELETE FROM result_cache WHERE key = ?", stale)
+        self._add_size(-freed)
+        self._evictions += len(stale)
+
+    def clear(self) -> None:
+        with self._lock, self._transaction():
+            self._connection.execute("DELETE FROM result_cache")
+            self._connection.execute("UPDATE result_cache_size SET total = 0 WHERE id = 0")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+            size = self._connection.execute("SELECT total FROM result_cache_size WHERE id = 0").fetchone()[0]
+        return {"entries": entries, "bytes": size, "evictions": self._evictions}
+
+class ResultCache:
+    """
+    Content-addressed cache for analysis results, keyed by a hash of the exact
+    input and the lexicon version that produced the result. Not normalized:
+    results hold fields tied to the text (original_brain_dump, text_content,
+    task offsets), which a hit must return for the caller's own text.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = 3600.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Analyses running on executor threads count hits and misses concurrently
+        self._counter_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key(self, namespace: str, text: str, version: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{namespace}:{version}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        """
+        Store a result; size is the caller's estimate of its memory footprint in bytes.
+        """
+        if self.backend is not None:
+            self.backend.set(key, value, size, self.ttl)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._counter_lock:
+            stats = {"hits": self.hits, "misses": self.misses}
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+def _backend_from_env() -> Optional[CacheBackend]:
+    backend = os.getenv("RESULT_CACHE_BACKEND", "memory")
+    max_bytes = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    if backend == "memory":
+        return MemoryCacheBackend(max_bytes=max_bytes)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(os.getenv("RESULT_CACHE_PATH", "./neurodesk_cache.db"), max_bytes=max_bytes)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {backend}")
+
+result_cache = ResultCache(_backend_from_env(), ttl=float(os.getenv("RESULT_CACHE_TTL", "3600")))
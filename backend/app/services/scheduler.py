@@ -0,0 +1,256 @@
+import asyncio
+import calendar
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+JobFunction = Callable[[], Awaitable[Any]]
+
+# Longest single sleep; waits are re-checked against the wall clock after it,
+# so a suspended machine or clock change does not leave a job hours late
+_MAX_SLEEP = 60.0
+
+class CronSchedule:
+    """
+    Five-field cron expression ("minute hour day-of-month month day-of-week") in UTC.
+    Fields accept *, numbers, ranges (1-5), lists (1,15) and steps (*/15, 0-30/10);
+    day-of-week is 0-6 with 0 = Sunday. As in cron, when both day fields are
+    restricted a day matching either one fires.
+    """
+
+    _FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(part, low, high) for part, (_, low, high) in zip(parts, self._FIELDS)
+        )
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            spec, _, step = part.partition("/")
+            if spec == "*":
+                start, end = low, high
+            elif "-" in spec:
+                start, end = (int(value) for value in spec.split("-", 1))
+            else:
+                start = end = int(spec)
+                if step:
+                    end = high
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, day: time.struct_time) -> bool:
+        in_month = day.tm_mday in self.days
+        in_week = (day.tm_wday + 1) % 7 in self.weekdays  # struct_time counts from Monday
+        if self._any_day:
+            return in_week
+        if self._any_weekday:
+            return in_month
+        return in_month or in_week
+
+    def next_after(self, timestamp: float) -> float:
+        """
+        The first matching minute strictly after `timestamp`.
+        """
+        candidate = (int(timestamp) // 60 + 1) * 60
+        limit = candidate + 5 * 366 * 86400
+        while candidate < limit:
+            moment = time.gmtime(candidate)
+            if moment.tm_mon not in self.months or not self._day_matches(moment):
+                # Skip to the next day
+                candidate = calendar.timegm((moment.tm_year, moment.tm_mon, moment.tm_mday, 0, 0, 0)) + 86400
+            elif moment.tm_hour not in self.hours:
+                candidate = (candidate // 3600 + 1) * 3600
+            elif moment.tm_min not in self.minutes:
+                candidate += 60
+            else:
+                return float(candidate)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+class IntervalSchedule:
+    """
+    Every `seconds`, counted from the previous run's scheduled time; `run_at_start`
+    fires once as soon as the scheduler starts.
+    """
+
+    def __init__(self, seconds: float, run_at_start: bool = False):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.run_at_start = run_at_start
+
+    def next_after(self, timestamp: float) -> float:
+        return timestamp + self.seconds
+
+class JobStats:
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.running = False
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_error: Optional[str] = None
+        self.next_run: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "running": self.running,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "mean_duration": self.total_duration / self.runs if self.runs else None,
+            "max_duration": self.max_duration,
+            "last_error": self.last_error,
+            "next_run": self.next_run,
+        }
+
+class Job:
+    def __init__(self, name: str, function: JobFunction, schedule: Any, jitter: float = 0.0, timeout: Optional[float] = None):
+        self.name = name
+        self.function = function
+        self.schedule = schedule
+        self.jitter = jitter
+        self.timeout = timeout
+        self.stats = JobStats()
+
+class Scheduler:
+    """
+    In-process asyncio scheduler for periodic maintenance jobs.
+
+    Each job gets its own loop task that sleeps until the next fire time (plus a
+    random jitter, so several workers or jobs do not all hit the database in the
+    same second) and then runs the job. At most `max_concurrency` jobs run at
+    once; a job that is still running when it is due again is skipped rather
+    than stacked. Jobs run on the event loop, so they should do their database
+    writes through the write queue and keep CPU-heavy work short.
+    """
+
+    def __init__(self, max_concurrency: int = 2):
+        self.max_concurrency = max_concurrency
+        self.jobs: Dict[str, Job] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._runs: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_job(
+        self,
+        name: str,
+        function: JobFunction,
+        cron: Optional[str] = None,
+        every: Optional[float] = None,
+        run_at_start: bool = False,
+        jitter: float = 0.0,
+        timeout: Optional[float] = None
+    ) -> Job:
+        """
+        Register a job on a cron expression or an interval in seconds (exactly one).
+        """
+        if (cron is None) == (every is None):
+            raise ValueError("A job needs either a cron expression or an interval")
+        if name in self.jobs:
+            raise ValueError(f"Job already registered: {name}")
+        schedule = CronSchedule(cron) if cron is not None else IntervalSchedule(every, run_at_start)
+        job = Job(name, function, schedule, jitter, timeout)
+        self.jobs[name] = job
+        if self.running:
+            self._tasks.append(asyncio.create_task(self._loop(job)))
+        return job
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs.values()]
+
+    async def stop(self) -> None:
+        """
+        Cancel the job loops, including jobs that are mid-run.
+        """
+        tasks, self._tasks = self._tasks + list(self._runs), []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_job(self, name: str) -> None:
+        """
+        Run a job now, outside its schedule (still within the concurrency limit).
+        """
+        job = self.jobs[name]
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        await self._run(job)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: job.stats.as_dict() for name, job in self.jobs.items()}
+
+    async def _loop(self, job: Job) -> None:
+        now = time.time()
+        schedule = job.schedule
+        due = now if isinstance(schedule, IntervalSchedule) and schedule.run_at_start else schedule.next_after(now)
+        while True:
+            fire_at = due + random.uniform(0, job.jitter)
+            job.stats.next_run = fire_at
+            while (delay := fire_at - time.time()) > 0:
+                await asyncio.sleep(min(delay, _MAX_SLEEP))
+
+            if job.stats.running:
+                job.stats.skipped += 1
+            else:
+                job.stats.running = True
+                run = asyncio.create_task(self._run(job))
+                self._runs.add(run)
+                run.add_done_callback(self._runs.discard)
+            # Schedule from the due time, not the finish time, so runs do not drift;
+            # if the loop fell far behind, skip ahead instead of firing a backlog
+            due = schedule.next_after(max(due, time.time() - 1))
+
+    async def _run(self, job: Job) -> None:
+        stats = job.stats
+        stats.running = True
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                stats.last_started = time.time()
+                try:
+                    if job.timeout is not None:
+                        await asyncio.wait_for(job.function(), job.timeout)
+                    else:
+                        await job.function()
+                    stats.last_error = None
+                except Exception as e:
+                    # Timeouts count as failures; a cancelled run (shutdown) is not recorded
+                    stats.failures += 1
+                    stats.last_error = f"{type(e).__name__}: {e}"
+                    logger.exception("Scheduled job %s failed", job.name)
+                duration = time.perf_counter() - started
+                stats.runs += 1
+                stats.last_duration = duration
+                stats.total_duration += duration
+                stats.max_duration = max(stats.max_duration, duration)
+        finally:
+            stats.running = False
+
+scheduler = Scheduler(max_concurrency=int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "2")))
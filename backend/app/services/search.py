@@ -0,0 +1,196 @@
+import html
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import IS_SQLITE, async_write_engine
+from app.services.tokenizer import tokenize
+
+MAX_RESULTS = 50
+
+# Full-text index over task titles/descriptions and brain dump text (SQLite FTS5).
+# `owner` holds one token per user so a search intersects the user's posting list
+# instead of filtering every match; the other metadata columns are not indexed.
+# Rowids encode the source row: task id * 2 for tasks, brain dump id * 2 + 1 for dumps.
+CREATE_SEARCH_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    owner,
+    kind UNINDEXED,
+    ref_id UNINDEXED,
+    category UNINDEXED,
+    energy UNINDEXED,
+    created_at UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+_INDEX_DUMP = text(
+    "INSERT INTO search_index (rowid, owner, kind, ref_id, category, energy, created_at, title, body) "
+    "SELECT id * 2 + 1, :owner, 'brain_dump', id, '', '', created_at, '', text FROM brain_dumps WHERE id = :dump_id"
+)
+_INDEX_DUMP_TASKS = text(
+    "INSERT INTO search_index (rowid, owner, kind, ref_id, category, energy, created_at, title, body) "
+    "SELECT id * 2, :owner, 'task', id, category, energy, created_at, title, COALESCE(description, '') "
+    "FROM tasks WHERE brain_dump_id = :dump_id"
+)
+_INDEX_TASK = text(
+    "INSERT INTO search_index (rowid, owner, kind, ref_id, category, energy, created_at, title, body) "
+    "SELECT id * 2, :owner, 'task', id, category, energy, created_at, title, COALESCE(description, '') "
+    "FROM tasks WHERE id = :task_id"
+)
+_UNINDEX = text("DELETE FROM search_index WHERE rowid = :rowid")
+
+# Matches are delimited with control characters rather than <mark> tags, so the
+# stored text can be HTML-escaped before the markers become tags (see _highlighted)
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+# bm25 column weights in declaration order: title matches count ten times body matches
+_SEARCH = """
+SELECT kind, ref_id, category, energy, created_at,
+       highlight(search_index, 6, :mark_start, :mark_end) AS title,
+       snippet(search_index, 7, :mark_start, :mark_end, '…', 16) AS snippet,
+       bm25(search_index, 0, 0, 0, 0, 0, 0, 10.0, 1.0) AS rank
+FROM search_index
+WHERE search_index MATCH :match {filters}
+ORDER BY rank
+LIMIT :limit
+"""
+
+class SearchUnavailable(RuntimeError):
+    pass
+
+def supports_search(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "sqlite"
+
+def owner_token(user_id: str) -> str:
+    # Hex keeps arbitrary user IDs a single token for the unicode61 tokenizer
+    return "u" + user_id.encode("utf-8").hex()
+
+def match_expression(user_id: str, query: str) -> Optional[str]:
+    """
+    FTS5 query for the user's documents containing every word of `query`.
+    Words are quoted so user input can never be parsed as FTS syntax; the
+    last word also matches as a prefix ("call mo" finds "call mom").
+    """
+    words = tokenize(query).words
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return f"owner:{owner_token(user_id)} AND {{title body}}: ({' '.join(terms)})"
+
+def _highlighted(value: Optional[str]) -> Optional[str]:
+    """
+    HTML-escaped text with the FTS match markers turned into <mark> tags, so the
+    user's own text can never inject markup into a client rendering the result.
+    """
+    if not value:
+        return None
+    escaped = html.escape(value)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+def create_search_index(connection: Any) -> None:
+    """
+    Create the FTS table (sync, for run_sync) and backfill it from existing rows
+    the first time it is created.
+    """
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).first()
+    connection.exec_driver_sql(CREATE_SEARCH_INDEX)
+    if exists:
+        return
+    for user_id, dump_id in connection.exec_driver_sql("SELECT user_id, id FROM brain_dumps").fetchall():
+        params = {"owner": owner_token(user_id), "dump_id": dump_id}
+        connection.execute(_INDEX_DUMP, params)
+        connection.execute(_INDEX_DUMP_TASKS, params)
+
+async def init_search_index() -> None:
+    if IS_SQLITE:
+        async with async_write_engine.begin() as connection:
+            await connection.run_sync(create_search_index)
+
+async def index_brain_dump(db: AsyncSession, user_id: str, dump_id: int) -> None:
+    """
+    Add a newly inserted brain dump and its tasks to the index (two statements,
+    whatever the number of tasks), in the caller's transaction.
+    """
+    if not supports_search(db):
+        return
+    params = {"owner": owner_token(user_id), "dump_id": dump_id}
+    await db.execute(_INDEX_DUMP, params)
+    await db.execute(_INDEX_DUMP_TASKS, params)
+
+async def reindex_task(db: AsyncSession, user_id: str, task_id: int) -> None:
+    """
+    Replace a task's index entry after its title, description, category or energy changed.
+    """
+    await reindex_tasks(db, user_id, [task_id])
+
+async def reindex_tasks(db: AsyncSession, user_id: str, task_ids: List[int]) -> None:
+    """
+    Replace (or add, for new tasks) the index entries of several of the user's
+    tasks: two executemany statements, whatever the number of tasks.
+    """
+    if not task_ids or not supports_search(db):
+        return
+    await unindex_tasks(db, task_ids)
+    owner = owner_token(user_id)
+    await db.execute(_INDEX_TASK, [{"owner": owner, "task_id": task_id} for task_id in task_ids])
+
+async def unindex_tasks(db: AsyncSession, task_ids: List[int]) -> None:
+    """
+    Drop deleted tasks from the index.
+    """
+    if not task_ids or not supports_search(db):
+        return
+    await db.execute(_UNINDEX, [{"rowid": task_id * 2} for task_id in task_ids])
+
+async def search(
+    db: AsyncSession,
+    user_id: str,
+    query: str,
+    category: Optional[str] = None,
+    energy: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Ranked matches (best first) among the user's tasks and brain dumps, with the
+    matched words highlighted in the title and a snippet of the body (HTML-escaped,
+    matches wrapped in <mark>).
+    """
+    if not supports_search(db):
+        raise SearchUnavailable("Full-text search requires the SQLite database")
+    match = match_expression(user_id, query)
+    if match is None:
+        return []
+
+    filters = []
+    params: Dict[str, Any] = {
+        "match": match,
+        "limit": max(1, min(limit, MAX_RESULTS)),
+        "mark_start": _MARK_START,
+        "mark_end": _MARK_END,
+    }
+    for column, value in (("category", category), ("energy", energy), ("kind", kind)):
+        if value is not None:
+            filters.append(f"AND {column} = :{column}")
+            params[column] = value
+
+    rows = await db.execute(text(_SEARCH.format(filters=" ".join(filters))), params)
+    return [
+        {
+            "kind": row.kind,
+            "id": str(row.ref_id),
+            "title": _highlighted(row.title),
+            "snippet": _highlighted(row.snippet),
+            "category": row.category or None,
+            "energy": row.energy or None,
+            "created_at": row.created_at,
+            "score": round(-row.rank, 4),
+        }
+        for row in rows
+    ]
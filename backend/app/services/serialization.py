@@ -0,0 +1,41 @@
+from typing import Any, Dict, List, Optional, Sequence
+import orjson
+from app.models.emotion import EmotionResponse
+from app.models.task import TaskFields
+
+# Emotion score maps are keyed by EmotionType; orjson writes enum keys by value
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def task_dict(task: TaskFields, exclude: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Field values of a task the service built itself, in schema order, without
+    re-validating or deep-copying them the way model_dump() does.
+    """
+    fields = dict(task.__dict__)
+    for name in exclude:
+        fields.pop(name, None)
+    return fields
+
+def emotion_dict(emotion_reading: Optional[EmotionResponse], include_text: bool = True) -> Optional[Dict[str, Any]]:
+    if emotion_reading is None:
+        return None
+    fields = dict(emotion_reading.__dict__)
+    if not include_text:
+        fields["text_content"] = None
+    return fields
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode plain data (dicts, lists, strings, numbers, str enums) straight to JSON bytes.
+    """
+    return orjson.dumps(value, option=JSON_OPTIONS)
+
+def encode_brain_dump(tasks: List[TaskFields], emotion_reading: Optional[EmotionResponse], processing_time: float) -> bytes:
+    """
+    JSON body matching BrainDumpResponse, encoded in one pass.
+    """
+    return dumps({
+        "tasks": [task.__dict__ for task in tasks],
+        "emotion_reading": emotion_dict(emotion_reading),
+        "processing_time": processing_time
+    })
@@ -0,0 +1,583 @@
+import asyncio
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.emotion import EmotionResponse
+from app.services.ai_service import BrainDumpResult
+from app.services.aggregates import Deltas, TaskState, apply_deltas, emotion_deltas, task_deltas
+from app.services.dedup import DEDUP_MODE, OFFLOAD_TITLES, OPEN_STATUSES, Duplicate, Fingerprint, duplicate_index, fingerprint_titles, match_titles
+from app.services.emotion_series import append_reading, append_readings
+from app.services.search import index_brain_dump, reindex_task, reindex_tasks, unindex_tasks
+from app.tables import BrainDumpRecord, EmotionReadingRecord, SummaryRecord, TaskRecord
+
+MAX_PAGE_SIZE = 100
+
+# Items (creates + updates + deletes) per bulk task request
+MAX_BULK_TASKS = 500
+
+# Task fields stored in the full-text index
+SEARCHABLE_TASK_FIELDS = {"title", "description", "category", "energy"}
+
+# Hot-path writes are Core statements on the tables: compiled once and cached,
+# without the ORM bulk-insert machinery (the rows are plain dicts anyway)
+_INSERT_BRAIN_DUMP = insert(BrainDumpRecord.__table__).returning(BrainDumpRecord.__table__.c.id)
+_INSERT_TASKS = insert(TaskRecord.__table__)
+# IDs of a dump's tasks in insertion order (RETURNING with a guaranteed order
+# would make SQLite insert the rows one statement at a time)
+_DUMP_TASK_IDS = select(TaskRecord.id).where(TaskRecord.brain_dump_id == bindparam("dump_id")).order_by(TaskRecord.id)
+_MENTION_TASK = (
+    update(TaskRecord.__table__)
+    .where(TaskRecord.__table__.c.id == bindparam("task_id"))
+    .values(
+        mention_count=TaskRecord.__table__.c.mention_count + bindparam("mentions"),
+        last_mentioned_at=bindparam("mentioned_at")
+    )
+)
+_FLAG_TASK = (
+    update(TaskRecord.__table__)
+    .where(TaskRecord.__table__.c.id == bindparam("task_id"))
+    .values(duplicate_of=bindparam("original_id"))
+)
+_INSERT_EMOTION_READING = insert(EmotionReadingRecord.__table__)
+
+class InvalidCursor(ValueError):
+    pass
+
+class TaskNotFound(LookupError):
+    pass
+
+class VersionConflict(Exception):
+    def __init__(self, task_id: int, current_version: int):
+        super().__init__(f"Task {task_id} was changed; it is now at version {current_version}")
+        self.task_id = task_id
+        self.current_version = current_version
+
+class BulkConflict(Exception):
+    # An atomic bulk request with failed items; carries every item's result
+    def __init__(self, results: List[Dict[str, Any]]):
+        super().__init__(f"{sum(entry['status'] not in ('ok', 'rolled_back') for entry in results)} bulk item(s) failed")
+        self.results = results
+
+class SavedBrainDump(NamedTuple):
+    id: int
+    duplicates: List[Optional[Duplicate]]  # per task of the dump, in order
+    # (task ID, version) per task of the dump, in order; a merged task's is its target's
+    tasks: List[Tuple[int, int]]
+
+def encode_cursor(created_at: float, row_id: int) -> str:
+    """
+    Opaque position of a row in a user's history, newest first.
+    """
+    return f"{created_at!r}_{row_id}"
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        created_at, row_id = cursor.split("_")
+        return float(created_at), int(row_id)
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+
+async def _page(db: AsyncSession, table: Type[Any], user_id: str, limit: int, before: Optional[str]) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of a user's rows, newest first, starting after the `before` cursor.
+
+    Keyset pagination: instead of OFFSET (which reads and discards every skipped
+    row) the query seeks into the (user_id, created_at, id) index at the cursor,
+    so page N costs the same as page 1.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = select(table).where(table.user_id == user_id)
+    if before is not None:
+        query = query.where(tuple_(table.created_at, table.id) < tuple_(*decode_cursor(before)))
+    # Fetch one extra row to know whether there is another page
+    query = query.order_by(table.created_at.desc(), table.id.desc()).limit(limit + 1)
+
+    rows = list(await db.scalars(query))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def _emotion_row(user_id: str, emotion_reading: EmotionResponse, created_at: float, brain_dump_id: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "brain_dump_id": brain_dump_id,
+        "primary_emotion": emotion_reading.primary_emotion.value,
+        "confidence": emotion_reading.confidence,
+        "source": emotion_reading.source,
+        "emotion_scores": {emotion.value: score for emotion, score in emotion_reading.emotion_scores.items()},
+        "is_overwhelm_detected": emotion_reading.is_overwhelm_detected,
+        "overwhelm_score": emotion_reading.overwhelm_score,
+        "created_at": created_at,
+    }
+
+async def save_brain_dump(
+    db: AsyncSession,
+    user_id: str,
+    text: str,
+    result: BrainDumpResult,
+    fingerprints: Optional[List[Optional[Fingerprint]]] = None
+) -> SavedBrainDump:
+    """
+    Write a processed brain dump with its tasks and emotion reading; all tasks of
+    the dump go in a single bulk INSERT and the day's aggregates in one upsert.
+    Tasks repeating one of the user's open tasks are merged into it or flagged
+    (TASK_DEDUP_MODE). Pass the task titles' fingerprints (fingerprint_titles) to
+    keep that work out of the write; they are computed here otherwise. Write
+    operations leave the commit to the caller (normally the write queue's group commit).
+    """
+    created_at = time.time()
+    dump_id = await db.scalar(_INSERT_BRAIN_DUMP, {
+        "user_id": user_id,
+        "text": text,
+        "task_count": len(result.tasks),
+        "processing_time": result.processing_time,
+        "created_at": created_at,
+    })
+
+    sources = result.task_sources or [None] * len(result.tasks)
+    task_rows = [
+        {
+            "user_id": user_id,
+            "brain_dump_id": dump_id,
+            "title": task.title,
+            "description": task.description,
+            "energy": task.energy,
+            "status": task.status,
+            "category": task.category,
+            "created_at": created_at,
+            "completed_at": task.completed_at,
+            "due_date": task.due_date,
+            "focus_minutes": task.focus_minutes,
+            "tags": list(task.tags),
+            "is_avoidance": task.is_avoidance,
+            "emotion_score": task.emotion_score,
+            "line": source.line if source else None,
+            "span_start": source.start if source else None,
+            "span_end": source.end if source else None,
+            "mention_count": 1,
+            "last_mentioned_at": None,
+            "duplicate_of": None,
+            "version": 1,
+        }
+        for task, source in zip(result.tasks, sources)
+    ]
+    duplicates: List[Optional[Duplicate]] = [None] * len(task_rows)
+    stored = list(range(len(task_rows)))
+    if task_rows and DEDUP_MODE != "off":
+        if fingerprints is None:
+            fingerprints = await fingerprint_titles([row["title"] for row in task_rows])
+        stored = await _dedupe_tasks(db, user_id, task_rows, fingerprints, duplicates, created_at)
+    else:
+        fingerprints = None
+
+    deltas = {}
+    ids_by_position: Dict[int, int] = {}
+    if stored:
+        await db.execute(_INSERT_TASKS, [task_rows[position] for position in stored])
+        task_ids = list(await db.scalars(_DUMP_TASK_IDS, {"dump_id": dump_id}))
+        ids_by_position = dict(zip(stored, task_ids))
+        if fingerprints is not None:
+            await _link_dump_duplicates(db, ids_by_position, duplicates)
+            duplicate_index.tasks_added(user_id, [
+                (task_id, fingerprints[position] if task_rows[position]["status"] in OPEN_STATUSES else None)
+                for position, task_id in zip(stored, task_ids)
+            ], created_at)
+
+        for position in stored:
+            task = result.tasks[position]
+            task_deltas(None, TaskState(created_at, task.energy, task.status, task.completed_at, task.focus_minutes, task.is_avoidance), deltas)
+    await index_brain_dump(db, user_id, dump_id)
+
+    if result.emotion_reading is not None:
+        # The dump keeps its own reading for history; trends read the time series
+        await db.execute(_INSERT_EMOTION_READING, _emotion_row(user_id, result.emotion_reading, created_at, dump_id))
+        await append_reading(db, user_id, result.emotion_reading, created_at)
+        emotion_deltas(result.emotion_reading, created_at, deltas)
+    await apply_deltas(db, user_id, deltas)
+
+    saved_ids = [ids_by_position[position] if position in ids_by_position else duplicates[position].task_id for position in range(len(task_rows))]
+    versions = {task_id: 1 for task_id in ids_by_position.values()}
+    merged_into = set(saved_ids) - versions.keys()
+    if merged_into:
+        versions.update((await db.execute(select(TaskRecord.id, TaskRecord.version).where(TaskRecord.id.in_(merged_into)))).all())
+    return SavedBrainDump(dump_id, duplicates, [(task_id, versions[task_id]) for task_id in saved_ids])
+
+async def _link_dump_duplicates(db: AsyncSession, ids_by_position: Dict[int, int], duplicates: List[Optional[Duplicate]]) -> None:
+    """
+    Point repeats within the dump at the copy that was just inserted.
+    """
+    flagged = []
+    for position, duplicate in enumerate(duplicates):
+        if duplicate is not None and duplicate.task_id < 0:
+            duplicates[position] = Duplicate(ids_by_position[-duplicate.task_id - 1], duplicate.merged)
+            if not duplicate.merged:
+                flagged.append({"task_id": ids_by_position[position], "original_id": duplicates[position].task_id})
+    if flagged:
+        await db.execute(_FLAG_TASK, flagged)
+
+async def _dedupe_tasks(
+    db: AsyncSession,
+    user_id: str,
+    task_rows: List[Dict[str, Any]],
+    fingerprints: List[Optional[Fingerprint]],
+    duplicates: List[Optional[Duplicate]],
+    created_at: float
+) -> List[int]:
+    """
+    Match the dump's tasks against the user's open tasks (and each other), record
+    the matches in `duplicates` and return the positions of the rows to insert.
+    A repeat of a row of this same dump is recorded with task_id = -(position + 1)
+    until that row has an ID.
+    """
+    index = await duplicate_index.for_user(db, user_id)
+    if len(fingerprints) >= OFFLOAD_TITLES:
+        # Writes are applied one at a time, so nothing else touches the index meanwhile
+        matches = await asyncio.to_thread(match_titles, index, fingerprints)
+    else:
+        matches = match_titles(index, fingerprints)
+
+    # The in-memory index can be behind (a task completed by another worker, a
+    # rolled-back batch): only still-open tasks are merged into or flagged against
+    matched_ids = {match.target for match in matches if match is not None and match.indexed}
+    if matched_ids:
+        open_ids = set(await db.scalars(
+            select(TaskRecord.id).where(TaskRecord.id.in_(matched_ids), TaskRecord.user_id == user_id, TaskRecord.status.in_(OPEN_STATUSES))
+        ))
+        for task_id in matched_ids - open_ids:
+            index.remove(task_id)
+        matches = [None if match is not None and match.indexed and match.target not in open_ids else match for match in matches]
+
+    merge = DEDUP_MODE == "merge"
+    mentions: Dict[int, int] = {}
+    stored = []
+    for position, match in enumerate(matches):
+        if match is None:
+            stored.append(position)
+            continue
+        if match.indexed:
+            duplicates[position] = Duplicate(match.target, merge)
+            if merge:
+                mentions[match.target] = mentions.get(match.target, 0) + 1
+            else:
+                task_rows[position]["duplicate_of"] = match.target
+                stored.append(position)
+        else:
+            duplicates[position] = Duplicate(-match.target - 1, merge)
+            if merge:
+                task_rows[match.target]["mention_count"] += 1
+                task_rows[match.target]["last_mentioned_at"] = created_at
+            else:
+                stored.append(position)
+
+    if mentions:
+        await db.execute(_MENTION_TASK, [
+            {"task_id": task_id, "mentions": count, "mentioned_at": created_at} for task_id, count in mentions.items()
+        ])
+    return stored
+
+async def save_emotion_reading(db: AsyncSession, user_id: str, emotion_reading: EmotionResponse) -> None:
+    """
+    Record a standalone emotion check in the user's time series and daily aggregates.
+    """
+    await save_emotion_readings(db, user_id, [emotion_reading])
+
+async def save_emotion_readings(db: AsyncSession, user_id: str, emotion_readings: List[EmotionResponse]) -> None:
+    """
+    Record a batch of standalone emotion checks: one time-series append and one
+    aggregate upsert, whatever the size of the batch.
+    """
+    if not emotion_readings:
+        return
+    timestamp = time.time()
+    deltas: Deltas = {}
+    for emotion_reading in emotion_readings:
+        emotion_deltas(emotion_reading, timestamp, deltas)
+    await append_readings(db, user_id, [(timestamp, emotion_reading) for emotion_reading in emotion_readings])
+    await apply_deltas(db, user_id, deltas)
+
+async def save_summary(db: AsyncSession, user_id: str, summary: Any, include_tasks: bool = True, include_emotions: bool = True) -> SummaryRecord:
+    record = SummaryRecord(
+        user_id=user_id,
+        date=summary.date,
+        summary_text=summary.summary_text,
+        insights=list(summary.insights),
+        recommendations=list(summary.recommendations),
+        mood_score=summary.mood_score,
+        productivity_score=summary.productivity_score,
+        include_tasks=include_tasks,
+        include_emotions=include_emotions,
+        created_at=time.time()
+    )
+    db.add(record)
+    await db.flush()
+    return record
+
+async def latest_summary(db: AsyncSession, user_id: str, day: str, include_tasks: bool = True, include_emotions: bool = True) -> Optional[SummaryRecord]:
+    """
+    The user's newest summary of the day covering exactly the given parts.
+    """
+    return await db.scalar(
+        select(SummaryRecord)
+        .where(
+            SummaryRecord.user_id == user_id,
+            SummaryRecord.date == day,
+            SummaryRecord.include_tasks == include_tasks,
+            SummaryRecord.include_emotions == include_emotions
+        )
+        .order_by(SummaryRecord.created_at.desc())
+        .limit(1)
+    )
+
+def _task_state(task: TaskRecord) -> TaskState:
+    return TaskState(task.created_at, task.energy, task.status, task.completed_at, task.focus_minutes, task.is_avoidance)
+
+def _apply_changes(task: TaskRecord, changes: Dict[str, Any], deltas: Deltas) -> None:
+    before = _task_state(task)
+    status = changes.get("status")
+    if status is not None and status != task.status:
+        task.completed_at = time.time() if status == "completed" else None
+    for name, value in changes.items():
+        setattr(task, name, value)
+    task.version += 1
+    task_deltas(before, _task_state(task), deltas)
+
+async def update_task(
+    db: AsyncSession,
+    user_id: str,
+    task_id: int,
+    changes: Dict[str, Any],
+    expected_version: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Apply field changes to one of the user's tasks and move its contribution in the
+    daily aggregates (completion day, energy, focus minutes) accordingly.
+    Completing a task stamps completed_at; reopening it clears it. With
+    `expected_version`, the update is refused if the task changed since.
+    """
+    task = await db.get(TaskRecord, task_id)
+    if task is None or task.user_id != user_id:
+        raise TaskNotFound(f"Task {task_id} not found")
+    if expected_version is not None and task.version != expected_version:
+        raise VersionConflict(task_id, task.version)
+
+    deltas: Deltas = {}
+    _apply_changes(task, changes, deltas)
+    await apply_deltas(db, user_id, deltas)
+    await db.flush()
+    if SEARCHABLE_TASK_FIELDS & changes.keys():
+        await reindex_task(db, user_id, task_id)
+    if {"title", "status"} & changes.keys():
+        duplicate_index.task_changed(user_id, task_id, task.title, task.status)
+    return _task_dict(task)
+
+async def bulk_tasks(
+    db: AsyncSession,
+    user_id: str,
+    creates: List[Dict[str, Any]],
+    updates: List[Tuple[int, Optional[int], Dict[str, Any]]],
+    deletes: List[Tuple[int, Optional[int]]],
+    atomic: bool = False
+) -> Dict[str, Any]:
+    """
+    Create, update and delete many of the user's tasks in one transaction.
+
+    `updates` are (task_id, expected_version, changes) and `deletes` are
+    (task_id, expected_version); an expected version of None skips the check.
+    Items apply in order (creates, then updates, then deletes) and each gets a
+    result: "ok", "not_found", or "conflict" with the task's current version.
+    Failed items are skipped and the rest still apply, unless `atomic`, in which
+    case any failure raises BulkConflict and nothing is written: the items that
+    did not fail are then "rolled_back", with the task's unchanged version and,
+    for creates, no id.
+
+    The cost stays a handful of statements whatever the number of items: one
+    read of the referenced tasks, one flush, one aggregate upsert per touched
+    day and two executemany statements for the search index.
+    """
+    now = time.time()
+    referenced = {task_id for task_id, _, _ in updates} | {task_id for task_id, _ in deletes}
+    tasks: Dict[int, TaskRecord] = {}
+    if referenced:
+        tasks = {task.id: task for task in await db.scalars(
+            select(TaskRecord).where(TaskRecord.id.in_(referenced), TaskRecord.user_id == user_id)
+        )}
+    stored_versions = {task_id: task.version for task_id, task in tasks.items()}
+
+    deltas: Deltas = {}
+    results: List[Dict[str, Any]] = []
+
+    def result(op: str, index: int, status: str, task_id: Optional[int], task: Optional[TaskRecord] = None) -> Dict[str, Any]:
+        entry = {
+            "op": op,
+            "index": index,
+            "status": status,
+            "id": str(task_id) if task_id is not None else None,
+            "version": task.version if task is not None else None,
+            "task": None,
+        }
+        results.append(entry)
+        return entry
+
+    def check(op: str, index: int, task_id: int, expected_version: Optional[int]) -> Optional[TaskRecord]:
+        task = tasks.get(task_id)
+        if task is None:
+            result(op, index, "not_found", task_id)
+        elif expected_version is not None and task.version != expected_version:
+            result(op, index, "conflict", task_id, task)
+        else:
+            return task
+        return None
+
+    created = [
+        TaskRecord(user_id=user_id, created_at=now, status="todo", mention_count=1, version=1, **fields)
+        for fields in creates
+    ]
+    db.add_all(created)
+    await db.flush()
+    for index, task in enumerate(created):
+        tasks[task.id] = task
+        task_deltas(None, _task_state(task), deltas)
+        result("create", index, "ok", task.id, task)
+
+    updated: List[TaskRecord] = []
+    reindex = {task.id for task in created}
+    for index, (task_id, expected_version, changes) in enumerate(updates):
+        task = check("update", index, task_id, expected_version)
+        if task is None:
+            continue
+        _apply_changes(task, changes, deltas)
+        updated.append(task)
+        if SEARCHABLE_TASK_FIELDS & changes.keys():
+            reindex.add(task_id)
+        result("update", index, "ok", task_id, task)
+
+    deleted: List[int] = []
+    for index, (task_id, expected_version) in enumerate(deletes):
+        task = check("delete", index, task_id, expected_version)
+        if task is None:
+            continue
+        task_deltas(_task_state(task), None, deltas)
+        await db.delete(task)
+        del tasks[task_id]
+        deleted.append(task_id)
+        result("delete", index, "ok", task_id)
+
+    failed = sum(entry["status"] != "ok" for entry in results)
+    if failed and atomic:
+        # Report the state the rollback leaves, not the one built in the session
+        for entry in results:
+            if entry["op"] == "create":
+                entry.update(status="rolled_back", id=None, version=None)
+                continue
+            if entry["status"] == "ok":
+                entry["status"] = "rolled_back"
+            if entry["id"] is not None and int(entry["id"]) in stored_versions:
+                entry["version"] = stored_versions[int(entry["id"])]
+        raise BulkConflict(results)
+
+    await db.flush()
+    await apply_deltas(db, user_id, deltas)
+    await reindex_tasks(db, user_id, sorted(reindex - set(deleted)))
+    await unindex_tasks(db, deleted)
+    for task in created + updated:
+        if task.id in tasks:
+            duplicate_index.task_changed(user_id, task.id, task.title, task.status)
+    for task_id in deleted:
+        duplicate_index.task_removed(user_id, task_id)
+
+    for entry in results:
+        if entry["status"] == "ok" and entry["op"] != "delete":
+            task = tasks.get(int(entry["id"]))
+            if task is not None:
+                # The final state, after any later item of the request touched the task
+                entry["task"] = _task_dict(task)
+                entry["version"] = task.version
+    return {"results": results, "applied": len(results) - failed, "failed": failed}
+
+def _task_dict(task: TaskRecord) -> Dict[str, Any]:
+    return {
+        "id": str(task.id),
+        "title": task.title,
+        "description": task.description,
+        "energy": task.energy,
+        "status": task.status,
+        "category": task.category,
+        "created_at": task.created_at,
+        "completed_at": task.completed_at,
+        "due_date": task.due_date,
+        "focus_minutes": task.focus_minutes,
+        "tags": task.tags,
+        "is_avoidance": task.is_avoidance,
+        "emotion_score": task.emotion_score,
+        "line": task.line,
+        "span": [task.span_start, task.span_end] if task.span_start is not None else None,
+        "mention_count": task.mention_count,
+        "last_mentioned_at": task.last_mentioned_at,
+        "duplicate_of": str(task.duplicate_of) if task.duplicate_of is not None else None,
+        "version": task.version,
+    }
+
+def _emotion_dict(reading: EmotionReadingRecord) -> Dict[str, Any]:
+    return {
+        "id": str(reading.id),
+        "timestamp": reading.created_at,
+        "primary_emotion": reading.primary_emotion,
+        "confidence": reading.confidence,
+        "source": reading.source,
+        "emotion_scores": reading.emotion_scores,
+        "is_overwhelm_detected": reading.is_overwhelm_detected,
+        "overwhelm_score": reading.overwhelm_score,
+    }
+
+async def brain_dump_history(db: AsyncSession, user_id: str, limit: int = 10, before: Optional[str] = None) -> Dict[str, Any]:
+    """
+    A page of a user's brain dumps, newest first, each with its tasks and emotion reading.
+    Tasks and readings for the whole page are loaded with one query each.
+    """
+    dumps, next_cursor = await _page(db, BrainDumpRecord, user_id, limit, before)
+    dump_ids = [dump.id for dump in dumps]
+
+    tasks_by_dump: Dict[int, List[Dict[str, Any]]] = {dump_id: [] for dump_id in dump_ids}
+    readings_by_dump: Dict[int, Dict[str, Any]] = {}
+    if dump_ids:
+        for task in await db.scalars(select(TaskRecord).where(TaskRecord.brain_dump_id.in_(dump_ids)).order_by(TaskRecord.id)):
+            tasks_by_dump[task.brain_dump_id].append(_task_dict(task))
+        for reading in await db.scalars(select(EmotionReadingRecord).where(EmotionReadingRecord.brain_dump_id.in_(dump_ids))):
+            readings_by_dump[reading.brain_dump_id] = _emotion_dict(reading)
+
+    return {
+        "brain_dumps": [
+            {
+                "id": str(dump.id),
+                "text": dump.text,
+                "created_at": dump.created_at,
+                "processing_time": dump.processing_time,
+                "tasks": tasks_by_dump[dump.id],
+                "emotion_reading": readings_by_dump.get(dump.id),
+            }
+            for dump in dumps
+        ],
+        "next_cursor": next_cursor,
+    }
+
+async def summary_history(db: AsyncSession, user_id: str, limit: int = 7, before: Optional[str] = None) -> Dict[str, Any]:
+    summaries, next_cursor = await _page(db, SummaryRecord, user_id, limit, before)
+    return {
+        "summaries": [
+            {
+                "id": str(summary.id),
+                "date": summary.date,
+                "summary_text": summary.summary_text,
+                "insights": summary.insights,
+                "recommendations": summary.recommendations,
+                "mood_score": summary.mood_score,
+                "productivity_score": summary.productivity_score,
+                "created_at": summary.created_at,
+            }
+            for summary in summaries
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,50 @@
+import re
+from typing import Iterator, NamedTuple, Tuple
+
+# Words are runs of letters/digits, optionally joined by apostrophes ("can't", "mom's")
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+
+class Token(NamedTuple):
+    text: str
+    start: int
+    end: int
+
+def normalize_token(word: str) -> str:
+    """
+    Normalize a raw word: lowercase and fold typographic apostrophes.
+    """
+    return word.lower().replace('’', "'")
+
+class TokenizedText:
+    """
+    Word tokens of a piece of text with their offsets into the original string.
+    """
+
+    __slots__ = ("text", "tokens", "words")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = [
+            Token(normalize_token(match.group()), match.start(), match.end())
+            for match in TOKEN_PATTERN.finditer(text)
+        ]
+        self.words = tuple(token.text for token in self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+def tokenize(text: str) -> TokenizedText:
+    return TokenizedText(text)
+
+def iter_lines(text: str) -> Iterator[Tuple[int, int, str]]:
+    """
+    Lazily yield (start, end, line) for every line of text without building a list of lines.
+    """
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield start, len(text), text[start:]
+            return
+        yield start, end, text[start:end]
+        start = end + 1
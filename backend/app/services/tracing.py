@@ -0,0 +1,353 @@
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Where finished traces go: none (tracing off), memory (kept in process, for tests) or file (JSON lines)
+TRACING_EXPORTERS = ("none", "memory", "file")
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+TRACING_FILE = os.getenv("TRACING_FILE", "./traces.jsonl")
+
+# Share of requests without a sampled traceparent that are traced
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+
+if TRACING_EXPORTER not in TRACING_EXPORTERS:
+    raise ValueError(f"Unknown TRACING_EXPORTER: {TRACING_EXPORTER}")
+
+# W3C trace context: version-trace_id-parent_id-flags
+TRACEPARENT_PATTERN = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+SpanData = Dict[str, Any]
+
+class _Trace:
+    """
+    The spans of one trace finished in this process, exported together when
+    its local root ends (a worker process has no root: the caller collects them).
+    """
+
+    __slots__ = ("root", "finished")
+
+    def __init__(self):
+        self.root: Optional["Span"] = None
+        self.finished: List[SpanData] = []
+
+class Span:
+    __slots__ = ("name", "trace", "trace_id", "span_id", "parent_id", "attributes", "status", "start_time", "_started", "duration")
+
+    recording = True
+
+    def __init__(self, name: str, trace: _Trace, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def update(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.trace.finished.append(self.to_dict())
+        if self.trace.root is self:
+            tracer.exporter.export(self.trace.finished)
+
+    def to_dict(self) -> SpanData:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+class _NoopSpan:
+    """
+    Stands in for a span when the current request is not traced, so callers can
+    set attributes unconditionally.
+    """
+
+    recording = False
+    traceparent = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def update(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def fail(self, error: BaseException) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+_current: contextvars.ContextVar = contextvars.ContextVar("span", default=None)
+
+class Exporter:
+    def export(self, spans: List[SpanData]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+class NoopExporter(Exporter):
+    def export(self, spans: List[SpanData]) -> None:
+        pass
+
+class InMemoryExporter(Exporter):
+    """
+    Keeps the most recent `max_spans` finished spans, for tests and debugging.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: deque = deque(maxlen=max_spans)
+
+    def export(self, spans: List[SpanData]) -> None:
+        self.spans.extend(spans)
+
+    def trace(self, trace_id: str) -> List[SpanData]:
+        return [span for span in self.spans if span["trace_id"] == trace_id]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+class FileExporter(Exporter):
+    """
+    Appends one JSON object per span to a file, a trace at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, spans: List[SpanData]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def exporter_from_env() -> Exporter:
+    if TRACING_EXPORTER == "memory":
+        return InMemoryExporter()
+    if TRACING_EXPORTER == "file":
+        return FileExporter(TRACING_FILE)
+    return NoopExporter()
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    (trace_id, parent_id, sampled) from a traceparent header, or None if absent or malformed.
+    """
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+class Tracer:
+    def __init__(self, exporter: Optional[Exporter] = None, sample_rate: float = 1.0):
+        self.exporter = exporter or NoopExporter()
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self.exporter, NoopExporter)
+
+    def configure(self, exporter: Exporter, sample_rate: Optional[float] = None) -> None:
+        self.exporter.shutdown()
+        self.exporter = exporter
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """
+        Root span of the local part of a trace, continuing the caller's trace when
+        a valid traceparent is given (and following its sampling decision), or None
+        when the trace is not sampled. End it with end().
+        """
+        if not self.enabled:
+            return None
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return None
+        trace = _Trace()
+        trace.root = Span(name, trace, trace_id, parent_id, dict(attributes or {}))
+        return trace.root
+
+tracer = Tracer(exporter_from_env(), TRACING_SAMPLE_RATE)
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    A child of the current span for the duration of the block; a no-op span
+    when the current request is not traced.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = Span(name, parent.trace, parent.trace_id, parent.span_id, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+@contextmanager
+def activate(root: Span) -> Iterator[Span]:
+    """
+    Make a root span from start_trace current for the block, then end it.
+    """
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        root.end()
+
+def timed(func: Callable[..., Any], totals: Dict[str, float], key: str) -> Callable[..., Any]:
+    """
+    func, adding the time spent in each call to totals[key]: for steps run once
+    per line, too fine-grained to be spans of their own.
+    """
+    clock = time.perf_counter
+    totals.setdefault(key, 0.0)
+    def wrapper(*args: Any) -> Any:
+        started = clock()
+        try:
+            return func(*args)
+        finally:
+            totals[key] += clock() - started
+    return wrapper
+
+def remote_parent() -> Optional[Tuple[str, str]]:
+    """
+    (trace_id, span_id) of the current span, to continue the trace in a worker process.
+    """
+    current = _current.get()
+    return (current.trace_id, current.span_id) if current is not None else None
+
+def call_traced(parent: Optional[Tuple[str, str]], func: Callable[..., Any], *args: Any) -> Tuple[Any, List[SpanData]]:
+    """
+    Run func(*args) in a worker process as part of the parent's trace and return
+    the spans it finished, for adopt() in the calling process.
+    """
+    if parent is None:
+        return func(*args), []
+    trace = _Trace()
+    remote = Span("remote", trace, parent[0], None, {})
+    remote.span_id = parent[1]
+    token = _current.set(remote)
+    try:
+        return func(*args), trace.finished
+    finally:
+        _current.reset(token)
+
+def adopt(spans: List[SpanData]) -> None:
+    """
+    Add spans finished in a worker process to the current trace.
+    """
+    current = _current.get()
+    if current is not None and spans:
+        current.trace.finished.extend(spans)
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per sampled request, continuing the
+    trace of an incoming traceparent header. The span is named after the route
+    template once routing is done, and its trace ID is returned in X-Trace-Id so
+    a slow response can be looked up in the exported spans.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+            elif name == b"content-length":
+                content_length = int(value)
+        root = tracer.start_trace("HTTP " + scope["method"], traceparent, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+            "http.request_content_length": content_length,
+        })
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = "error"
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", root.trace_id.encode())]
+            await send(message)
+
+        with activate(root):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                root.name = f"{scope['method']} {route}"
+                root.set("http.route", route)
@@ -0,0 +1,149 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import AsyncWriteSessionLocal
+
+WriteOperation = Callable[..., Awaitable[Any]]
+_PendingWrite = Tuple[WriteOperation, Tuple[Any, ...], "asyncio.Future[Any]"]
+
+class WriteQueue:
+    """
+    Single background writer that group-commits database writes.
+
+    Requests submit write operations (async callables taking a session) and await
+    their result. The writer collects whatever arrives within `window` seconds, up
+    to `max_batch` operations, runs them in one transaction and commits once, so
+    a burst of brain dumps costs one commit (and one fsync) instead of one each.
+    Reads do not go through the queue and keep running concurrently.
+
+    Under WAL with synchronous=NORMAL a commit is cheap, and the writer's time
+    goes to the statements of each dump (dedup lookup, aggregates, search index,
+    emotion series), so group commit adds little throughput on its own:
+    benchmarks/sqlite_ingest.py measured 108 vs 123 dumps/s here (102 vs 109
+    with synchronous=FULL), within run-to-run noise. What the queue does deliver
+    is one writer instead of many: no SQLITE_BUSY waits between writers, and
+    about a hundred times fewer commits and fsyncs, which matters on slow disks.
+
+    Each operation runs in a savepoint: one that raises is rolled back alone and
+    fails its own request while the rest of the batch commits. Only if the
+    commit itself fails are the operations retried one per transaction.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_batch: int = 256, window: float = 0.002):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.window = window
+        self.batches = 0
+        self.writes = 0
+        self._queue: Optional["asyncio.Queue[Optional[_PendingWrite]]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        """
+        Writes submitted and not yet picked up by the writer.
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Flush pending writes and stop the writer.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            self._queue.put_nowait(None)
+            await task
+
+    async def submit(self, operation: WriteOperation, *args: Any) -> Any:
+        """
+        Run `await operation(session, *args)` in the next group commit and return its result
+        once the batch is committed. Operations must not commit themselves.
+        """
+        if self._task is None:
+            # Not started (scripts, one-off tools): write in a transaction of our own
+            async with self.session_factory() as session:
+                result = await operation(session, *args)
+                await session.commit()
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((operation, args, future))
+        return await future
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._commit(batch)
+
+    async def _commit(self, batch: List[_PendingWrite]) -> None:
+        outcomes: List[Tuple[bool, Any]] = []
+        try:
+            async with self.session_factory() as session:
+                for operation, args, _ in batch:
+                    try:
+                        async with session.begin_nested():
+                            outcomes.append((True, await operation(session, *args)))
+                    except Exception as e:
+                        outcomes.append((False, e))
+                await session.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                await self._commit_each(batch)
+            elif not batch[0][2].done():
+                batch[0][2].set_exception(e)
+            return
+
+        succeeded = sum(ok for ok, _ in outcomes)
+        if succeeded:
+            self.batches += 1
+            self.writes += succeeded
+        for (_, _, future), (ok, outcome) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(outcome)
+            else:
+                future.set_exception(outcome)
+
+    async def _commit_each(self, batch: List[_PendingWrite]) -> None:
+        for operation, args, future in batch:
+            try:
+                async with self.session_factory() as session:
+                    result = await operation(session, *args)
+                    await session.commit()
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.writes += 1
+            if not future.done():
+                future.set_result(result)
+
+write_queue = WriteQueue(
+    AsyncWriteSessionLocal,
+    max_batch=int(os.getenv("WRITE_QUEUE_MAX_BATCH", "256")),
+    window=float(os.getenv("WRITE_QUEUE_WINDOW_MS", "2")) / 1000
+)
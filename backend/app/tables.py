@@ -0,0 +1,133 @@
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Index, Integer, JSON, LargeBinary, String, Text
+from app.database import Base
+
+# ORM tables. Every per-user table is indexed on (user_id, created_at, id) so
+# history pages are served by an index range scan (see app/services/storage.py).
+
+class BrainDumpRecord(Base):
+    __tablename__ = "brain_dumps"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    task_count = Column(Integer, nullable=False, default=0)
+    processing_time = Column(Float, nullable=False, default=0.0)
+    created_at = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_brain_dumps_user_created", "user_id", "created_at", "id"),
+    )
+
+class TaskRecord(Base):
+    __tablename__ = "tasks"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    brain_dump_id = Column(Integer, ForeignKey("brain_dumps.id", ondelete="CASCADE"), nullable=True)
+    title = Column(Text, nullable=False)
+    description = Column(Text, nullable=True)
+    energy = Column(String, nullable=False, default="medium")
+    status = Column(String, nullable=False, default="todo")
+    category = Column(String, nullable=False, default="other")
+    created_at = Column(Float, nullable=False)
+    completed_at = Column(Float, nullable=True)
+    due_date = Column(Float, nullable=True)
+    focus_minutes = Column(Integer, nullable=False, default=0)
+    tags = Column(JSON, nullable=False, default=list)
+    is_avoidance = Column(Boolean, nullable=False, default=False)
+    emotion_score = Column(Float, nullable=False, default=0.0)
+    # Where the title came from in the brain dump text
+    line = Column(Integer, nullable=True)
+    span_start = Column(Integer, nullable=True)
+    span_end = Column(Integer, nullable=True)
+    # Near-duplicate detection (see app/services/dedup.py): how often the task was
+    # repeated in later dumps, or the open task this one repeats when flagged
+    mention_count = Column(Integer, nullable=False, default=1)
+    last_mentioned_at = Column(Float, nullable=True)
+    duplicate_of = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)
+    # Bumped on every edit; clients send the version they saw so a stale edit is refused
+    version = Column(Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_brain_dump", "brain_dump_id"),
+    )
+
+class EmotionReadingRecord(Base):
+    __tablename__ = "emotion_readings"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    brain_dump_id = Column(Integer, ForeignKey("brain_dumps.id", ondelete="CASCADE"), nullable=True)
+    primary_emotion = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    source = Column(String, nullable=False)
+    emotion_scores = Column(JSON, nullable=False, default=dict)
+    is_overwhelm_detected = Column(Boolean, nullable=False, default=False)
+    overwhelm_score = Column(Float, nullable=False, default=0.0)
+    created_at = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_emotion_readings_user_created", "user_id", "created_at", "id"),
+        Index("ix_emotion_readings_brain_dump", "brain_dump_id"),
+    )
+
+class SummaryRecord(Base):
+    __tablename__ = "summaries"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    date = Column(String, nullable=False)
+    summary_text = Column(Text, nullable=False)
+    insights = Column(JSON, nullable=False, default=list)
+    recommendations = Column(JSON, nullable=False, default=list)
+    mood_score = Column(Float, nullable=False)
+    productivity_score = Column(Float, nullable=False)
+    # What the summary covers; only a summary with the same scope answers a later request
+    include_tasks = Column(Boolean, nullable=False, default=True)
+    include_emotions = Column(Boolean, nullable=False, default=True)
+    created_at = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_summaries_user_created", "user_id", "created_at", "id"),
+        Index("ix_summaries_user_date", "user_id", "date", "created_at"),
+    )
+
+# Per-user, per-day (UTC) counters kept up to date by every task and emotion
+# write (see app/services/aggregates.py), so summaries read one row instead of
+# scanning the user's history
+class DailyAggregateRecord(Base):
+    __tablename__ = "daily_aggregates"
+
+    user_id = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    tasks_created = Column(Integer, nullable=False, default=0)
+    tasks_created_low = Column(Integer, nullable=False, default=0)
+    tasks_created_medium = Column(Integer, nullable=False, default=0)
+    tasks_created_high = Column(Integer, nullable=False, default=0)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    tasks_completed_low = Column(Integer, nullable=False, default=0)
+    tasks_completed_medium = Column(Integer, nullable=False, default=0)
+    tasks_completed_high = Column(Integer, nullable=False, default=0)
+    avoidance_tasks = Column(Integer, nullable=False, default=0)
+    focus_minutes = Column(Integer, nullable=False, default=0)  # of tasks completed that day
+    emotion_readings = Column(Integer, nullable=False, default=0)
+    mood_sum = Column(Float, nullable=False, default=0.0)  # sum of valence * confidence
+    overwhelm_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # Nightly summary precomputation walks one day across all users
+        Index("ix_daily_aggregates_day", "day"),
+    )
+
+# Emotion time series: fixed-width records packed into one blob per user,
+# resolution and time block (see app/services/emotion_series.py)
+class EmotionSeriesBlock(Base):
+    __tablename__ = "emotion_series_blocks"
+
+    user_id = Column(String, primary_key=True)
+    resolution = Column(String, primary_key=True)  # raw, minute, hour, day or pending (buffered raw readings)
+    block_start = Column(Integer, primary_key=True)  # epoch seconds, aligned to the block span
+    count = Column(Integer, nullable=False, default=0)
+    data = Column(LargeBinary, nullable=False)
@@ -0,0 +1,191 @@
+"""
+Cost of the text analysis hot paths on synthetic brain dumps from 1 to 100k lines.
+
+Covers extract_tasks, detect_emotion and calculate_overwhelm_score of the
+serverless entrypoint (api/index.py) and AIService._extract_tasks and the
+emotion detector of the backend. The backend detector is timed through
+EmotionDetector.analyze, the uncached work detect_emotion hands to the analysis
+executor, so neither the result cache nor a thread hop is measured.
+
+Corpora mix task bullets, free-form sentences and blank lines, with lexicon
+keywords at --keyword-density of the words (the rest drawn from a long-tail
+vocabulary). Each case reports calls per second, microseconds per line and
+peak traced memory of one call (timings are the best of several rounds). --output saves the results as JSON and
+--baseline compares against an earlier file, exiting non-zero when a case got
+slower per line by more than --threshold.
+
+    cd backend
+    python -m benchmarks.analysis --output analysis.json
+    python -m benchmarks.analysis --sizes 100 10000 --baseline analysis.json --threshold 0.15
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from app.services.ai_service import AIService
+from app.services.emotion_detector import EmotionDetector
+from app.services.lexicon import lexicon_registry
+from app.services.result_cache import ResultCache
+
+ENTRYPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "api", "index.py")
+
+SIZES = [1, 10, 100, 1000, 10000, 100000]
+BULLETS = ["- ", "* ", "• ", ""]
+OPENERS = ["need to", "should", "have to", "want to", "i feel", "feeling", "remember to", ""]
+
+def load_entrypoint():
+    spec = importlib.util.spec_from_file_location("serverless_index", os.path.normpath(ENTRYPOINT))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_vocabulary(rng: random.Random, size: int = 5000) -> List[str]:
+    letters = "abcdefghijklmnoprstuvw"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+
+def synthetic_corpus(rng: random.Random, lines: int, keywords: List[str], vocabulary: List[str], density: float) -> str:
+    def line() -> str:
+        if rng.random() < 0.05:
+            return ""
+        words = [rng.choice(keywords) if rng.random() < density else rng.choice(vocabulary) for _ in range(rng.randint(3, 12))]
+        return rng.choice(BULLETS) + " ".join(filter(None, [rng.choice(OPENERS)] + words))
+    return "\n".join(line() for _ in range(lines))
+
+def measure(function: Callable[[], Any], min_time: float, rounds: int) -> Dict[str, float]:
+    """
+    Best of `rounds` rounds of calls, each at least min_time / rounds long, after
+    an untimed warm-up round: the fastest round is the one least disturbed by the
+    rest of the machine.
+    """
+    best = float("inf")
+    # As timeit does: a collection landing in one round but not another is noise
+    gc.disable()
+    try:
+        for round_number in range(rounds + 1):
+            calls = 0
+            started = time.perf_counter()
+            while True:
+                function()
+                calls += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_time / rounds:
+                    break
+            if round_number:
+                best = min(best, elapsed / calls)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ops_per_sec": 1 / best, "seconds_per_call": best, "peak_kb": peak / 1024}
+
+def cases(serverless, service: AIService, detector: EmotionDetector) -> Dict[str, Callable[[str], Callable[[], Any]]]:
+    """
+    Benchmark name -> function of the corpus text returning the call to time.
+    """
+    def overwhelm(text: str) -> Callable[[], Any]:
+        # Scoring only: the matches and emotion scores detect_emotion would pass in
+        matches = set()
+        total_words = 0
+        for _, _, tokens in serverless.tokenize_lines(text):
+            matches |= serverless.match_keywords(tokens)
+            total_words += len(tokens)
+        emotion_scores = {
+            emotion: serverless.count_matches(matches, "emotion", emotion) / max(total_words, 1)
+            for emotion in serverless.EMOTION_KEYWORDS
+        }
+        return lambda: serverless.calculate_overwhelm_score(matches, emotion_scores)
+
+    return {
+        "api.extract_tasks": lambda text: lambda: serverless.extract_tasks(text),
+        "api.detect_emotion": lambda text: lambda: serverless.detect_emotion(text),
+        "api.calculate_overwhelm_score": overwhelm,
+        "AIService._extract_tasks": lambda text: lambda: service._extract_tasks(text),
+        "EmotionDetector.detect_emotion": lambda text: lambda: detector.analyze(text),
+    }
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> int:
+    previous = {(entry["name"], entry["lines"]): entry for entry in baseline["results"]}
+    regressions = 0
+    print(f"\nagainst {baseline['meta']['created_at']} (threshold +{threshold:.0%} per line)")
+    for entry in results:
+        before = previous.get((entry["name"], entry["lines"]))
+        if before is None:
+            continue
+        change = entry["us_per_line"] / before["us_per_line"] - 1
+        regressed = change > threshold
+        regressions += regressed
+        print(f"{entry['name']:>32} {entry['lines']:>7} {before['us_per_line']:>10.3f} -> {entry['us_per_line']:>8.3f} us/line {change:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="corpus sizes in lines")
+    parser.add_argument("--keyword-density", type=float, default=0.15)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds of calls per case")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds per case; the fastest counts")
+    parser.add_argument("--only", nargs="+", help="benchmark names to run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown per line, as a fraction")
+    args = parser.parse_args()
+
+    keywords = list(lexicon_registry.current.keywords)
+    vocabulary = synthetic_vocabulary(random.Random(21))
+    uncached = ResultCache(None)
+    benchmarks = cases(load_entrypoint(), AIService(cache=uncached), EmotionDetector(cache=uncached))
+    if args.only:
+        benchmarks = {name: build for name, build in benchmarks.items() if name in args.only}
+
+    results = []
+    print(f"{'benchmark':>32} {'lines':>7} {'ops/s':>10} {'us/line':>10} {'peak KB':>10}")
+    for lines in args.sizes:
+        # Seeded by size, so a run over a subset of sizes sees the same corpora as its baseline
+        text = synthetic_corpus(random.Random(lines), lines, keywords, vocabulary, args.keyword_density)
+        for name, build in benchmarks.items():
+            timing = measure(build(text), args.min_time, args.rounds)
+            entry = {
+                "name": name,
+                "lines": lines,
+                "ops_per_sec": timing["ops_per_sec"],
+                "us_per_call": timing["seconds_per_call"] * 1e6,
+                "us_per_line": timing["seconds_per_call"] / lines * 1e6,
+                "peak_kb": timing["peak_kb"],
+            }
+            results.append(entry)
+            print(f"{name:>32} {lines:>7} {entry['ops_per_sec']:>10.1f} {entry['us_per_line']:>10.3f} {entry['peak_kb']:>10.1f}")
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "keyword_density": args.keyword_density,
+            "lexicon_version": lexicon_registry.current.version,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nsaved {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"{regressions} case(s) regressed")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
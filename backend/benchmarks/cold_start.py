@@ -0,0 +1,98 @@
+"""
+Cold start of the serverless entrypoint (api/index.py): module import time and
+the latency of the first requests, each measured in a fresh interpreter the way
+a new serverless instance sees them. Exits non-zero when the median of import
+plus first requests exceeds the budget, so it can gate a change.
+
+    cd backend
+    python -m benchmarks.cold_start --runs 20 --budget-ms 250
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRYPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "api", "index.py")
+
+# Runs in the fresh interpreter. Requests go straight to the ASGI app so no test
+# client is imported (it would load the framework before the timer starts).
+CHILD = r"""
+import importlib.util, json, sys, time
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("index", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+
+import asyncio
+
+async def call(method, path, body=b""):
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("localhost", 80),
+    }
+    await module.app(scope, receive, send)
+    return messages[0]["status"]
+
+async def first_requests():
+    timings = {}
+    for name, method, path, body in (
+        ("page", "GET", "/", b""),
+        ("brain_dump", "POST", "/api/v1/brain-dump", json.dumps({"text": "- finish the report\n- maybe call mom later"}).encode()),
+    ):
+        start = time.perf_counter()
+        status = await call(method, path, body)
+        timings[name] = time.perf_counter() - start
+        assert status == 200, (path, status)
+    return timings
+
+timings = asyncio.run(first_requests())
+print(json.dumps({"import": imported - started, **timings}))
+"""
+
+def run_once(entrypoint: str) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", CHILD, entrypoint], capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+    result["process"] = time.perf_counter() - start
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entrypoint", default=os.path.normpath(ENTRYPOINT))
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="maximum median of import + first requests")
+    args = parser.parse_args()
+
+    run_once(args.entrypoint)  # let the OS cache the files, as a warm container image would
+    runs = [run_once(args.entrypoint) for _ in range(args.runs)]
+
+    print(f"{args.entrypoint}, {args.runs} fresh interpreters")
+    print(f"{'':>22} {'median ms':>10} {'max ms':>10}")
+    for name, label in (
+        ("import", "import"),
+        ("page", "first GET /"),
+        ("brain_dump", "first brain dump"),
+        ("process", "whole process"),
+    ):
+        samples = [run[name] * 1000 for run in runs]
+        print(f"{label:>22} {statistics.median(samples):>10.1f} {max(samples):>10.1f}")
+
+    cold_start = statistics.median((run["import"] + run["page"] + run["brain_dump"]) * 1000 for run in runs)
+    verdict = "within" if cold_start <= args.budget_ms else "OVER"
+    print(f"cold start (import + first requests): {cold_start:.1f} ms, {verdict} the {args.budget_ms:.0f} ms budget")
+    if cold_start > args.budget_ms:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
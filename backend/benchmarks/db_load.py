@@ -0,0 +1,92 @@
+"""
+Throughput of the persisting endpoints under many concurrent clients.
+
+Each simulated client loops over: POST /api/v1/brain-dump with a user_id (a
+write of the dump, its tasks and emotion reading) followed by a page of
+GET /api/v1/brain-dump/history (a read). The app runs in-process against a
+fresh SQLite file, so the numbers show what the async database layer and its
+pool do, not the network.
+
+    cd backend
+    python -m benchmarks.db_load --clients 1 10 100 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+# Point the app at a throwaway database before it is imported
+_db_dir = tempfile.mkdtemp(prefix="neurodesk-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+
+import httpx
+
+from main import app
+
+DUMP = "- finish the project report before the deadline\n* call mom later\nfeeling a bit stressed about it"
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+async def run_clients(client: httpx.AsyncClient, clients: int, duration: float) -> Dict[str, float]:
+    write_latencies: List[float] = []
+    read_latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        nonlocal errors
+        user_id = f"bench-{clients}-{index % 25}"
+        counter = 0
+        while time.perf_counter() < deadline:
+            counter += 1
+            start = time.perf_counter()
+            # Unique text per request so the result cache does not hide the analysis
+            response = await client.post("/api/v1/brain-dump?compact=true", json={"text": f"{DUMP} #{index}-{counter}", "user_id": user_id})
+            write_latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+            start = time.perf_counter()
+            response = await client.get("/api/v1/brain-dump/history", params={"user_id": user_id, "limit": 10})
+            read_latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests_per_s": (len(write_latencies) + len(read_latencies)) / elapsed,
+        "writes_per_s": len(write_latencies) / elapsed,
+        "write_p50_ms": statistics.median(write_latencies) * 1000,
+        "write_p99_ms": percentile(write_latencies, 99) * 1000,
+        "read_p50_ms": statistics.median(read_latencies) * 1000,
+        "read_p99_ms": percentile(read_latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 200])
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"database: {os.environ['DATABASE_URL']}")
+    print(f"{'clients':>8} {'req/s':>8} {'writes/s':>9} {'write p50':>10} {'write p99':>10} {'read p50':>9} {'read p99':>9} {'errors':>7}")
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for clients in args.clients:
+                stats = await run_clients(client, clients, args.duration)
+                print(
+                    f"{clients:>8} {stats['requests_per_s']:>8.0f} {stats['writes_per_s']:>9.0f} "
+                    f"{stats['write_p50_ms']:>8.1f}ms {stats['write_p99_ms']:>8.1f}ms "
+                    f"{stats['read_p50_ms']:>7.1f}ms {stats['read_p99_ms']:>7.1f}ms {stats['errors']:>7.0f}"
+                )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Near-duplicate task lookup cost and accuracy as a user's open task list grows.
+
+Indexes N synthetic task titles for one user, then times fingerprinting plus
+LSH lookup for new titles that are either light rewordings of indexed ones
+(should match) or unrelated (should not), against a linear scan comparing the
+new title with every open task.
+
+    cd backend
+    python -m benchmarks.dedup --tasks 50000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.dedup import DEDUP_THRESHOLD, LSHIndex, fingerprint, shingles
+
+VERBS = "finish call buy email write review book clean fix plan send pay renew update prepare read schedule".split()
+FILLERS = ["the", "my", "a", "for", "to"]
+
+def synthetic_vocabulary(rng: random.Random, size: int = 5000):
+    letters = "abcdefghijklmnoprstuvw"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+
+def synthetic_title(rng: random.Random, vocabulary) -> str:
+    return " ".join([rng.choice(VERBS)] + rng.sample(vocabulary, rng.randint(2, 4)))
+
+def reword(rng: random.Random, title: str) -> str:
+    # What repeats look like across dumps: a filler word, different case, punctuation
+    words = title.split()
+    words.insert(rng.randint(1, len(words)), rng.choice(FILLERS))
+    reworded = " ".join(words)
+    return rng.choice([reworded, reworded.capitalize(), reworded + "!", reworded + " asap"])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    vocabulary = synthetic_vocabulary(rng)
+    titles = [synthetic_title(rng, vocabulary) for _ in range(args.tasks)]
+
+    started = time.perf_counter()
+    index = LSHIndex()
+    # The same path as the first dump of a user after a restart: rows straight from the tasks table
+    index.load((task_id, title, "todo", 0.0) for task_id, title in enumerate(titles, start=1))
+    build_time = time.perf_counter() - started
+    print(f"indexed {len(index)} open tasks in {build_time:.1f}s ({build_time / args.tasks * 1e6:.0f} us per task)")
+
+    repeats = [(rng.randrange(args.tasks) + 1, None) for _ in range(args.queries // 2)]
+    repeats = [(task_id, reword(rng, titles[task_id - 1])) for task_id, _ in repeats]
+    fresh = [(None, synthetic_title(rng, vocabulary)) for _ in range(args.queries - len(repeats))]
+
+    def exact(a: str, b: str) -> float:
+        a, b = shingles(a), shingles(b)
+        return len(a & b) / len(a | b)
+
+    samples = []
+    expected_matches = found = wrong = 0
+    for original, title in repeats + fresh:
+        start = time.perf_counter()
+        match = index.match(fingerprint(title))
+        samples.append(time.perf_counter() - start)
+        if original is not None and exact(title, titles[original - 1]) >= DEDUP_THRESHOLD:
+            expected_matches += 1
+            found += match is not None
+        if match is not None and exact(title, titles[match - 1]) < DEDUP_THRESHOLD:
+            wrong += 1
+
+    samples.sort()
+    print(f"LSH lookup: median {statistics.median(samples) * 1e6:.0f} us, p99 {samples[int(len(samples) * 0.99)] * 1e6:.0f} us per task")
+    print(f"  found {found}/{expected_matches} rewordings above the threshold; {wrong}/{len(samples)} matches below it")
+
+    shingle_sets = [shingles(title) for title in titles]
+    scan = []
+    for _, title in (repeats + fresh)[:args.scan_queries]:
+        start = time.perf_counter()
+        mine = shingles(title)
+        max(len(mine & other) / len(mine | other) for other in shingle_sets)
+        scan.append(time.perf_counter() - start)
+    print(f"linear scan (exact Jaccard against every open task): median {statistics.median(scan) * 1e3:.1f} ms per task")
+
+if __name__ == "__main__":
+    main()
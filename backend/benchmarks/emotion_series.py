@@ -0,0 +1,113 @@
+"""
+Storage cost and trend query time of the emotion time series.
+
+Loads a year of synthetic readings for one user (one transaction per day, as a
+nightly import would), then reports bytes stored per reading at every resolution
+the cost of appending live readings one at a time, and the latency of trend
+queries over the year and over the last day.
+
+    cd backend
+    python -m benchmarks.emotion_series --per-day 24
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, _apply_sqlite_pragmas
+from app.models.emotion import EmotionResponse, EmotionType
+from app.services.emotion_series import append_readings, trend
+from app.tables import EmotionSeriesBlock
+
+def synthetic_reading(rng: random.Random) -> EmotionResponse:
+    emotions = rng.sample(list(EmotionType), rng.randint(1, 3))
+    scores = {emotion: round(rng.random() / 4, 4) for emotion in emotions}
+    primary = max(scores, key=scores.get)
+    overwhelm = round(rng.random(), 4)
+    return EmotionResponse(
+        id="emotion_1", timestamp=0, primary_emotion=primary, confidence=scores[primary], source="rule_based",
+        emotion_scores=scores, is_overwhelm_detected=overwhelm > 0.7, overwhelm_score=overwhelm
+    )
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-day", type=int, default=24)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--live", type=int, default=500, help="readings appended one per transaction at the end")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="neurodesk-series-"), "series.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    rng = random.Random(7)
+    end = time.time()
+    start = end - args.days * 86400
+    total = 0
+    json_bytes = 0
+    load_started = time.perf_counter()
+    for day in range(args.days):
+        day_start = start + day * 86400
+        readings = []
+        for _ in range(args.per_day):
+            reading = synthetic_reading(rng)
+            json_bytes += len(json.dumps({emotion.value: score for emotion, score in reading.emotion_scores.items()}))
+            readings.append((day_start + rng.random() * 86400, reading))
+        async with sessions() as db:
+            await append_readings(db, "bench-user", readings)
+            await db.commit()
+        total += len(readings)
+    load_time = time.perf_counter() - load_started
+
+    print(f"{total} readings over {args.days} days loaded in {load_time:.1f}s ({load_time / args.days * 1000:.1f} ms per day)")
+    async with sessions() as db:
+        rows = await db.execute(
+            select(EmotionSeriesBlock.resolution, func.count(), func.sum(func.length(EmotionSeriesBlock.data)))
+            .group_by(EmotionSeriesBlock.resolution)
+        )
+        for resolution, blocks, size in rows:
+            print(f"  {resolution:>6}: {blocks:>5} blocks {size:>10} bytes {size / total:>6.1f} bytes/reading")
+    print(f"  (the JSON emotion_scores blob alone averages {json_bytes / total:.1f} bytes/reading in a row-per-reading table)")
+
+    samples = []
+    for i in range(args.live):
+        async with sessions() as db:
+            started = time.perf_counter()
+            await append_readings(db, "bench-user", [(end - 3600 + i * 3600 / args.live, synthetic_reading(rng))], now=end)
+            await db.commit()
+            samples.append(time.perf_counter() - started)
+    if samples:
+        print(f"{args.live} live readings appended one per transaction: median {statistics.median(samples) * 1000:.2f} ms, max {max(samples) * 1000:.2f} ms")
+
+    queries = [
+        ("year, 52 points", start, end, 52),
+        ("year, 365 points", start, end, 365),
+        ("year, 2000 points", start, end, 2000),
+        ("last day, 96 points", end - 86400, end, 96),
+        ("last hour, 60 points", end - 3600, end, 60),
+    ]
+    print(f"{'query':>22} {'resolution':>10} {'points':>7} {'median ms':>10}")
+    for name, query_start, query_end, max_points in queries:
+        samples = []
+        for _ in range(args.repeat):
+            async with sessions() as db:
+                started = time.perf_counter()
+                result = await trend(db, "bench-user", query_start, query_end, max_points)
+                samples.append(time.perf_counter() - started)
+        print(f"{name:>22} {result['resolution']:>10} {len(result['points']):>7} {statistics.median(samples) * 1000:>10.2f}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Tail latency of small requests while large brain dumps are being analysed.
+
+Drives the FastAPI app in-process with a mixed load: a steady stream of small
+/api/v1/detect-emotion calls plus periodic ~200 KB compact /api/v1/brain-dump calls,
+once per analysis executor mode. With the inline mode every large dump stalls
+the event loop and shows up in the small requests' p99.
+
+    cd backend
+    python -m benchmarks.event_loop_latency --modes inline thread process
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.services.executor import analysis_executor
+from app.services.lexicon import lexicon_registry
+from app.services.result_cache import result_cache
+from main import app
+
+SMALL_TEXT = "Feeling a bit stressed about the meeting tomorrow"
+LARGE_LINE = "Need to finish the project report before the deadline, feeling overwhelmed\n"
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+async def run_mode(mode: str, duration: float, small_interval: float, large_interval: float, large_bytes: int) -> Dict[str, float]:
+    analysis_executor.configure(mode)
+    analysis_executor.start()
+    # Every large dump is unique, but keep the cache out of the picture entirely
+    result_cache.clear()
+
+    large_text = LARGE_LINE * (large_bytes // len(LARGE_LINE))
+    small_latencies: List[float] = []
+    large_latencies: List[float] = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def timed(path: str, payload: dict, sink: List[float]) -> None:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+            sink.append(time.perf_counter() - start)
+
+        pending = []
+        deadline = time.perf_counter() + duration
+        next_small = next_large = time.perf_counter()
+        counter = 0
+
+        # Open loop: requests are issued on schedule regardless of earlier responses
+        while time.perf_counter() < deadline:
+            now = time.perf_counter()
+            if now >= next_large:
+                counter += 1
+                pending.append(asyncio.create_task(timed("/api/v1/brain-dump?compact=true", {"text": f"{large_text}{counter}"}, large_latencies)))
+                next_large += large_interval
+            if now >= next_small:
+                counter += 1
+                pending.append(asyncio.create_task(timed("/api/v1/detect-emotion", {"text": f"{SMALL_TEXT} {counter}"}, small_latencies)))
+                next_small += small_interval
+            await asyncio.sleep(min(next_small, next_large) - time.perf_counter())
+
+        await asyncio.gather(*pending)
+
+    analysis_executor.shutdown()
+    return {
+        "small_requests": len(small_latencies),
+        "small_p50_ms": percentile(small_latencies, 50) * 1000,
+        "small_p99_ms": percentile(small_latencies, 99) * 1000,
+        "small_max_ms": max(small_latencies) * 1000,
+        "large_requests": len(large_latencies),
+        "large_mean_ms": statistics.mean(large_latencies) * 1000,
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "process"])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per mode")
+    parser.add_argument("--small-interval", type=float, default=0.005, help="seconds between small requests")
+    parser.add_argument("--large-interval", type=float, default=0.5, help="seconds between large dumps")
+    parser.add_argument("--large-bytes", type=int, default=200_000, help="size of each large dump in bytes")
+    args = parser.parse_args()
+
+    lexicon_registry.load()
+    print(f"{'mode':<8} {'small n':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'large n':>8} {'large ms':>9}")
+    for mode in args.modes:
+        stats = await run_mode(mode, args.duration, args.small_interval, args.large_interval, args.large_bytes)
+        print(
+            f"{mode:<8} {stats['small_requests']:>8} {stats['small_p50_ms']:>8.1f} {stats['small_p99_ms']:>8.1f} "
+            f"{stats['small_max_ms']:>8.1f} {stats['large_requests']:>8} {stats['large_mean_ms']:>9.1f}"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,262 @@
+"""
+Open-loop load test of the analysis endpoints, for sizing capacity.
+
+Requests to /api/v1/brain-dump, /api/v1/detect-emotion and /api/v1/generate-summary
+arrive at a fixed average rate (Poisson arrivals by default) whatever the
+server's response times, in a configurable endpoint and payload-size mix. Each
+rate in --rates is held for --duration seconds and reported per endpoint:
+throughput, errors and p50/p95/p99/max latency. Latency counts from the moment
+a request was due, not when it was actually sent, so a client falling behind
+shows up in the numbers instead of hiding them (coordinated omission).
+
+The app runs in-process by default (ASGI transport, no sockets). --server starts
+a local uvicorn on a free port instead, --url drives a server that is already
+running. --app serverless targets api/index.py instead of the backend. Backend
+runs write to a throwaway SQLite file. Everything stays on this machine.
+
+    cd backend
+    python -m benchmarks.load --rates 50 100 200 --duration 20
+    python -m benchmarks.load --server --workers 2 --rates 100 200 400
+    python -m benchmarks.load --app serverless --server --mix brain-dump=1 --payloads 300=1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Point the app at a throwaway database before it is imported (or started as a server)
+_db_dir = tempfile.mkdtemp(prefix="neurodesk-load-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/load.db")
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERLESS_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "api")
+
+ENDPOINTS = {
+    "brain-dump": "/api/v1/brain-dump",
+    "detect-emotion": "/api/v1/detect-emotion",
+    "generate-summary": "/api/v1/generate-summary",
+}
+
+LINES = [
+    "- finish the project report before the deadline",
+    "* call mom this week",
+    "- book a dentist appointment, maybe later",
+    "feeling a bit stressed about the meeting tomorrow",
+    "- review the slides for the presentation",
+    "need to go to the gym and exercise more",
+    "I'm overwhelmed, there is too much to do",
+    "- email the team about the budget",
+    "should read the book for the course",
+    "happy that the trip is finally planned",
+    "- clean the house before the party",
+    "worried I keep putting off the taxes",
+]
+
+def parse_weights(spec: str, convert=str) -> List[Tuple[Any, float]]:
+    """
+    "a=3,b=1" -> [(a, 3.0), (b, 1.0)]
+    """
+    weights = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        weights.append((convert(name.strip()), float(weight or 1)))
+    return weights
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+class Workload:
+    """
+    Draws the next request: an endpoint from the mix and a payload of a size from
+    the payload mix. Every text is unique so the result cache does not answer
+    instead of the analysis.
+    """
+
+    def __init__(self, mix: List[Tuple[str, float]], payloads: List[Tuple[int, float]], users: int, seed: int = 22):
+        self.rng = random.Random(seed)
+        self.endpoints, self.endpoint_weights = zip(*mix)
+        self.sizes, self.size_weights = zip(*payloads)
+        self.texts = {size: "\n".join(self.rng.choice(LINES) for _ in range(size)) for size in self.sizes}
+        self.users = users
+        self.counter = 0
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        self.counter += 1
+        endpoint = self.rng.choices(self.endpoints, self.endpoint_weights)[0]
+        user_id = f"load-{self.rng.randrange(self.users)}"
+        if endpoint == "generate-summary":
+            return endpoint, {"user_id": user_id}
+        size = self.rng.choices(self.sizes, self.size_weights)[0]
+        return endpoint, {"text": f"{self.texts[size]}\n#{self.counter}", "user_id": user_id}
+
+async def run_rate(client: httpx.AsyncClient, workload: Workload, rate: float, duration: float, arrivals: str, max_in_flight: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+    errors: Dict[str, int] = {name: 0 for name in ENDPOINTS}
+    shed = 0
+    in_flight = 0
+    rng = random.Random(rate)
+
+    async def send(endpoint: str, payload: Dict[str, Any], due: float) -> None:
+        nonlocal in_flight
+        try:
+            response = await client.post(ENDPOINTS[endpoint], json=payload)
+            ok = response.status_code == 200 and "error" not in response.json()
+        except (httpx.HTTPError, ValueError):
+            # ValueError: a body that is not JSON (an HTML error page, a truncated response)
+            ok = False
+        finally:
+            in_flight -= 1
+        if ok:
+            latencies[endpoint].append(time.perf_counter() - due)
+        else:
+            errors[endpoint] += 1
+
+    pending = []
+    started = time.perf_counter()
+    due = started
+    deadline = started + duration
+    while True:
+        due += rng.expovariate(rate) if arrivals == "poisson" else 1 / rate
+        if due >= deadline:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, payload = workload.next()
+        if in_flight >= max_in_flight:
+            # The client's own limit, not the server's answer: reported separately
+            shed += 1
+            continue
+        in_flight += 1
+        pending.append(asyncio.create_task(send(endpoint, payload, due)))
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - started
+
+    report = {"rate": rate, "elapsed": elapsed, "shed": shed, "endpoints": {}}
+    for name, samples in latencies.items():
+        if not samples and not errors[name]:
+            continue
+        entry = {"requests": len(samples) + errors[name], "errors": errors[name], "throughput": len(samples) / elapsed}
+        if samples:
+            entry.update({f"p{pct}_ms": percentile(samples, pct) * 1000 for pct in (50, 95, 99)})
+            entry["max_ms"] = max(samples) * 1000
+        report["endpoints"][name] = entry
+    return report
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(app_name: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    module, cwd = ("main:app", BACKEND_DIR) if app_name == "backend" else ("index:app", SERVERLESS_DIR)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=cwd,
+        env=os.environ.copy(),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60s")
+
+def load_app(app_name: str):
+    if app_name == "backend":
+        from main import app
+        return app
+    sys.path.insert(0, SERVERLESS_DIR)
+    from index import app
+    return app
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['rate']:.0f} req/s offered for {report['elapsed']:.1f}s" + (f", {report['shed']} shed by the client" if report["shed"] else ""))
+    print(f"{'endpoint':>18} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, entry in report["endpoints"].items():
+        latency = " ".join(f"{entry.get(key, float('nan')):>8.1f}" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        print(f"{name:>18} {entry['requests']:>9} {entry['errors']:>7} {entry['throughput']:>8.1f} {latency}")
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=["backend", "serverless"], default="backend")
+    parser.add_argument("--server", action="store_true", help="run the app in a local uvicorn instead of in-process")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes with --server")
+    parser.add_argument("--url", help="drive an already running server instead")
+    parser.add_argument("--rates", type=float, nargs="+", default=[25, 50, 100], help="offered load steps, requests per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per rate")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds at the first rate before measuring")
+    parser.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--mix", default="brain-dump=6,detect-emotion=3,generate-summary=1", help="endpoint weights")
+    parser.add_argument("--payloads", default="3=70,30=25,300=5", help="payload sizes in lines, with weights")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--output", help="write the reports to this JSON file")
+    args = parser.parse_args()
+
+    mix = parse_weights(args.mix)
+    unknown = [name for name, _ in mix if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoint(s) in --mix: {', '.join(unknown)}")
+    workload = Workload(mix, parse_weights(args.payloads, int), args.users)
+
+    server: Optional[subprocess.Popen] = None
+    lifespan = None
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits)
+    elif args.server:
+        server, url = start_server(args.app, args.workers)
+        client = httpx.AsyncClient(base_url=url, timeout=60, limits=limits)
+    else:
+        app = load_app(args.app)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=60)
+
+    target = args.url or (f"{args.app} via uvicorn ({args.workers} worker(s))" if args.server else f"{args.app} in-process")
+    print(f"target: {target}; mix {args.mix}; payload lines {args.payloads}; {args.arrivals} arrivals")
+    reports = []
+    try:
+        if args.warmup > 0:
+            await run_rate(client, workload, args.rates[0], args.warmup, args.arrivals, args.max_in_flight)
+        for rate in args.rates:
+            report = await run_rate(client, workload, rate, args.duration, args.arrivals, args.max_in_flight)
+            print_report(report)
+            reports.append(report)
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(_db_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"target": target, "mix": args.mix, "payloads": args.payloads, "arrivals": args.arrivals, "reports": reports}, f, indent=2)
+        print(f"\nsaved {len(reports)} reports to {args.output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
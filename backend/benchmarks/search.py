@@ -0,0 +1,99 @@
+"""
+Full-text search latency against a LIKE scan as history grows.
+
+Saves synthetic brain dumps for a handful of users through the normal write
+path (so the FTS index is maintained incrementally), then times the search
+endpoint's query against the LIKE query it replaces.
+
+    cd backend
+    python -m benchmarks.search --dumps 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, _apply_sqlite_pragmas
+from app.services.ai_service import get_ai_service
+from app.services.search import create_search_index, search
+from app.services.storage import save_brain_dump
+
+COMMON = (
+    "report deadline meeting email project call mom dad dentist gym groceries laundry "
+    "taxes invoice budget slides review study course book plan trip clean kitchen garden "
+    "car insurance renew passport doctor friend party birthday gift read practice write"
+).split()
+
+def synthetic_vocabulary(rng: random.Random, size: int = 5000):
+    # Real histories have a long tail of rare words; a tiny vocabulary would make
+    # every term match most rows and flatter the LIKE scan
+    letters = "abcdefghijklmnoprstuvw"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(size)]
+
+LIKE_QUERY = text(
+    "SELECT id FROM tasks WHERE user_id = :user_id AND lower(title) LIKE :pattern "
+    "UNION ALL SELECT id FROM brain_dumps WHERE user_id = :user_id AND lower(text) LIKE :pattern"
+)  # no LIMIT: ranking the matches needs all of them
+
+def synthetic_dump(rng: random.Random, vocabulary) -> str:
+    def line():
+        words = rng.choices(vocabulary, k=rng.randint(3, 7))
+        if rng.random() < 0.2:
+            words.insert(0, rng.choice(COMMON))
+        return "- " + " ".join(words)
+    return "\n".join(line() for _ in range(rng.randint(2, 6)))
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dumps", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="neurodesk-search-"), "search.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(create_search_index)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    rng = random.Random(3)
+    vocabulary = synthetic_vocabulary(rng)
+    service = get_ai_service()
+    started = time.perf_counter()
+    for offset in range(0, args.dumps, 500):
+        async with sessions() as db:
+            for i in range(offset, min(offset + 500, args.dumps)):
+                dump = synthetic_dump(rng, vocabulary)
+                await save_brain_dump(db, f"user-{i % args.users}", dump, await service.process_brain_dump(dump))
+            await db.commit()
+    print(f"saved and indexed {args.dumps} dumps in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'query':>16} {'fts ms':>8} {'like ms':>8} {'results':>8}")
+    for query in ("call mom", "passport", "renew car insurance", "dent"):
+        fts, like = [], []
+        async with sessions() as db:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = await search(db, "user-0", query)
+                fts.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                (await db.execute(LIKE_QUERY, {"user_id": "user-0", "pattern": f"%{query}%"})).all()
+                like.append(time.perf_counter() - start)
+        print(f"{query:>16} {median_ms(fts):>8.2f} {median_ms(like):>8.2f} {len(results):>8}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
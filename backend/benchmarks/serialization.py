@@ -0,0 +1,90 @@
+"""
+Per-task cost of encoding /api/v1/brain-dump responses.
+
+Compares the previous path (a validated TaskResponse per task, wrapped in
+BrainDumpResponse and serialized through FastAPI's response_model handling)
+with the direct orjson encoding of the service-built tasks. Before timing it
+checks the contract: both encodings must decode to the same JSON and the fast
+body must validate against BrainDumpResponse / CompactBrainDumpResponse.
+
+    cd backend
+    python -m benchmarks.serialization --tasks 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.brain_dump import BrainDumpResponse, CompactBrainDumpResponse, _compact_task
+from app.models.task import TaskResponse
+from app.services.ai_service import brain_dump_id, get_ai_service
+from app.services.serialization import dumps, emotion_dict, encode_brain_dump
+
+LINE = "- Finish the project report before the deadline, feeling stressed\n"
+
+def validated_body(model, content) -> bytes:
+    # What FastAPI does with a response_model: validate, serialize, json.dumps
+    field = create_response_field(name="response", type_=model)
+    return JSONResponse(asyncio.run(serialize_response(field=field, response_content=content))).body
+
+def time_per_call(func: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def check_contract(text: str) -> None:
+    tasks, emotion_reading, sources = get_ai_service().analyze_brain_dump(text)
+    dump_id = brain_dump_id(text)
+
+    fast = encode_brain_dump(tasks, emotion_reading, 0.5)
+    slow = validated_body(BrainDumpResponse, BrainDumpResponse(tasks=[TaskResponse(**task.__dict__) for task in tasks], emotion_reading=emotion_reading, processing_time=0.5))
+    assert json.loads(fast) == json.loads(slow), "full response differs from the response_model encoding"
+    BrainDumpResponse.model_validate_json(fast)
+
+    compact = dumps({
+        "brain_dump": {"id": dump_id, "text": text},
+        "tasks": [_compact_task(task, source, dump_id) for task, source in zip(tasks, sources)],
+        "emotion_reading": emotion_dict(emotion_reading, include_text=False),
+        "processing_time": 0.5
+    })
+    model = CompactBrainDumpResponse.model_validate_json(compact)
+    assert json.loads(compact) == json.loads(validated_body(CompactBrainDumpResponse, model)), "compact response differs"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    check_contract(LINE * 50 + "\n  \n* Call mom later, maybe\nok\n")
+    print("contract: fast encoding matches BrainDumpResponse and CompactBrainDumpResponse")
+
+    print(f"{'tasks':>7} {'validated us/task':>18} {'direct us/task':>15} {'speedup':>8}")
+    for count in args.tasks:
+        text = LINE * count
+        tasks, emotion_reading, _ = get_ai_service().analyze_brain_dump(text)
+        fields: List[dict] = [task.__dict__ for task in tasks]
+
+        def validated() -> bytes:
+            # Per-task models are validated once when built and again by response_model
+            models = [TaskResponse(**task) for task in fields]
+            return validated_body(BrainDumpResponse, BrainDumpResponse(tasks=models, emotion_reading=emotion_reading, processing_time=0.5))
+
+        def direct() -> bytes:
+            models = [TaskResponse.model_construct(**task) for task in fields]
+            return encode_brain_dump(models, emotion_reading, 0.5)
+
+        slow = time_per_call(validated, args.repeat) / count * 1e6
+        fast = time_per_call(direct, args.repeat) / count * 1e6
+        print(f"{count:>7} {slow:>18.2f} {fast:>15.2f} {slow / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Brain-dump ingest rate of the SQLite write path.
+
+Writes the same analysed dump (row, tasks, emotion reading) from many concurrent
+writers, once per configuration:
+
+  default  rollback journal, synchronous=FULL, one commit per dump
+  wal      the WAL/pragma profile from app.database, one commit per dump
+  group    the WAL profile with the write queue's group commit
+
+    cd backend
+    python -m benchmarks.sqlite_ingest --writers 100 --dumps 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.database import Base, _apply_sqlite_pragmas
+from app.services.ai_service import get_ai_service
+from app.services.dedup import fingerprint_titles
+from app.services.search import create_search_index
+from app.services.storage import save_brain_dump
+from app.services.write_queue import WriteQueue
+from app import tables  # noqa: F401
+
+DUMP = "- finish the project report before the deadline\n* call mom later\n- book the dentist\nfeeling a bit stressed about it"
+
+def default_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=DELETE")
+    cursor.execute("PRAGMA synchronous=FULL")
+    cursor.close()
+
+async def ingest(profile: str, writers: int, dumps: int) -> float:
+    path = os.path.join(tempfile.mkdtemp(prefix="neurodesk-ingest-"), "ingest.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=600)
+    event.listen(engine.sync_engine, "connect", default_pragmas if profile == "default" else _apply_sqlite_pragmas)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(create_search_index)
+
+    # max_batch=1 and no window turn the queue into one commit per dump
+    queue = WriteQueue(async_sessionmaker(engine, expire_on_commit=False), max_batch=256 if profile == "group" else 1, window=0.002 if profile == "group" else 0)
+    await queue.start()
+
+    # fingerprinted before submit, as the router does, so the writer only writes
+    result = await get_ai_service().process_brain_dump(DUMP)
+    fingerprints = await fingerprint_titles([task.title for task in result.tasks])
+    per_writer = dumps // writers
+
+    async def writer(index: int) -> None:
+        for _ in range(per_writer):
+            await queue.submit(save_brain_dump, f"user-{index}", DUMP, result, fingerprints)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(index) for index in range(writers)))
+    elapsed = time.perf_counter() - start
+
+    await queue.stop()
+    await engine.dispose()
+    rate = per_writer * writers / elapsed
+    print(f"{profile:>8} {rate:>10.0f} dumps/s {queue.batches:>7} commits")
+    return rate
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=100)
+    parser.add_argument("--dumps", type=int, default=2000)
+    parser.add_argument("--profiles", nargs="+", default=["default", "wal", "group"])
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        await ingest(profile, args.writers, args.dumps)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,17 +1,42 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import os
 import uvicorn
-from app.database import engine, Base
-from app.api import brain_dump, emotion_detection, summary_generation
+from app.database import dispose_engines, init_db
+from app import tables  # noqa: F401  (registers the ORM tables on Base.metadata)
+from app.api import brain_dump, emotion_detection, jobs, lexicon, metrics, search, summary_generation, tasks
+from app.services.admin import ADMIN_TOKEN
+from app.services.executor import analysis_executor
+from app.services.jobs import register_jobs
+from app.services.lexicon import lexicon_registry
+from app.services.metrics import METRICS_ENABLED, MetricsMiddleware
+from app.services.profiler import PROFILE_SAMPLE_PERCENT, ProfilingMiddleware
+from app.services.scheduler import scheduler
+from app.services.search import init_search_index
+from app.services.tracing import TracingMiddleware, tracer
+from app.services.write_queue import write_queue
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    await init_db()
+    await init_search_index()
+    lexicon_registry.load()
+    analysis_executor.start()
+    await write_queue.start()
+    if SCHEDULER_ENABLED:
+        register_jobs(scheduler)
+        await scheduler.start()
     yield
     # Shutdown
-    pass
+    await scheduler.stop()
+    await write_queue.stop()
+    analysis_executor.shutdown()
+    tracer.shutdown()
+    await dispose_engines()
 
 app = FastAPI(
     title="NeuroDesk API",
@@ -20,6 +45,10 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+if ADMIN_TOKEN or PROFILE_SAMPLE_PERCENT > 0:
+    # Innermost, so profiled responses still get CORS headers and are timed by the metrics
+    app.add_middleware(ProfilingMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -28,11 +57,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware)
+if METRICS_ENABLED:
+    # Outermost, so latency includes the other middleware
+    app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(brain_dump.router, prefix="/api/v1", tags=["brain-dump"])
 app.include_router(emotion_detection.router, prefix="/api/v1", tags=["emotion"])
 app.include_router(summary_generation.router, prefix="/api/v1", tags=["summary"])
+app.include_router(lexicon.router, prefix="/api/v1", tags=["lexicon"])
+app.include_router(tasks.router, prefix="/api/v1", tags=["tasks"])
+app.include_router(search.router, prefix="/api/v1", tags=["search"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 @app.get("/")
 async def root():